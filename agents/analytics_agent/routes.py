@@ -4,8 +4,15 @@ agents/analytics_agent/routes.py
 Routes for Analytics Agent — handles performance insights and analytics.
 """
 
-from fastapi import APIRouter, Form
+import json
+from fastapi import APIRouter, File, Form, UploadFile
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse
 from agents.analytics_agent import service
+from api.http_cache import http_cache
+from core.analytics import DEFAULT_COHORT
+from core.rubrics import UnknownRubric
+from core.scoring import SCORE_MAX, answer_format
 
 router = APIRouter()
 
@@ -14,9 +21,76 @@ async def analytics_root():
     return {"agent": "Analytics Agent", "status": "active"}
 
 @router.post("/analyze")
+@http_cache.cached()
 async def analyze_data(syllabus: str = Form(...)):
     """
     Generates visual and textual analytics based on student or syllabus data.
     """
-    data = service.analyze_performance(syllabus)
+    data = await run_in_threadpool(service.analyze_performance, syllabus)
     return {"status": "success", "data": data}
+
+def _found(data, what):
+    if data is None:
+        return JSONResponse(status_code=404, content={"status": "error", "message": f"No scores recorded for {what}."})
+    return {"status": "success", "data": data}
+
+@router.post("/ingest")
+async def ingest_answers(
+    file: UploadFile = File(...),
+    cohort: str = Form(DEFAULT_COHORT),
+    topics: str = Form(None),
+    weights: str = Form(None),
+    max_score: float = Form(SCORE_MAX),
+    rubric_id: str = Form(None),
+):
+    """
+    Grades a CSV/NDJSON answer file and records the scores for analytics.
+    topics is an optional JSON object mapping question ids to topics;
+    rubric_id grades against a registered rubric template instead of weights.
+    """
+    try:
+        fmt = answer_format(file.filename, file.content_type or "")
+        topics = json.loads(topics) if topics else None
+        if topics is not None and not isinstance(topics, dict):
+            raise ValueError("topics must map question ids to topic names.")
+        weights = json.loads(weights) if weights else None
+        body = await file.read()
+        data = await run_in_threadpool(
+            service.record_answers, body, fmt, cohort, topics, weights, max_score, rubric_id
+        )
+        return {"status": "success", "data": data}
+    except UnknownRubric as e:
+        return JSONResponse(status_code=404, content={"status": "error", "message": f"Unknown rubric: {e.args[0]}"})
+    except (ValueError, TypeError) as e:
+        return JSONResponse(status_code=400, content={"status": "error", "message": str(e)})
+
+@router.get("/summary")
+async def performance_summary():
+    """
+    Overall and per-criterion statistics over every recorded score.
+    Queries run in a thread: they wait on the store lock while a batch is ingested.
+    """
+    return {"status": "success", "data": await run_in_threadpool(service.performance_summary)}
+
+@router.get("/cohorts/{cohort}")
+async def cohort_stats(cohort: str):
+    return _found(await run_in_threadpool(service.cohort_report, cohort), f"cohort '{cohort}'")
+
+@router.get("/topics/{topic}")
+async def topic_stats(topic: str, cohort: str = None):
+    return _found(await run_in_threadpool(service.topic_report, topic, cohort), f"topic '{topic}'")
+
+@router.get("/students/{student_id}")
+async def student_stats(student_id: str):
+    return _found(await run_in_threadpool(service.student_report, student_id), f"student '{student_id}'")
+
+@router.get("/questions/{question_id}")
+async def question_stats(question_id: str, cohort: str = None):
+    return _found(await run_in_threadpool(service.question_report, question_id, cohort), f"question '{question_id}'")
+
+@router.get("/weak_topics")
+async def weak_topics(cohort: str = None, limit: int = 10):
+    """
+    Topics ranked weakest first by mean score, optionally within one cohort.
+    """
+    return {"status": "success", "data": await run_in_threadpool(service.weak_topics, cohort, limit)}
@@ -8,6 +8,15 @@ Analytics Agent: Generates performance reports and academic insights.
 """
 
 from datetime import datetime
+from core.cache import get_cache, syllabus_key
+from core.syllabus import Syllabus
+from core.analytics import DEFAULT_COHORT, score_store
+from core.rubrics import scoring_rubric
+from core.scoring import SCORE_MAX, grade, parse_answers
+from core.tracing import traced_agent
+
+# Generated outputs keyed by a hash of the syllabus text
+output_cache = get_cache("agent_outputs")
 
 class AnalyticsAgent:
     def __init__(self):
@@ -15,8 +24,8 @@ class AnalyticsAgent:
         self.goal = "Transform raw scores into meaningful analytics."
         self.version = "v1.0"
 
-    def analyze_performance(self, syllabus_text: str):
-        topics = [t.strip() for t in syllabus_text.split(",") if t.strip()]
+    def analyze_performance(self, syllabus):
+        topics = Syllabus.coerce(syllabus).topics
         insights = {
             "overview": f"Performance analytics generated for {len(topics)} syllabus topics.",
             "recommendations": [
@@ -25,12 +34,74 @@ class AnalyticsAgent:
         }
         return {
             "agent": "AnalyticsAgent",
-            "generated_on": datetime.utcnow().isoformat(),
+            "generated_on": datetime.utcnow(),
             "insights": insights
         }
 
+    def record_answers(self, body, fmt="csv", cohort=DEFAULT_COHORT, topics=None,
+                       weights=None, max_score=SCORE_MAX, rubric_id=None):
+        """
+        Grades an answer file and folds the scores into the shared score
+        store; cohort and topic aggregates update without a rescan.
+        rubric_id grades against a registered rubric template instead of weights.
+        """
+        rubric = scoring_rubric(weights, rubric_id)
+        result = grade(parse_answers(body, rubric.criteria, fmt), rubric, max_score=max_score)
+        recorded = score_store.ingest(result, cohort=cohort, topics=topics)
+        return {
+            "agent": "AnalyticsAgent",
+            "generated_on": datetime.utcnow(),
+            "cohort": cohort,
+            "recorded": recorded,
+            "cohort_stats": score_store.cohort(cohort),
+            "weak_topics": score_store.weak_topics(cohort, limit=5),
+        }
+
+    def performance_summary(self):
+        return score_store.summary()
+
+    def cohort_report(self, cohort):
+        return score_store.cohort(cohort)
+
+    def topic_report(self, topic, cohort=None):
+        return score_store.topic(topic, cohort)
+
+    def student_report(self, student_id):
+        return score_store.student(student_id)
+
+    def question_report(self, question_id, cohort=None):
+        return score_store.question(question_id, cohort)
+
+    def weak_topics(self, cohort=None, limit=10):
+        return score_store.weak_topics(cohort, limit)
+
 # Global instance
 agent = AnalyticsAgent()
 
-def analyze_performance(syllabus_text: str):
-    return agent.analyze_performance(syllabus_text)
+@traced_agent("analytics")
+@output_cache.memoize("analytics", key_fn=syllabus_key)
+def analyze_performance(syllabus):
+    return agent.analyze_performance(syllabus)
+
+@traced_agent("analytics_ingest")
+def record_answers(body, fmt="csv", cohort=DEFAULT_COHORT, topics=None, weights=None, max_score=SCORE_MAX,
+                   rubric_id=None):
+    return agent.record_answers(body, fmt, cohort, topics, weights, max_score, rubric_id)
+
+def performance_summary():
+    return agent.performance_summary()
+
+def cohort_report(cohort):
+    return agent.cohort_report(cohort)
+
+def topic_report(topic, cohort=None):
+    return agent.topic_report(topic, cohort)
+
+def student_report(student_id):
+    return agent.student_report(student_id)
+
+def question_report(question_id, cohort=None):
+    return agent.question_report(question_id, cohort)
+
+def weak_topics(cohort=None, limit=10):
+    return agent.weak_topics(cohort, limit)
@@ -5,7 +5,14 @@ Routes for Content Agent — handles syllabus uploads and content generation.
 """
 
 from fastapi import APIRouter, File, UploadFile, Form
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse
 from agents.content_agent import service
+from core.incremental import run_incremental
+from core.syllabus import Syllabus
+from core.extraction_pool import extraction_pool, PoolSaturated, ExtractionTimeout
+from api.http_cache import http_cache
+from api.responses import json_response
 
 router = APIRouter()
 
@@ -14,21 +21,58 @@ async def content_root():
     return {"agent": "Content Agent", "status": "active"}
 
 @router.post("/generate")
-async def generate_lessons(syllabus: str = Form(...)):
+@http_cache.cached()
+async def generate_lessons(syllabus: str = Form(...), compact: bool = False):
     """
     Generates lessons and topics from plain text syllabus input.
+    compact=true omits per-lesson timestamps.
     """
-    data = service.generate_content(syllabus)
-    return {"status": "success", "data": data}
+    data = await run_in_threadpool(service.generate_content, syllabus)
+    return json_response({"status": "success", "data": data}, compact=compact)
 
 @router.post("/upload")
-async def upload_syllabus(file: UploadFile = File(...)):
+async def upload_syllabus(file: UploadFile = File(...), compact: bool = False, syllabus_id: str = None):
     """
     Uploads a syllabus file (.pdf, .docx, .csv) and extracts its contents.
+    Parsing runs on the extraction pool so the event loop stays responsive;
+    a re-upload of the same bytes is answered from the extraction cache.
+    With syllabus_id the upload is stored as a new version of that syllabus
+    and lessons are generated for added / changed topics only; the response
+    adds the version and the topic delta. Pool capacity and the size limit
+    are checked before the body is read (api/middleware/upload_guard.py).
     """
     try:
-        text = service.upload_and_parse(file)
-        data = service.generate_content(text)
-        return {"status": "success", "data": data}
+        filepath, ext, digest = await run_in_threadpool(service.save_upload, file)
+        topics = await run_in_threadpool(service.cached_topics, digest)
+        if topics is None:
+            if ext == "pdf":
+                topics = await service.extract_topics_from_pdf_parallel(filepath, extraction_pool)
+            else:
+                topics = await extraction_pool.submit(service.extract_topics_from_file, filepath, ext)
+            await run_in_threadpool(service.cache_topics, digest, topics)
+        await run_in_threadpool(service.index_upload, digest, file.filename, topics)
+        if syllabus_id:
+            revision = await run_incremental(syllabus_id, Syllabus.from_topics(topics), labels=("Content Agent",))
+            data = revision.pop("workflow_results")["Content Agent"]
+            return json_response({"status": "success", **revision, "data": data}, compact=compact)
+        data = await run_in_threadpool(service.build_content, topics)
+        return json_response({"status": "success", "data": data}, compact=compact)
+    except service.UploadTooLarge as e:
+        return JSONResponse(status_code=413, content={"status": "error", "message": str(e)})
+    except PoolSaturated as e:
+        return JSONResponse(
+            status_code=503,
+            content={"status": "error", "message": str(e)},
+            headers={"Retry-After": str(e.retry_after)},
+        )
+    except ExtractionTimeout as e:
+        return JSONResponse(status_code=504, content={"status": "error", "message": str(e)})
     except Exception as e:
         return {"status": "error", "message": str(e)}
+
+@router.get("/upload/pool")
+async def upload_pool_stats():
+    """
+    Reports extraction pool load (pending, completed, rejected, timed out).
+    """
+    return {"status": "success", "data": extraction_pool.stats()}
@@ -3,16 +3,164 @@ agents/content_agent/service.py
 -------------------------------
 Content Agent: Handles academic content generation and syllabus extraction.
 Supports file uploads (.pdf, .docx, .csv) and text-based inputs.
+
+PyPDF2 and python-docx are imported on first use (or by preload_parsers()),
+so importing the agent stays cheap for text-only requests.
 """
 
 import os
+import re
+import json
+import mmap
+import hashlib
+import tempfile
+from contextlib import aclosing, contextmanager
 from datetime import datetime
 import csv
-import docx
-import PyPDF2
+from core.cache import get_cache, sha256_hex
+from core.generation import generator, prompt
+from core.models import Lesson, revive_list
+from core.syllabus import Syllabus
+from core.search_index import search_index
+from core.tracing import traced_agent
+
+UPLOAD_DIR = os.getenv("UPLOAD_DIR", "data/uploads/content_agent")
+SUPPORTED_EXTENSIONS = ("pdf", "docx", "csv")
+UPLOAD_MAX_BYTES = int(os.getenv("UPLOAD_MAX_BYTES", str(512 * 1024 * 1024)))
+UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_SIZE", str(1024 * 1024)))
+
+DEFAULT_TOPICS = ["Introduction", "Fundamentals", "Applications"]
+
+# Early topic detection: stop reading once TOPIC_BUDGET topics are found
+# (0 = read everything) or, for PDFs, once a table of contents has been read
+TOPIC_BUDGET = int(os.getenv("TOPIC_BUDGET", "0"))
+TOC_DETECTION = os.getenv("TOC_DETECTION", "1") == "1"
+
+# PDFs with at least this many pages are extracted in page ranges across the extraction pool
+PDF_PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", "64"))
+PDF_PAGES_PER_TASK = int(os.getenv("PDF_PAGES_PER_TASK", "16"))
+
+_TOC_HEADING = re.compile(r"^\s*(?:table of contents|contents)\s*$", re.IGNORECASE | re.MULTILINE)
+_TOC_ENTRY = re.compile(
+    r"^\s*(?:(?:chapter|unit|module|week)\s+)?(?:\d+(?:\.\d+)*\.?\s+)?"
+    r"(?P<title>[^\W\d][^\n]*?)\s*(?:\.{2,}|\u2026+|\s{2,})\s*\d+\s*$",
+    re.IGNORECASE | re.MULTILINE,
+)
+
+# Extracted text/topics keyed by upload SHA-256, and generated outputs keyed by input hash
+extraction_cache = get_cache("extraction")
+output_cache = get_cache("agent_outputs")
+
+
+class UploadTooLarge(ValueError):
+    """Raised when an upload exceeds UPLOAD_MAX_BYTES."""
+
+
+_INHERITABLE_PAGE_ATTRS = ("/Resources", "/MediaBox", "/CropBox", "/Rotate")
+
+
+def _iter_pdf_pages(reader):
+    """
+    Walks the PDF page tree lazily, in document order.
+    reader.pages flattens the whole tree up front and keeps every page
+    dictionary alive; this mirrors PdfReader._flatten one page at a time.
+    """
+    import PyPDF2
+
+    catalog = reader.trailer["/Root"].get_object()
+    stack = [(iter([catalog.raw_get("/Pages")]), {})]
+    while stack:
+        kids, inherited = stack[-1]
+        ref = next(kids, None)
+        if ref is None:
+            stack.pop()
+            continue
+        node = ref.get_object()
+        if node.get("/Type", "/Pages") == "/Pages":
+            inherited = dict(inherited)
+            for attr in _INHERITABLE_PAGE_ATTRS:
+                if attr in node:
+                    inherited[attr] = node[attr]
+            stack.append((iter(node["/Kids"]), inherited))
+        else:
+            for attr, value in inherited.items():
+                if attr not in node:
+                    node[PyPDF2.generic.NameObject(attr)] = value
+            page = PyPDF2.PageObject(reader, ref if isinstance(ref, PyPDF2.generic.IndirectObject) else None)
+            page.update(node)
+            yield page
+
+
+@contextmanager
+def _open_pdf(filepath):
+    """Opens a PDF through a read-only memory map (pages are read on demand)."""
+    import PyPDF2
+
+    with open(filepath, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            raise ValueError("Empty PDF file.")
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            yield PyPDF2.PdfReader(mapped)
+
+
+class TopicCollector:
+    """
+    Incremental topic extraction over text chunks (pages, rows, paragraphs).
+    Title-case words longer than 3 characters become topics; a word split
+    across two chunks is carried over.
+
+    feed() returns True once no more input is needed: `budget` topics have
+    been found (budget > 0), or — with toc=True — a table of contents was
+    read and the body after it has begun. The TOC entries then become the
+    topics.
+    """
+
+    def __init__(self, budget=0, toc=False):
+        self.budget = budget
+        self.toc = toc
+        self.seen = {}
+        self.toc_entries = {}
+        self.carry = ""
+        self.in_toc = False
+        self.done = False
+
+    def feed(self, chunk):
+        if self.done or not chunk:
+            return self.done
+        if self.toc and self._feed_toc(chunk):
+            self.done = True
+            return True
+        words = (self.carry + chunk).split()
+        self.carry = ""
+        if words and not chunk[-1].isspace():
+            self.carry = words.pop()
+        for word in words:
+            if word.istitle() and len(word) > 3:
+                self.seen[word] = None
+        if self.budget and len(self.seen) >= self.budget:
+            self.done = True
+        return self.done
 
-UPLOAD_DIR = "data/uploads/content_agent"
-os.makedirs(UPLOAD_DIR, exist_ok=True)
+    def _feed_toc(self, page):
+        entries = [m.group("title").strip() for m in _TOC_ENTRY.finditer(page)]
+        if entries and (self.in_toc or _TOC_HEADING.search(page)):
+            self.in_toc = True
+            for title in entries:
+                self.toc_entries[title] = None
+            return False
+        # First page after the contents: the TOC is complete
+        return self.in_toc
+
+    def topics(self):
+        if self.toc_entries:
+            return list(self.toc_entries)
+        seen = dict(self.seen)
+        if self.carry.istitle() and len(self.carry) > 3:
+            seen[self.carry] = None
+        topics = list(seen)
+        if self.budget:
+            topics = topics[:self.budget]
+        return topics or list(DEFAULT_TOPICS)
 
 
 class ContentAgent:
@@ -27,80 +175,305 @@ class ContentAgent:
     def handle_file_upload(self, file):
         """
         Saves the uploaded file locally and extracts text based on file type.
+        A re-upload of identical bytes is served from the extraction cache.
+        """
+        filepath, ext, digest = self.save_upload(file)
+        return extraction_cache.get_or_compute(f"text:{digest}", lambda: self.extract_text(filepath, ext))
+
+    def save_upload(self, file, max_bytes=UPLOAD_MAX_BYTES, chunk_size=UPLOAD_CHUNK_SIZE):
         """
-        filename = file.filename
-        filepath = os.path.join(UPLOAD_DIR, filename)
-        with open(filepath, "wb") as f:
-            f.write(file.file.read())
+        Streams the uploaded file to UPLOAD_DIR in fixed-size chunks and returns
+        (filepath, extension, sha256). Files are stored by content hash, so
+        identical uploads share one copy and same-named files never collide.
+        Memory use is one chunk regardless of file size.
+        """
+        ext = file.filename.split(".")[-1].lower()
+        if ext not in SUPPORTED_EXTENSIONS:
+            raise ValueError("Unsupported file type.")
+        hasher = hashlib.sha256()
+        written = 0
+        os.makedirs(UPLOAD_DIR, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=UPLOAD_DIR, suffix=".part")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                while True:
+                    chunk = file.file.read(chunk_size)
+                    if not chunk:
+                        break
+                    written += len(chunk)
+                    if written > max_bytes:
+                        raise UploadTooLarge(f"Upload exceeds {max_bytes} bytes.")
+                    hasher.update(chunk)
+                    f.write(chunk)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+        digest = hasher.hexdigest()
+        filepath = os.path.join(UPLOAD_DIR, f"{digest}.{ext}")
+        if os.path.exists(filepath):
+            os.remove(tmp_path)
+        else:
+            os.replace(tmp_path, filepath)
+        return filepath, ext, digest
 
-        ext = filename.split(".")[-1].lower()
+    def cached_topics(self, digest):
+        return extraction_cache.get(f"topics:{digest}")
+
+    def cache_topics(self, digest, topics):
+        return extraction_cache.set(f"topics:{digest}", topics)
+
+    def iter_text(self, filepath, ext):
+        """
+        Yields the text of a saved upload piece by piece (page / paragraph / row).
+        """
         if ext == "pdf":
-            text = self.extract_text_from_pdf(filepath)
+            return self.iter_text_from_pdf(filepath)
         elif ext == "docx":
-            text = self.extract_text_from_docx(filepath)
+            return self.iter_text_from_docx(filepath)
         elif ext == "csv":
-            text = self.extract_text_from_csv(filepath)
-        else:
-            raise ValueError("Unsupported file type.")
-        return text
+            return self.iter_text_from_csv(filepath)
+        raise ValueError("Unsupported file type.")
 
-    def extract_text_from_pdf(self, filepath):
-        text = ""
-        with open(filepath, "rb") as pdf:
-            reader = PyPDF2.PdfReader(pdf)
-            for page in reader.pages:
-                text += page.extract_text()
-        return text
+    def extract_text(self, filepath, ext):
+        return "".join(self.iter_text(filepath, ext))
+
+    def iter_text_from_pdf(self, filepath, start=0, stop=None):
+        """
+        Yields page texts lazily, in order, for pages [start, stop).
+        """
+        with _open_pdf(filepath) as reader:
+            for index, page in enumerate(_iter_pdf_pages(reader)):
+                if stop is not None and index >= stop:
+                    break
+                if index >= start:
+                    yield page.extract_text()
+                # PyPDF2 caches every resolved object (including decoded content
+                # streams); dropping the cache per page keeps memory flat.
+                reader.resolved_objects.clear()
+
+    def pdf_page_count(self, filepath):
+        with _open_pdf(filepath) as reader:
+            return int(reader.trailer["/Root"]["/Pages"]["/Count"])
+
+    def extract_pdf_pages(self, filepath, start, stop):
+        return list(self.iter_text_from_pdf(filepath, start, stop))
+
+    def iter_text_from_docx(self, filepath):
+        import docx
 
-    def extract_text_from_docx(self, filepath):
-        text = ""
         doc = docx.Document(filepath)
         for para in doc.paragraphs:
-            text += para.text + "\n"
-        return text
+            yield para.text + "\n"
 
-    def extract_text_from_csv(self, filepath):
-        text = ""
+    def iter_text_from_csv(self, filepath):
         with open(filepath, newline='', encoding="utf-8") as csvfile:
             reader = csv.reader(csvfile)
             for row in reader:
-                text += " ".join(row) + "\n"
-        return text
+                yield " ".join(row) + "\n"
+
+    def extract_text_from_pdf(self, filepath):
+        return "".join(self.iter_text_from_pdf(filepath))
+
+    def extract_text_from_docx(self, filepath):
+        return "".join(self.iter_text_from_docx(filepath))
+
+    def extract_text_from_csv(self, filepath):
+        return "".join(self.iter_text_from_csv(filepath))
+
+    def extract_topics_from_file(self, filepath, ext, budget=TOPIC_BUDGET):
+        """
+        Streams a saved upload straight into the topic extractor, so the full
+        document text is never held in memory. Reading stops early once the
+        topic budget or (PDF) table-of-contents heuristic is satisfied.
+        """
+        return self.extract_topics_from_stream(
+            self.iter_text(filepath, ext), budget=budget, toc=ext == "pdf" and TOC_DETECTION
+        )
+
+    async def extract_topics_from_pdf_parallel(self, filepath, pool, budget=TOPIC_BUDGET):
+        """
+        Extracts a PDF in page ranges of PDF_PAGES_PER_TASK across the pool's
+        workers, each worker opening the file itself. Ranges are consumed in
+        page order, so early topic detection still applies and cancels the
+        ranges not yet started. Short PDFs go through a single worker.
+        """
+        pages = await pool.submit(pdf_page_count, filepath)
+        if pages < PDF_PARALLEL_MIN_PAGES:
+            return await pool.submit(extract_topics_from_file, filepath, "pdf", budget)
+        ranges = [
+            (filepath, start, min(start + PDF_PAGES_PER_TASK, pages))
+            for start in range(0, pages, PDF_PAGES_PER_TASK)
+        ]
+        collector = TopicCollector(budget, toc=TOC_DETECTION)
+        async with aclosing(pool.imap(extract_pdf_pages, ranges)) as results:
+            async for texts in results:
+                if any(collector.feed(text) for text in texts):
+                    break
+        return collector.topics()
 
     # -------------------------
     # 🔹 Content Generation
     # -------------------------
-    def generate_content(self, syllabus_text: str):
+    def generate_content(self, syllabus):
         """
-        Converts raw syllabus text into structured lessons and topics.
+        Converts a syllabus (parsed Syllabus or raw text) into structured lessons and topics.
         """
-        topics = self.extract_topics(syllabus_text)
-        lessons = [
-            {"topic": t, "summary": f"Generated notes for {t}", "created_at": datetime.utcnow().isoformat()}
-            for t in topics
-        ]
+        topics = Syllabus.coerce(syllabus).topics
+        return self.build_content(topics or list(DEFAULT_TOPICS))
+
+    def build_content(self, topics):
+        """
+        Builds the lesson payload for an already extracted topic list.
+        Memoized on the topic list, so a repeated syllabus skips generation.
+        """
+        return output_cache.get_or_compute(
+            f"content:{sha256_hex(json.dumps(topics))}", lambda: self._build_content(topics), load=revive_content
+        )
+
+    def _build_content(self, topics):
+        summaries = generator.generate_many([prompt("lesson", topic=t) for t in topics])
+        now = datetime.utcnow()
+        lessons = [Lesson(t, summary, now) for t, summary in zip(topics, summaries)]
         result = {
             "agent": "ContentAgent",
-            "generated_on": datetime.utcnow().isoformat(),
+            "generated_on": now,
             "topics": topics,
             "lessons": lessons,
         }
+        search_index.add_many([
+            {
+                "kind": "lesson",
+                "text": f"{lesson.topic} {lesson.summary}",
+                "key": f"lesson:{lesson.topic.casefold()}",
+                "topics": [lesson.topic],
+                "data": lesson,
+            }
+            for lesson in lessons
+        ])
         return result
 
+    def index_upload(self, digest, filename, topics):
+        """
+        Adds an uploaded syllabus to the search index (once per content hash),
+        so its topics can be looked up later.
+        """
+        return search_index.add(
+            "syllabus",
+            " ".join([filename or ""] + list(topics)),
+            key=f"syllabus:{digest}",
+            topics=topics,
+            data={"digest": digest, "filename": filename, "topics": topics},
+        )
+
+    def select_topics(self, result, topics):
+        """
+        Restricts content generated for a larger syllabus to the given topics.
+        """
+        return self.merge_topics([result], topics)
+
+    def merge_topics(self, results, topics):
+        """
+        Content for the given topics from the lessons of several results
+        (e.g. a previous syllabus version and its newly added topics); a
+        later result's lesson wins for a topic present in more than one.
+        """
+        by_topic = {lesson.topic: lesson for result in results for lesson in result["lessons"]}
+        kept = [t for t in topics if t in by_topic]
+        return {**results[-1], "topics": kept, "lessons": [by_topic[t] for t in kept]}
+
+    def missing_topics(self, result, topics):
+        """Topics of the given list without a lesson in result."""
+        covered = {lesson.topic for lesson in result["lessons"]}
+        return [t for t in topics if t not in covered]
+
     def extract_topics(self, text: str):
         """
-        Simple mock — extracts Title-case words as topics.
+        Simple mock — extracts Title-case words as topics from free document text
+        (uploads). Delimited syllabus text is parsed by core.syllabus instead.
         """
-        words = text.split()
-        topics = list({word for word in words if word.istitle() and len(word) > 3})
-        return topics or ["Introduction", "Fundamentals", "Applications"]
+        return self.extract_topics_from_stream([text])
+
+    def extract_topics_from_stream(self, chunks, budget=0, toc=False):
+        """
+        Incremental form of extract_topics over an iterable of text chunks.
+        A word split across two chunks is carried over, so the result matches
+        running extract_topics on the concatenated text. With a budget or toc
+        the iterable is abandoned (and closed) as soon as topics are settled.
+        """
+        collector = TopicCollector(budget, toc)
+        chunks = iter(chunks)
+        try:
+            for chunk in chunks:
+                if collector.feed(chunk):
+                    break
+        finally:
+            close = getattr(chunks, "close", None)
+            if close is not None:
+                close()
+        return collector.topics()
+
+
+def revive_content(result):
+    """Rebuilds the Lesson models of a content payload read back from JSON."""
+    return {**result, "lessons": revive_list(Lesson, result["lessons"])}
 
 
 # Instantiate global agent
 agent = ContentAgent()
 
-def generate_content(syllabus_text: str):
-    return agent.generate_content(syllabus_text)
+@traced_agent("content")
+def generate_content(syllabus):
+    return agent.generate_content(syllabus)
+
+def build_content(topics):
+    return agent.build_content(topics)
+
+def select_topics(result, topics):
+    return agent.select_topics(result, topics)
+
+def merge_topics(results, topics):
+    return agent.merge_topics(results, topics)
+
+def missing_topics(result, topics):
+    return agent.missing_topics(result, topics)
 
 def upload_and_parse(file):
     return agent.handle_file_upload(file)
+
+def save_upload(file):
+    return agent.save_upload(file)
+
+def cached_topics(digest):
+    return agent.cached_topics(digest)
+
+def cache_topics(digest, topics):
+    return agent.cache_topics(digest, topics)
+
+def index_upload(digest, filename, topics):
+    return agent.index_upload(digest, filename, topics)
+
+def extract_topics_from_file(filepath, ext, budget=TOPIC_BUDGET):
+    """
+    Module-level entry point so the extraction pool can pickle it into worker processes.
+    """
+    return agent.extract_topics_from_file(filepath, ext, budget)
+
+def pdf_page_count(filepath):
+    return agent.pdf_page_count(filepath)
+
+def extract_pdf_pages(filepath, start, stop):
+    """
+    Worker entry point: texts of pages [start, stop) of a saved PDF.
+    """
+    return agent.extract_pdf_pages(filepath, start, stop)
+
+async def extract_topics_from_pdf_parallel(filepath, pool, budget=TOPIC_BUDGET):
+    return await agent.extract_topics_from_pdf_parallel(filepath, pool, budget)
+
+def preload_parsers():
+    """
+    Imports the PDF/DOCX parsers ahead of the first upload (startup warm-up,
+    or before the multi-worker launcher forks).
+    """
+    import docx  # noqa: F401
+    import PyPDF2  # noqa: F401
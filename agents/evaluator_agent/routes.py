@@ -4,8 +4,16 @@ agents/evaluator_agent/routes.py
 Routes for Evaluator Agent — handles auto-grading and answer evaluation.
 """
 
-from fastapi import APIRouter, Form
+import json
+from fastapi import APIRouter, File, Form, UploadFile
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse
 from agents.evaluator_agent import service
+from core.analytics import DEFAULT_COHORT
+from core.ingestion import AnswerFileTooLarge
+from core.jobs import job_queue
+from core.rubrics import UnknownRubric
+from core.scoring import SCORE_MAX, answer_format
 
 router = APIRouter()
 
@@ -18,5 +26,91 @@ async def evaluate_submission(syllabus: str = Form(...)):
     """
     Evaluates student responses automatically.
     """
-    data = service.evaluate_responses(syllabus)
+    data = await run_in_threadpool(service.evaluate_responses, syllabus)
+    return {"status": "success", "data": data}
+
+
+@router.post("/grade")
+async def grade_answers(
+    file: UploadFile = File(...),
+    weights: str = Form(None),
+    question_weights: str = Form(None),
+    max_score: float = Form(SCORE_MAX),
+    include_students: bool = Form(True),
+    rubric_id: str = Form(None),
+):
+    """
+    Grades a CSV/NDJSON answer file (student_id, question_id, one column per
+    rubric criterion). weights and question_weights are optional JSON objects,
+    e.g. {"knowledge": 0.4, "clarity": 0.3, "creativity": 0.3}. rubric_id
+    grades against a registered rubric template instead of weights.
+    """
+    try:
+        fmt = answer_format(file.filename, file.content_type or "")
+        weights = json.loads(weights) if weights else None
+        question_weights = json.loads(question_weights) if question_weights else None
+        body = await file.read()
+        data = await run_in_threadpool(
+            service.grade_answers, body, fmt, weights, question_weights, max_score, include_students, rubric_id
+        )
+        return {"status": "success", "data": data}
+    except UnknownRubric as e:
+        return JSONResponse(status_code=404, content={"status": "error", "message": f"Unknown rubric: {e.args[0]}"})
+    except (ValueError, TypeError) as e:
+        return JSONResponse(status_code=400, content={"status": "error", "message": str(e)})
+
+
+@router.post("/ingest", status_code=202)
+async def ingest_answers(
+    file: UploadFile = File(...),
+    weights: str = Form(None),
+    max_score: float = Form(SCORE_MAX),
+    rubric_id: str = Form(None),
+    cohort: str = Form(DEFAULT_COHORT),
+    topics: str = Form(None),
+    priority: int = Form(5),
+):
+    """
+    Queues a large CSV/NDJSON answer file (same columns as /grade) for
+    streaming ingestion: rows are validated, graded in batches and stored
+    per student, and fed to the analytics score store. topics is an optional
+    JSON object mapping question ids to topics. Poll status_url for
+    progress; results_url serves the stored grades.
+    """
+    try:
+        fmt = answer_format(file.filename, file.content_type or "")
+        weights = json.loads(weights) if weights else None
+        topics = json.loads(topics) if topics else None
+        payload = await run_in_threadpool(
+            service.prepare_ingestion, file, fmt, weights, max_score, rubric_id, cohort, topics
+        )
+    except UnknownRubric as e:
+        return JSONResponse(status_code=404, content={"status": "error", "message": f"Unknown rubric: {e.args[0]}"})
+    except AnswerFileTooLarge as e:
+        return JSONResponse(status_code=413, content={"status": "error", "message": str(e)})
+    except (ValueError, TypeError) as e:
+        return JSONResponse(status_code=400, content={"status": "error", "message": str(e)})
+    job_id = await job_queue.asubmit("answers", payload, priority=priority)
+    ingestion_id = payload["ingestion_id"]
+    return {
+        "status": "accepted",
+        "ingestion_id": ingestion_id,
+        "job_id": job_id,
+        "status_url": f"/jobs/{job_id}",
+        "result_url": f"/jobs/{job_id}/result",
+        "results_url": f"/evaluate/results/{ingestion_id}",
+    }
+
+@router.get("/results/{ingestion_id}")
+async def ingestion_results(ingestion_id: str):
+    data = await run_in_threadpool(service.ingestion_results, ingestion_id)
+    if data is None:
+        return JSONResponse(status_code=404, content={"status": "error", "message": "No results for this ingestion."})
+    return {"status": "success", "data": data}
+
+@router.get("/results/{ingestion_id}/students/{student_id}")
+async def student_result(ingestion_id: str, student_id: str):
+    data = await run_in_threadpool(service.student_result, ingestion_id, student_id)
+    if data is None:
+        return JSONResponse(status_code=404, content={"status": "error", "message": "Student not found in this ingestion."})
     return {"status": "success", "data": data}
@@ -5,6 +5,16 @@ Evaluator Agent: Grades answers using rubric-based logic.
 """
 
 from datetime import datetime
+from core.analytics import DEFAULT_COHORT
+from core.cache import get_cache, syllabus_key
+from core.ingestion import results_store, save_answer_file
+from core.syllabus import Syllabus
+from core.rubrics import rubric_registry, scoring_rubric
+from core.scoring import SCORE_MAX, grade, parse_answers
+from core.tracing import traced_agent
+
+# Generated outputs keyed by a hash of the syllabus text
+output_cache = get_cache("agent_outputs")
 
 class EvaluatorAgent:
     def __init__(self):
@@ -12,19 +22,115 @@ class EvaluatorAgent:
         self.goal = "Assess responses fairly using rubric-based logic."
         self.version = "v1.0"
 
-    def evaluate_responses(self, syllabus_text: str):
-        topics = [t.strip() for t in syllabus_text.split(",") if t.strip()]
+    def evaluate_responses(self, syllabus):
+        topics = Syllabus.coerce(syllabus).topics
         evaluations = {
             topic: f"Evaluation complete for {topic}" for topic in topics
         }
         return {
             "agent": "EvaluatorAgent",
-            "generated_on": datetime.utcnow().isoformat(),
+            "generated_on": datetime.utcnow(),
             "evaluations": evaluations
         }
 
+    def grade_answers(self, body, fmt="csv", weights=None, question_weights=None,
+                      max_score=SCORE_MAX, include_students=True, rubric_id=None):
+        """
+        Grades an uploaded answer file (CSV or NDJSON) against rubric weights
+        in one vectorized pass and returns cohort statistics.
+        rubric_id grades against a registered template (precompiled weights)
+        instead of weights, and the report references it.
+        """
+        rubric = scoring_rubric(weights, rubric_id)
+        sheet = parse_answers(body, rubric.criteria, fmt)
+        result = grade(sheet, rubric, question_weights, max_score)
+        report = {
+            "agent": "EvaluatorAgent",
+            "generated_on": datetime.utcnow(),
+            "rubric": rubric_registry.get(rubric_id).ref() if rubric_id else rubric.to_dict(),
+            "max_score": max_score,
+            "summary": result.summary(),
+        }
+        if include_students:
+            report["students"] = result.student_scores()
+        return report
+
+    def prepare_ingestion(self, file, fmt="csv", weights=None, max_score=SCORE_MAX, rubric_id=None,
+                          cohort=None, topics=None):
+        """
+        Checks the rubric and streams an uploaded answer file to disk; returns
+        the payload of the "answers" job that ingests it (core/ingestion.py).
+        """
+        scoring_rubric(weights, rubric_id)
+        if not max_score > 0:
+            raise ValueError("max_score must be positive.")
+        if topics is not None and not isinstance(topics, dict):
+            raise ValueError("topics must map question ids to topics.")
+        ingestion_id, path = save_answer_file(file)
+        return {
+            "ingestion_id": ingestion_id,
+            "path": path,
+            "fmt": fmt,
+            "weights": weights,
+            "rubric_id": rubric_id,
+            "max_score": max_score,
+            "cohort": cohort or DEFAULT_COHORT,
+            "topics": topics,
+        }
+
+    def ingestion_results(self, ingestion_id):
+        """Student count, answer count and grade distribution of an ingestion."""
+        return results_store.summary(ingestion_id)
+
+    def student_result(self, ingestion_id, student_id):
+        """One student's total, grade and per-question scores in an ingestion."""
+        return results_store.student(ingestion_id, student_id)
+
+    def select_topics(self, result, topics):
+        """
+        Restricts evaluations produced for a larger syllabus to the given topics.
+        """
+        return self.merge_topics([result], topics)
+
+    def merge_topics(self, results, topics):
+        """
+        Evaluations for the given topics from several results; a later
+        result's evaluation wins for a topic present in more than one.
+        """
+        evaluations = {t: e for result in results for t, e in result["evaluations"].items()}
+        return {**results[-1], "evaluations": {t: evaluations[t] for t in topics if t in evaluations}}
+
+    def missing_topics(self, result, topics):
+        """Topics of the given list without an evaluation in result."""
+        return [t for t in topics if t not in result["evaluations"]]
+
 # Global instance
 agent = EvaluatorAgent()
 
-def evaluate_responses(syllabus_text: str):
-    return agent.evaluate_responses(syllabus_text)
+@traced_agent("evaluator")
+@output_cache.memoize("evaluation", key_fn=syllabus_key)
+def evaluate_responses(syllabus):
+    return agent.evaluate_responses(syllabus)
+
+@traced_agent("evaluator_grading")
+def grade_answers(body, fmt="csv", weights=None, question_weights=None,
+                  max_score=SCORE_MAX, include_students=True, rubric_id=None):
+    return agent.grade_answers(body, fmt, weights, question_weights, max_score, include_students, rubric_id)
+
+def prepare_ingestion(file, fmt="csv", weights=None, max_score=SCORE_MAX, rubric_id=None, cohort=None, topics=None):
+    return agent.prepare_ingestion(file, fmt, weights, max_score, rubric_id, cohort, topics)
+
+def ingestion_results(ingestion_id):
+    return agent.ingestion_results(ingestion_id)
+
+def student_result(ingestion_id, student_id):
+    return agent.student_result(ingestion_id, student_id)
+
+def select_topics(result, topics):
+    return agent.select_topics(result, topics)
+
+def merge_topics(results, topics):
+    return agent.merge_topics(results, topics)
+
+def missing_topics(result, topics):
+    return agent.missing_topics(result, topics)
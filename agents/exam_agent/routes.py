@@ -5,7 +5,10 @@ Routes for Exam Agent — handles question paper and quiz generation.
 """
 
 from fastapi import APIRouter, Form
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse
 from agents.exam_agent import service
+from api.http_cache import http_cache
 
 router = APIRouter()
 
@@ -14,9 +17,30 @@ async def exam_root():
     return {"agent": "Exam Agent", "status": "active"}
 
 @router.post("/create")
-async def create_exam(syllabus: str = Form(...)):
+@http_cache.cached()
+async def create_exam(syllabus: str = Form(...), merge_duplicates: bool = Form(None)):
     """
     Generates exam questions and assignments based on syllabus.
+    merge_duplicates asks one question per group of near-duplicate topics.
     """
-    data = service.generate_exam(syllabus)
+    data = await run_in_threadpool(service.generate_exam, syllabus, merge_duplicates)
     return {"status": "success", "data": data}
+
+@router.post("/assemble")
+@http_cache.cached()
+async def assemble_exam(
+    syllabus: str = Form(...),
+    total_marks: int = Form(None),
+    max_questions: int = Form(None),
+    mix: str = Form(None),
+):
+    """
+    Assembles a diverse exam: near-duplicate topics merged, one question per
+    topic, difficulty shares per mix (e.g. easy=0.3,medium=0.5,hard=0.2)
+    within the optional marks budget and question count.
+    """
+    try:
+        data = await run_in_threadpool(service.assemble_exam, syllabus, total_marks, max_questions, mix)
+        return {"status": "success", "data": data}
+    except ValueError as e:
+        return JSONResponse(status_code=400, content={"status": "error", "message": str(e)})
@@ -4,7 +4,28 @@ agents/exam_agent/service.py
 Exam Agent: Generates questions, quizzes, and viva prompts from syllabus.
 """
 
+import os
 from datetime import datetime
+from core.cache import get_cache, syllabus_key
+from core.exam_assembly import EXAM_DIFFICULTY_MIX, assemble, merge_near_duplicates, parse_mix
+from core.generation import generator, prompt
+from core.models import Question, revive, revive_list
+from core.syllabus import Syllabus
+from core.search_index import search_index
+from core.tracing import traced_agent
+
+# Generated outputs keyed by a hash of the syllabus text
+output_cache = get_cache("agent_outputs")
+
+# Merge near-duplicate topics in /exam/create (and the workflow) unless the caller says otherwise
+EXAM_MERGE_DUPLICATES = os.getenv("EXAM_MERGE_DUPLICATES", "0") == "1"
+
+# Difficulty level -> (prompt kind, marks) of the questions in an assembly pool
+QUESTION_LEVELS = {
+    "easy": ("recall_question", 5),
+    "medium": ("question", 10),
+    "hard": ("analysis_question", 15),
+}
 
 class ExamAgent:
     def __init__(self):
@@ -12,25 +33,137 @@ class ExamAgent:
         self.goal = "Create fair and diverse academic evaluations."
         self.version = "v1.0"
 
-    def generate_exam(self, syllabus_text: str):
+    def generate_exam(self, syllabus, merge_duplicates=False):
         """
-        Generates exam questions from syllabus topics.
+        Generates exam questions from syllabus topics, one per topic or, with
+        merge_duplicates, one per group of near-duplicate topics
+        ("Neural Nets" / "neural networks").
+        Accepts a parsed Syllabus or raw syllabus text.
         """
-        topics = [t.strip() for t in syllabus_text.split(",") if t.strip()]
-        questions = [
-            {"question": f"Explain the core concepts of {topic}.", "marks": 10}
-            for topic in topics
-        ]
+        topics = Syllabus.coerce(syllabus).topics
+        topics, merged = merge_near_duplicates(topics) if merge_duplicates else (topics, {})
+        # Questions already in the search index are reused; only new topics
+        # get a question generated (and indexed for next time)
+        existing = search_index.find_topics(topics, kind="question", limit=1)
+        missing = [t for t in topics if t not in existing]
+        generated = dict(zip(missing, generator.generate_many([prompt("question", topic=t) for t in missing])))
+        questions, fresh = [], []
+        for topic in topics:
+            if topic in existing:
+                found = revive(Question, existing[topic][0]["data"])
+                questions.append(Question(topic, found.question, found.marks, found.difficulty))
+                continue
+            question = Question(topic, generated[topic], 10)
+            questions.append(question)
+            fresh.append({
+                "kind": "question",
+                "text": f"{topic} {question.question}",
+                "key": f"question:{topic.casefold()}",
+                "topics": [topic],
+                "data": question,
+            })
+        search_index.add_many(fresh)
         result = {
             "agent": "ExamAgent",
-            "generated_on": datetime.utcnow().isoformat(),
+            "generated_on": datetime.utcnow(),
             "questions": questions,
-            "total_questions": len(questions)
+            "total_questions": len(questions),
+            "reused_questions": len(questions) - len(fresh),
+            "merged_topics": merged,
         }
         return result
 
+    def assemble_exam(self, syllabus, total_marks=None, max_questions=None, mix=None):
+        """
+        Builds a pool of one question per difficulty level for every distinct
+        topic and selects a diverse exam from it (core/exam_assembly.py):
+        one question per topic, difficulty shares per mix, within the marks
+        budget and question count when given.
+        """
+        topics, merged = merge_near_duplicates(Syllabus.coerce(syllabus).topics)
+        shares = parse_mix(mix if mix is not None else EXAM_DIFFICULTY_MIX)
+        unknown = set(shares) - set(QUESTION_LEVELS)
+        if unknown:
+            raise ValueError(f"Unknown difficulty: {', '.join(sorted(unknown))}. Use {', '.join(QUESTION_LEVELS)}.")
+        slots = [(t, d) for t in topics for d in shares]
+        texts = generator.generate_many([prompt(QUESTION_LEVELS[d][0], topic=t) for t, d in slots])
+        pool = [Question(t, text, QUESTION_LEVELS[d][1], d) for (t, d), text in zip(slots, texts)]
+        selection = assemble(pool, total_marks, max_questions, shares, dedupe=False)
+        return {
+            "agent": "ExamAgent",
+            "generated_on": datetime.utcnow(),
+            **selection,
+            "merged_topics": merged,
+        }
+
+    def select_topics(self, result, topics):
+        """
+        Restricts an exam generated for a larger syllabus to the given topics.
+        """
+        return self.merge_topics([result], topics)
+
+    def merge_topics(self, results, topics):
+        """
+        An exam for the given topics from the questions of several results
+        (e.g. a previous syllabus version and its newly added topics); a
+        later result's question wins for a topic present in more than one.
+        """
+        by_topic = {q.topic: q for result in results for q in result["questions"]}
+        # Topics merged into a near-duplicate are answered by its question
+        alias = {
+            d: kept for result in results for kept, dupes in result.get("merged_topics", {}).items() for d in dupes
+        }
+        questions, seen, merged = [], set(), {}
+        for t in topics:
+            question = by_topic.get(t) or by_topic.get(alias.get(t))
+            if question is None:
+                continue
+            if question.topic != t:
+                merged.setdefault(question.topic, []).append(t)
+            if question.topic not in seen:
+                seen.add(question.topic)
+                questions.append(question)
+        return {
+            **results[-1], "questions": questions, "total_questions": len(questions), "merged_topics": merged,
+        }
+
+    def missing_topics(self, result, topics):
+        """
+        Topics of the given list that result has no question for. A topic
+        merged into a near-duplicate counts only while that near-duplicate
+        is itself in the list.
+        """
+        wanted = set(topics)
+        covered = {q.topic for q in result["questions"]}
+        alias = {d: kept for kept, dupes in result.get("merged_topics", {}).items() for d in dupes}
+        return [t for t in topics if t not in covered and not (alias.get(t) in covered and alias[t] in wanted)]
+
+def revive_exam(result):
+    """Rebuilds the Question models of an exam read back from JSON."""
+    return {**result, "questions": revive_list(Question, result["questions"])}
+
 # Global instance
 agent = ExamAgent()
 
-def generate_exam(syllabus_text: str):
-    return agent.generate_exam(syllabus_text)
+@output_cache.memoize("exam", key_fn=syllabus_key, load=revive_exam)
+def _generate_exam(syllabus, merge_duplicates):
+    return agent.generate_exam(syllabus, merge_duplicates)
+
+@traced_agent("exam")
+def generate_exam(syllabus, merge_duplicates=None):
+    """merge_duplicates defaults to EXAM_MERGE_DUPLICATES."""
+    return _generate_exam(syllabus, EXAM_MERGE_DUPLICATES if merge_duplicates is None else bool(merge_duplicates))
+
+@traced_agent("exam")
+@output_cache.memoize("exam_assembly", key_fn=syllabus_key, load=revive_exam)
+def assemble_exam(syllabus, total_marks=None, max_questions=None, mix=None):
+    return agent.assemble_exam(syllabus, total_marks, max_questions, mix)
+
+def select_topics(result, topics):
+    return agent.select_topics(result, topics)
+
+def merge_topics(results, topics):
+    return agent.merge_topics(results, topics)
+
+def missing_topics(result, topics):
+    return agent.missing_topics(result, topics)
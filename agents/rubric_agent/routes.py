@@ -4,8 +4,14 @@ agents/rubric_agent/routes.py
 Routes for Rubric Agent — defines evaluation criteria for assignments and exams.
 """
 
+import json
 from fastapi import APIRouter, Form
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse
 from agents.rubric_agent import service
+from api.http_cache import http_cache
+from api.responses import json_response
+from core.rubrics import UnknownRubric, rubric_registry
 
 router = APIRouter()
 
@@ -14,9 +20,50 @@ async def rubric_root():
     return {"agent": "Rubric Agent", "status": "active"}
 
 @router.post("/design")
-async def design_rubric(syllabus: str = Form(...)):
+@http_cache.cached()
+async def design_rubric(syllabus: str = Form(...), compact: bool = False, expand: bool = False):
     """
     Designs grading and evaluation rubrics for syllabus topics.
+    The rubric is referenced by id; expand=true also inlines the template.
     """
-    data = service.design_rubric(syllabus)
-    return {"status": "success", "data": data}
+    data = await run_in_threadpool(service.design_rubric, syllabus, expand)
+    return json_response({"status": "success", "data": data}, compact=compact)
+
+# Templates are immutable, so a fetched one never needs revalidating
+_IMMUTABLE = {"Cache-Control": "public, max-age=31536000, immutable"}
+
+@router.get("/templates")
+async def list_templates(name: str = None):
+    """
+    Registered rubric templates (all versions), optionally of one name.
+    """
+    templates = await run_in_threadpool(rubric_registry.templates, name)
+    return {"status": "success", "data": [t.to_dict() for t in templates]}
+
+@router.post("/templates")
+async def register_template(name: str = Form(...), criteria: str = Form(...), weights: str = Form(None)):
+    """
+    Registers a rubric template. criteria is a JSON object of
+    {criterion: description}; weights an optional JSON object of
+    {criterion: weight} (equal weights when omitted). Registering an
+    identical rubric returns the existing template; new criteria under an
+    existing name become its next version.
+    """
+    try:
+        criteria = json.loads(criteria)
+        weights = json.loads(weights) if weights else None
+        template = await run_in_threadpool(rubric_registry.register, name, criteria, weights)
+        return {"status": "success", "data": template.to_dict()}
+    except (ValueError, TypeError) as e:
+        return JSONResponse(status_code=400, content={"status": "error", "message": str(e)})
+
+@router.get("/templates/{rubric_id}")
+async def get_template(rubric_id: str):
+    """
+    One rubric template by id (as referenced from rubric responses).
+    """
+    try:
+        template = await run_in_threadpool(rubric_registry.get, rubric_id)
+    except UnknownRubric:
+        return JSONResponse(status_code=404, content={"status": "error", "message": f"Unknown rubric: {rubric_id}"})
+    return json_response({"status": "success", "data": template.to_dict()}, headers=_IMMUTABLE)
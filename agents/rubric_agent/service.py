@@ -2,30 +2,57 @@
 agents/rubric_agent/service.py
 ------------------------------
 Rubric Agent: Designs evaluation rubrics for objective grading.
+
+Rubrics are immutable templates in the rubric registry (core/rubrics.py).
+The standard template is built and interned once; responses reference it by
+id instead of repeating its criteria (fetch it from /rubric/templates/{id}).
 """
 
+import threading
 from datetime import datetime
+from core.generation import generator, prompt
+from core.rubrics import rubric_registry
+from core.tracing import traced_agent
+
+STANDARD_RUBRIC = "standard"
+STANDARD_CRITERIA = ("Knowledge", "Clarity", "Creativity", "Application")
 
 class RubricAgent:
     def __init__(self):
         self.role = "Rubric Architect"
         self.goal = "Define fair and transparent evaluation criteria."
         self.version = "v1.0"
+        self._standard = None
+        self._lock = threading.Lock()
 
-    def design_rubric(self, syllabus_text: str):
-        criteria = ["Knowledge", "Clarity", "Creativity", "Application"]
-        rubric = {
-            c: f"Evaluate {c.lower()} level for each student submission." for c in criteria
-        }
-        return {
+    def standard_template(self):
+        """The standard rubric template, generated and registered on first use."""
+        with self._lock:
+            if self._standard is None:
+                descriptions = generator.generate_many(
+                    [prompt("criterion", criterion=c.lower()) for c in STANDARD_CRITERIA]
+                )
+                self._standard = rubric_registry.register(STANDARD_RUBRIC, dict(zip(STANDARD_CRITERIA, descriptions)))
+            return self._standard
+
+    def design_rubric(self, syllabus, expand=False):
+        """
+        The standard rubric applies to every syllabus; syllabus is accepted
+        for the common agent interface.
+        """
+        template = self.standard_template()
+        result = {
             "agent": "RubricAgent",
-            "generated_on": datetime.utcnow().isoformat(),
-            "criteria": rubric,
-            "syllabus": syllabus_text
+            "generated_on": datetime.utcnow(),
+            "rubric": template.ref(),
         }
+        if expand:
+            result["template"] = template.to_dict()
+        return result
 
 # Global instance
 agent = RubricAgent()
 
-def design_rubric(syllabus_text: str):
-    return agent.design_rubric(syllabus_text)
+@traced_agent("rubric")
+def design_rubric(syllabus, expand=False):
+    return agent.design_rubric(syllabus, expand)
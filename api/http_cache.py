@@ -0,0 +1,296 @@
+"""
+api/http_cache.py
+-----------------
+HTTP-layer response cache for deterministic agent routes (per-route opt-in).
+
+    @router.post("/create")
+    @http_cache.cached()
+    async def create_exam(syllabus: str = Form(...)): ...
+
+A decorated route is keyed by method + path + a hash of its normalized
+inputs. A syllabus is normalized to its parsed topic list, so whitespace,
+separators and repeated topics do not produce new entries.
+  • repeated requests are answered from memory (X-Cache: HIT)
+  • every response carries a weak ETag; If-None-Match returns 304
+  • concurrent identical requests share one computation (X-Cache: COALESCED)
+  • an Idempotency-Key header dedupes retries of one logical request: requests
+    in flight with that key wait for the first, and later ones replay its
+    response (X-Cache: REPLAY). Reusing a key with other inputs is a 422.
+
+Entries expire after HTTP_CACHE_TTL seconds and are evicted least-recently-used
+beyond HTTP_CACHE_MAX_BYTES / HTTP_CACHE_MAX_ENTRIES. Idempotency records live
+in a store of their own (IDEMPOTENCY_MAX_BYTES / IDEMPOTENCY_MAX_ENTRIES), so
+response churn cannot evict them before IDEMPOTENCY_TTL. The cache is per
+process; the agent output caches underneath are shared between workers.
+"""
+
+import asyncio
+import inspect
+import json
+import os
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from fastapi import Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+
+from api.responses import FastJSONResponse
+from core.cache import sha256_hex
+from core.syllabus import Syllabus
+
+HTTP_CACHE_TTL = float(os.getenv("HTTP_CACHE_TTL", "300"))
+HTTP_CACHE_MAX_BYTES = int(os.getenv("HTTP_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+HTTP_CACHE_MAX_ENTRIES = int(os.getenv("HTTP_CACHE_MAX_ENTRIES", "10000"))
+IDEMPOTENCY_TTL = float(os.getenv("IDEMPOTENCY_TTL", "3600"))
+IDEMPOTENCY_MAX_BYTES = int(os.getenv("IDEMPOTENCY_MAX_BYTES", str(16 * 1024 * 1024)))
+IDEMPOTENCY_MAX_ENTRIES = int(os.getenv("IDEMPOTENCY_MAX_ENTRIES", "10000"))
+
+# Name of the Request parameter added to decorated endpoints that lack one
+_REQUEST_PARAM = "_http_cache_request"
+# Response headers kept with a cached body
+_KEPT_HEADERS = ("content-type", "content-language")
+
+
+def syllabus_topics(text):
+    """Normalizer: syllabus text -> its topic list."""
+    return Syllabus.parse(text).topics
+
+
+DEFAULT_NORMALIZERS = {"syllabus": syllabus_topics}
+
+
+class CachedResponse:
+    __slots__ = ("key", "body", "status_code", "headers", "etag", "expires", "size")
+
+    def __init__(self, key, body, status_code, headers, ttl):
+        self.key = key
+        self.body = body
+        self.status_code = status_code
+        self.headers = headers
+        self.etag = f'W/"{sha256_hex(body)[:32]}"'
+        self.expires = time.monotonic() + ttl
+        self.size = len(body) + len(key)
+
+
+def etag_matches(if_none_match, etag):
+    """Weak comparison of an If-None-Match header against etag."""
+    if not if_none_match:
+        return False
+    bare = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == bare:
+            return True
+    return False
+
+
+class ResponseStore:
+    """LRU of CachedResponse bounded by total bytes and entry count, with per-entry expiry."""
+
+    def __init__(self, max_bytes=HTTP_CACHE_MAX_BYTES, max_entries=HTTP_CACHE_MAX_ENTRIES):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> CachedResponse
+        self._bytes = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires <= time.monotonic():
+            self._drop(key)
+            self.expirations += 1
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def put(self, key, entry):
+        if key in self._entries:
+            self._drop(key)
+        if entry.size > self.max_bytes:
+            return
+        self._entries[key] = entry
+        self._bytes += entry.size
+        while self._bytes > self.max_bytes or len(self._entries) > self.max_entries:
+            self._drop(next(iter(self._entries)))
+            self.evictions += 1
+
+    def _drop(self, key):
+        self._bytes -= self._entries.pop(key).size
+
+    def clear(self):
+        self._entries.clear()
+        self._bytes = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def bytes(self):
+        return self._bytes
+
+
+class HTTPCache:
+    def __init__(self, ttl=HTTP_CACHE_TTL, idempotency_ttl=IDEMPOTENCY_TTL, store=None, idempotency=None):
+        self.ttl = ttl
+        self.idempotency_ttl = idempotency_ttl
+        self.store = store if store is not None else ResponseStore()
+        # Idempotency records: kept apart so cached responses never evict them
+        self.idempotency = idempotency if idempotency is not None else ResponseStore(
+            IDEMPOTENCY_MAX_BYTES, IDEMPOTENCY_MAX_ENTRIES
+        )
+        self._inflight = {}  # key -> Future[CachedResponse | None]
+        self.counters = dict.fromkeys(("hits", "misses", "not_modified", "coalesced", "replays", "conflicts"), 0)
+
+    # -------------------------
+    # 🔹 Keys
+    # -------------------------
+    @staticmethod
+    def _key(request, inputs, normalizers):
+        normalized = {
+            name: normalizers[name](value) if name in normalizers and value is not None else value
+            for name, value in inputs.items()
+        }
+        digest = sha256_hex(json.dumps(normalized, sort_keys=True, default=str))
+        return f"{request.method} {request.url.path}:{digest}"
+
+    # -------------------------
+    # 🔹 Responses
+    # -------------------------
+    def _entry(self, key, response, ttl):
+        """CachedResponse for an endpoint's return value, or None when it cannot be replayed."""
+        if not isinstance(response, Response):
+            response = FastJSONResponse(response)
+        if isinstance(response, StreamingResponse) or response.background is not None:
+            return None
+        headers = {k: v for k, v in response.headers.items() if k in _KEPT_HEADERS}
+        return CachedResponse(key, bytes(response.body), response.status_code, headers, ttl)
+
+    def _respond(self, entry, request, outcome):
+        headers = {"ETag": entry.etag, "Cache-Control": "private, no-cache", "X-Cache": outcome}
+        if entry.status_code == 200 and etag_matches(request.headers.get("if-none-match"), entry.etag):
+            self.counters["not_modified"] += 1
+            return Response(status_code=304, headers=headers)
+        return Response(entry.body, status_code=entry.status_code, headers={**entry.headers, **headers})
+
+    def _conflict(self):
+        self.counters["conflicts"] += 1
+        return JSONResponse(status_code=422, content={
+            "status": "error", "message": "Idempotency-Key was already used with different request inputs.",
+        })
+
+    # -------------------------
+    # 🔹 Decorator
+    # -------------------------
+    def cached(self, ttl=None, normalize=None, ignore=()):
+        """
+        Opts a route in. ttl overrides HTTP_CACHE_TTL; normalize maps parameter
+        names to functions applied before hashing (added to the syllabus
+        default); parameters in ignore do not take part in the key.
+        """
+        ttl = self.ttl if ttl is None else ttl
+        normalizers = {**DEFAULT_NORMALIZERS, **(normalize or {})}
+
+        def decorator(fn):
+            signature = inspect.signature(fn)
+            request_param = next(
+                (p.name for p in signature.parameters.values() if p.annotation is Request), None
+            )
+            parameters = list(signature.parameters.values())
+            if request_param is None:
+                request_param = _REQUEST_PARAM
+                parameters.append(inspect.Parameter(_REQUEST_PARAM, inspect.Parameter.KEYWORD_ONLY, annotation=Request))
+            is_async = asyncio.iscoroutinefunction(fn)
+
+            @wraps(fn)
+            async def wrapper(*args, **kwargs):
+                request = kwargs[request_param]
+                if request_param == _REQUEST_PARAM:
+                    del kwargs[_REQUEST_PARAM]
+                inputs = {k: v for k, v in kwargs.items() if k != request_param and k not in ignore}
+                key = self._key(request, inputs, normalizers)
+                idempotency_key = request.headers.get("idempotency-key")
+                record_key = f"idempotency:{request.url.path}:{idempotency_key}" if idempotency_key else None
+
+                if record_key is not None:
+                    record = self.idempotency.get(record_key)
+                    if record is not None:
+                        if record.key != key:
+                            return self._conflict()
+                        self.counters["replays"] += 1
+                        return self._respond(record, request, "REPLAY")
+
+                entry = self.store.get(key)
+                if entry is not None:
+                    self.counters["hits"] += 1
+                    return self._respond(entry, request, "HIT")
+
+                flight = record_key or key
+                pending = self._inflight.get(flight)
+                if pending is not None:
+                    entry = await asyncio.shield(pending)
+                    if entry is not None:
+                        if entry.key != key:
+                            return self._conflict()
+                        self.counters["coalesced"] += 1
+                        return self._respond(entry, request, "COALESCED")
+                    # The first request failed; compute independently below
+
+                self.counters["misses"] += 1
+                future = asyncio.get_running_loop().create_future()
+                if pending is None:
+                    self._inflight[flight] = future
+                entry = None
+                try:
+                    response = await fn(*args, **kwargs) if is_async else await run_in_threadpool(fn, *args, **kwargs)
+                    entry = self._entry(key, response, ttl)
+                    if entry is None:
+                        return response
+                    if entry.status_code == 200:
+                        self.store.put(key, entry)
+                    if record_key is not None and entry.status_code < 500:
+                        record = CachedResponse(key, entry.body, entry.status_code, entry.headers, self.idempotency_ttl)
+                        self.idempotency.put(record_key, record)
+                    return self._respond(entry, request, "MISS")
+                finally:
+                    future.set_result(entry)
+                    if self._inflight.get(flight) is future:
+                        del self._inflight[flight]
+
+            wrapper.__signature__ = signature.replace(parameters=parameters)
+            return wrapper
+        return decorator
+
+    def stats(self):
+        return {
+            **self.counters,
+            "entries": len(self.store),
+            "bytes": self.store.bytes,
+            "max_bytes": self.store.max_bytes,
+            "evictions": self.store.evictions,
+            "expirations": self.store.expirations,
+            "inflight": len(self._inflight),
+            "idempotency": {
+                "entries": len(self.idempotency),
+                "bytes": self.idempotency.bytes,
+                "max_bytes": self.idempotency.max_bytes,
+                "evictions": self.idempotency.evictions,
+                "expirations": self.idempotency.expirations,
+            },
+        }
+
+    def clear(self):
+        self.store.clear()
+        self.idempotency.clear()
+
+
+# Shared instance used by the agent routers
+http_cache = HTTPCache()
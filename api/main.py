@@ -7,16 +7,12 @@ Asynchronous multi-agent orchestration for Brok AI Academic Agent System.
 # ==========================================================
 # ✅ IMPORTS
 # ==========================================================
-from fastapi import FastAPI
-
-app = FastAPI()
-
-@app.get("/health")
-def health():
-    return {"status": "ok"}
 import sys, os, asyncio
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, StreamingResponse, PlainTextResponse
 
 # --- Fix path for Colab ---
 ROOT_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
@@ -31,14 +27,61 @@ from agents.exam_agent.routes import router as exam_router
 from agents.rubric_agent.routes import router as rubric_router
 from agents.evaluator_agent.routes import router as evaluator_router
 from agents.analytics_agent.routes import router as analytics_router
+from agents.content_agent import service as content_service
+from core.extraction_pool import extraction_pool
+from core.cache import cache_stats
+from core.syllabus import Syllabus
+from core.batch import BATCH_CONCURRENCY, parse_batch_body, run_batch
+from core.incremental import run_incremental
+from core.syllabus_versions import UnknownSyllabus, syllabus_versions
+from core.jobs import job_queue, QUEUED, RUNNING, FAILED
+from core.workflow import STAGE_LABELS, run_agent_workflow, stream_agent_workflow
+from core.agent_executor import agent_executor
+from core.tracing import render_metrics
+from core.search_index import search_index
+from core.rubrics import rubric_registry
+from core.ingestion import results_store
+from core.generation import generator
+from api.middleware.logging import RequestLogger
+from api.middleware.compression import CompressionMiddleware
+from api.middleware.upload_guard import UploadGuard
+from api.http_cache import http_cache
+from api.responses import FastJSONResponse, dumps, json_response, compact_payload
+
+# Import the upload parsers in the background once the app is serving
+STARTUP_WARMUP = os.getenv("STARTUP_WARMUP", "1") == "1"
+# Most records /search/topics/{topic} returns per request
+SEARCH_TOPIC_MAX_LIMIT = int(os.getenv("SEARCH_TOPIC_MAX_LIMIT", "500"))
 
 # ==========================================================
 # ✅ FASTAPI APP INIT
 # ==========================================================
+@asynccontextmanager
+async def lifespan(app):
+    """
+    Startup does only what the first request needs (the job queue); warm-up
+    of the parsers runs in a thread so it never delays /health.
+    """
+    await job_queue.start()
+    warmup = asyncio.create_task(asyncio.to_thread(content_service.preload_parsers)) if STARTUP_WARMUP else None
+    yield
+    if warmup is not None:
+        await asyncio.gather(warmup, return_exceptions=True)
+    extraction_pool.shutdown()
+    await job_queue.stop()
+    agent_executor.shutdown()
+    search_index.close()
+    rubric_registry.close()
+    syllabus_versions.close()
+    results_store.close()
+    generator.close()
+
 app = FastAPI(
     title="Brok AI Academic Agent System",
     description="Asynchronous AI-based academic automation framework with multi-agent architecture.",
-    version="3.0"
+    version="3.0",
+    default_response_class=FastJSONResponse,
+    lifespan=lifespan,
 )
 
 app.add_middleware(
@@ -48,6 +91,9 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(UploadGuard)
+app.add_middleware(CompressionMiddleware)
+app.add_middleware(RequestLogger)
 
 # Register all routers
 app.include_router(content_router, prefix="/content", tags=["Content Agent"])
@@ -74,63 +120,232 @@ async def root():
 async def health():
     return {"status": "ok", "uptime": "active", "mode": "async", "version": "3.0"}
 
+@app.get("/metrics")
+async def get_metrics():
+    """
+    Prometheus text exposition: latency histograms per route, stage and agent.
+    """
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+@app.get("/cache/stats")
+async def get_cache_stats():
+    """
+    Hit/miss counters for every extraction and agent-output cache, plus the
+    HTTP response cache of the opted-in agent routes.
+    """
+    return {"status": "success", "data": {**cache_stats(), "http_responses": http_cache.stats()}}
+
 # ==========================================================
-# ✅ ASYNC AGENT ORCHESTRATION
+# ✅ SEARCH
 # ==========================================================
-async def run_content_agent(syllabus):
-    from agents.content_agent import service
-    return {"Content Agent": service.generate_content(syllabus)}
+@app.get("/search")
+async def search(q: str = "", kind: str = None, topic: str = None, limit: int = 10):
+    """
+    Term and "quoted phrase" search over indexed syllabi, lessons and exam
+    questions; every term must match. kind / topic narrow the results.
+    """
+    results = await run_in_threadpool(search_index.search, q, kind, topic, limit)
+    return {"status": "success", "data": results}
 
-async def run_exam_agent(syllabus):
-    from agents.exam_agent import service
-    return {"Exam Agent": service.generate_exam(syllabus)}
+@app.get("/search/topics/{topic}")
+async def search_topic(topic: str, kind: str = None, limit: int = 50):
+    """
+    Records indexed under a topic (uploaded syllabi, lessons, questions),
+    oldest first; limit is capped at SEARCH_TOPIC_MAX_LIMIT.
+    """
+    limit = min(max(limit, 1), SEARCH_TOPIC_MAX_LIMIT)
+    found = await run_in_threadpool(search_index.find_topics, [topic], kind, limit)
+    return {"status": "success", "data": found.get(topic, [])}
+
+@app.get("/search/stats")
+async def search_stats():
+    return {"status": "success", "data": search_index.stats()}
+
+# ==========================================================
+# ✅ SYLLABUS VERSIONS
+# ==========================================================
+@app.get("/syllabus/{syllabus_id}/versions")
+async def list_syllabus_versions(syllabus_id: str):
+    """
+    Stored versions of a syllabus with the topic delta of each revision.
+    """
+    try:
+        versions = await run_in_threadpool(syllabus_versions.versions, syllabus_id)
+    except UnknownSyllabus:
+        return JSONResponse(status_code=404, content={"status": "error", "message": "Syllabus not found."})
+    return {"status": "success", "data": [v.to_dict() for v in versions]}
 
-async def run_rubric_agent(syllabus):
-    from agents.rubric_agent import service
-    return {"Rubric Agent": service.design_rubric(syllabus)}
+@app.get("/syllabus/{syllabus_id}/versions/{version}")
+async def get_syllabus_version(syllabus_id: str, version: int):
+    try:
+        found = await run_in_threadpool(syllabus_versions.get, syllabus_id, version)
+    except UnknownSyllabus:
+        return JSONResponse(status_code=404, content={"status": "error", "message": "Syllabus version not found."})
+    return {"status": "success", "data": found.to_dict(topics=True)}
 
-async def run_evaluator_agent(syllabus):
-    from agents.evaluator_agent import service
-    return {"Evaluator Agent": service.evaluate_responses(syllabus)}
+@app.get("/generator/stats")
+async def generator_stats():
+    """
+    Prompt, coalescing and batch counters for the text generation backend.
+    """
+    return {"status": "success", "data": generator.stats()}
 
-async def run_analytics_agent(syllabus):
-    from agents.analytics_agent import service
-    return {"Analytics Agent": service.analyze_performance(syllabus)}
+# ==========================================================
+# ✅ ASYNC AGENT ORCHESTRATION
+# ==========================================================
+@app.get("/agents/stats")
+async def agent_stats():
+    """
+    Execution kind, concurrency limit and running / waiting / completed
+    counters per agent (see core/agent_executor.py).
+    """
+    return {"status": "success", "data": agent_executor.stats()}
 
 # ==========================================================
 # ✅ MAIN WORKFLOW ENDPOINT
 # ==========================================================
 @app.post("/workflow/run_async")
-async def run_workflow_async(syllabus: str):
+async def run_workflow_async(syllabus: str, compact: bool = False, syllabus_id: str = None):
     """
     Run all 5 agents asynchronously in parallel.
+    Each agent is dispatched by the agent executor (thread pool, process pool
+    or direct await, per its kind), so they really overlap.
     Returns combined results once all agents finish.
+    With syllabus_id the syllabus is stored as a new version of that id and
+    only added / changed topics are reprocessed (core/incremental.py); the
+    response adds the version and the topic delta.
+    compact=true drops the echoed syllabus and per-item timestamps.
     """
     try:
-        # Run all agents in parallel
-        results = await asyncio.gather(
-            run_content_agent(syllabus),
-            run_exam_agent(syllabus),
-            run_rubric_agent(syllabus),
-            run_evaluator_agent(syllabus),
-            run_analytics_agent(syllabus)
-        )
-
-        # Merge results
-        merged_output = {}
-        for r in results:
-            merged_output.update(r)
-
-        return {
+        # Parse once; every agent receives the same normalized topics
+        if syllabus_id:
+            revision = await run_incremental(syllabus_id, Syllabus.parse(syllabus))
+            merged_output = revision.pop("workflow_results")
+        else:
+            revision = {}
+            merged_output = await run_agent_workflow(Syllabus.parse(syllabus))
+
+        return json_response({
             "status": "success",
             "syllabus": syllabus,
             "architecture": "Async Parallel Agent Execution",
+            **revision,
             "workflow_results": merged_output
-        }
+        }, compact=compact)
 
     except Exception as e:
         return {"status": "error", "message": str(e)}
 
+@app.post("/workflow/run_batch")
+async def run_workflow_batch(request: Request, concurrency: int = BATCH_CONCURRENCY, compact: bool = False):
+    """
+    Run the workflow for many syllabi in one request.
+    Body: JSON list / {"syllabi": [...]} or NDJSON (one syllabus per line).
+    Duplicate syllabi and topics are processed once; results stream back as
+    NDJSON lines in completion order, each tagged with its input index.
+    """
+    try:
+        syllabi = parse_batch_body(await request.body(), request.headers.get("content-type", ""))
+    except ValueError as e:
+        return JSONResponse(status_code=400, content={"status": "error", "message": str(e)})
+
+    async def stream():
+        async for record in run_batch(syllabi, concurrency):
+            if compact:
+                record = compact_payload(record)
+            yield dumps(record) + b"\n"
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+@app.post("/workflow/stream")
+async def stream_workflow(request: Request, syllabus: str, format: str = None, compact: bool = False):
+    """
+    Streaming variant of /workflow/run_async: each agent's result is sent the
+    moment it finishes, followed by a "done" event with stage timings.
+    Server-Sent Events when format=sse or the client accepts text/event-stream,
+    NDJSON otherwise.
+    """
+    use_sse = format == "sse" or (format is None and "text/event-stream" in request.headers.get("accept", ""))
+
+    def encode(record):
+        if compact:
+            record = compact_payload(record)
+        data = dumps(record)
+        if use_sse:
+            return b"event: " + record["stage"].encode() + b"\ndata: " + data + b"\n\n"
+        return data + b"\n"
+
+    async def events():
+        try:
+            async for record in stream_agent_workflow(Syllabus.parse(syllabus)):
+                yield encode(record)
+        except Exception as e:
+            yield encode({"stage": "error", "message": str(e)})
+
+    media_type = "text/event-stream" if use_sse else "application/x-ndjson"
+    return StreamingResponse(events(), media_type=media_type, headers={"Cache-Control": "no-cache"})
+
+# ==========================================================
+# ✅ BACKGROUND WORKFLOW JOBS
+# ==========================================================
+@job_queue.register("workflow")
+async def workflow_job(payload, report):
+    """
+    Job handler: runs the agent workflow and records per-stage progress.
+    """
+    stages = {name: "pending" for name in STAGE_LABELS}
+
+    def on_stage(name, event, _result):
+        stages[name] = "running" if event == "started" else "completed"
+        done = sum(state == "completed" for state in stages.values())
+        report({"stages": stages, "completed": done, "total": len(stages)})
+
+    results = await run_agent_workflow(payload["syllabus"], on_stage=on_stage)
+    return {
+        "syllabus": payload["syllabus"],
+        "architecture": "Async Parallel Agent Execution",
+        "workflow_results": results,
+    }
+
+@app.post("/jobs/workflow", status_code=202)
+async def submit_workflow_job(syllabus: str, priority: int = 5):
+    """
+    Queue the full workflow and return immediately with a job id.
+    Lower priority values are processed first.
+    """
+    job_id = await job_queue.asubmit("workflow", {"syllabus": syllabus}, priority=priority)
+    return {
+        "status": "accepted",
+        "job_id": job_id,
+        "status_url": f"/jobs/{job_id}",
+        "result_url": f"/jobs/{job_id}/result",
+    }
+
+@app.get("/jobs")
+async def job_stats():
+    return {"status": "success", "data": await asyncio.to_thread(job_queue.stats)}
+
+@app.get("/jobs/{job_id}")
+async def get_job_status(job_id: str):
+    """
+    Cheap status poll: state, per-stage progress and timestamps (no result body).
+    """
+    job = await asyncio.to_thread(job_queue.status, job_id)
+    if job is None:
+        return JSONResponse(status_code=404, content={"status": "error", "message": "Job not found or expired."})
+    return {"status": "success", "data": job}
+
+@app.get("/jobs/{job_id}/result")
+async def get_job_result(job_id: str, compact: bool = False):
+    job = await asyncio.to_thread(job_queue.result, job_id)
+    if job is None:
+        return JSONResponse(status_code=404, content={"status": "error", "message": "Job not found or expired."})
+    if job["status"] in (QUEUED, RUNNING):
+        return JSONResponse(status_code=202, content={"status": job["status"], "progress": job["progress"]})
+    if job["status"] == FAILED:
+        return {"status": "error", "message": job["error"]}
+    return json_response({"status": "success", **job["result"]}, compact=compact)
+
 # ==========================================================
 # ✅ RUN LOCALLY
 # ==========================================================
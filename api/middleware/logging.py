@@ -1,11 +1,57 @@
 # api/middleware/logging.py
-from starlette.middleware.base import BaseHTTPMiddleware
-import time
-
-class RequestLogger(BaseHTTPMiddleware):
-    async def dispatch(self, request, call_next):
-        start_time = time.time()
-        response = await call_next(request)
-        duration = round(time.time() - start_time, 2)
-        print(f"[LOG] {request.method} {request.url.path} → {response.status_code} in {duration}s")
-        return response
+"""
+Request tracing middleware (pure ASGI, no per-request task or body buffering).
+Opens the root span for every HTTP request and records its latency in
+brok_http_request_duration_seconds labelled by method, route template and status.
+"""
+
+from core.tracing import span, metrics
+
+
+class RequestLogger:
+    def __init__(self, app):
+        self.app = app
+        self._templates = {}  # endpoint -> route path template
+
+    def _route_template(self, scope):
+        endpoint = scope.get("endpoint")
+        if endpoint is None:
+            return "unmatched"
+        template = self._templates.get(endpoint)
+        if template is None:
+            app = scope.get("app")
+            for route in getattr(app, "routes", ()):
+                if getattr(route, "endpoint", None) is endpoint:
+                    template = route.path
+                    break
+            else:
+                template = scope["path"]
+            self._templates[endpoint] = template
+        return template
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        route = "unmatched"
+        try:
+            with span("http.request", method=scope["method"], path=scope["path"]) as request_span:
+                try:
+                    await self.app(scope, receive, send_wrapper)
+                finally:
+                    route = self._route_template(scope)
+                    request_span.set(route=route, status=status)
+        finally:
+            metrics.observe(
+                "brok_http_request_duration_seconds", request_span.duration,
+                method=scope["method"], route=route, status=str(status),
+            )
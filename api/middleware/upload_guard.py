@@ -0,0 +1,87 @@
+# api/middleware/upload_guard.py
+"""
+Upload admission control (pure ASGI, runs before the body is read).
+
+Starlette spools a multipart body to a temporary file before the route
+handler runs, so checks made inside /content/upload only fire after the whole
+upload has arrived. This middleware answers upload requests itself:
+
+  • 503 + Retry-After when the extraction pool has no free slot
+  • 413 when Content-Length exceeds the upload limit, or, for chunked
+    bodies, as soon as more bytes than that have been received
+
+The limit is UPLOAD_MAX_BYTES plus UPLOAD_FORM_OVERHEAD for the multipart
+framing; the handler still enforces UPLOAD_MAX_BYTES on the file itself.
+"""
+
+import json
+import os
+
+from agents.content_agent.service import UPLOAD_MAX_BYTES
+from core.extraction_pool import PoolSaturated, extraction_pool
+
+UPLOAD_PATHS = ("/content/upload",)
+UPLOAD_FORM_OVERHEAD = int(os.getenv("UPLOAD_FORM_OVERHEAD", str(64 * 1024)))
+
+
+async def reject(send, status, message, headers=()):
+    body = json.dumps({"status": "error", "message": message}).encode()
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"connection", b"close"),
+            *headers,
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+class UploadGuard:
+    def __init__(self, app, paths=UPLOAD_PATHS, max_bytes=None, pool=extraction_pool):
+        self.app = app
+        self.paths = frozenset(paths)
+        self.max_bytes = (UPLOAD_MAX_BYTES if max_bytes is None else max_bytes) + UPLOAD_FORM_OVERHEAD
+        self.pool = pool
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST" or scope["path"] not in self.paths:
+            await self.app(scope, receive, send)
+            return
+        try:
+            self.pool.check_capacity()
+        except PoolSaturated as e:
+            await reject(send, 503, str(e), [(b"retry-after", str(e.retry_after).encode())])
+            return
+        too_large = f"Upload exceeds {self.max_bytes - UPLOAD_FORM_OVERHEAD} bytes."
+        length = dict(scope["headers"]).get(b"content-length")
+        if length is not None and length.isdigit() and int(length) > self.max_bytes:
+            await reject(send, 413, too_large)
+            return
+
+        received = 0
+        rejected = False
+
+        async def guarded_receive():
+            nonlocal received, rejected
+            message = await receive()
+            if message["type"] == "http.request" and not rejected:
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    rejected = True
+                    await reject(send, 413, too_large)
+                    return {"type": "http.disconnect"}
+            return message
+
+        async def guarded_send(message):
+            if not rejected:
+                await send(message)
+
+        try:
+            await self.app(scope, guarded_receive, guarded_send)
+        except Exception:
+            # The handler saw the body cut short; the 413 has already been sent
+            if not rejected:
+                raise
@@ -0,0 +1,70 @@
+"""
+api/responses.py
+----------------
+Fast JSON responses and compact payload mode.
+
+FastJSONResponse serializes with orjson when it is installed and falls back to
+a compact stdlib encoder otherwise. Routes that return it directly also skip
+FastAPI's jsonable_encoder pass over the payload. The slotted domain models
+(core/models.py) are written through their to_dict(), datetimes natively.
+
+compact_payload() drops echoed request inputs and per-item timestamps, for
+clients that pass compact=true.
+"""
+
+import json
+from fastapi.responses import JSONResponse
+
+from core.models import MODELS, to_jsonable
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+# Keys removed in compact mode: the echoed syllabus and per-lesson timestamps
+COMPACT_DROP_KEYS = frozenset({"syllabus", "created_at"})
+
+if orjson is not None:
+    _ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATACLASS
+
+
+def dumps(content) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content, default=to_jsonable, option=_ORJSON_OPTIONS)
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":"), default=_default).encode("utf-8")
+
+
+def _default(value):
+    try:
+        return to_jsonable(value)
+    except TypeError:
+        return str(value)
+
+
+class FastJSONResponse(JSONResponse):
+    media_type = "application/json"
+
+    def render(self, content) -> bytes:
+        return dumps(content)
+
+
+def compact_payload(value):
+    """
+    Returns a copy of value without COMPACT_DROP_KEYS at any depth.
+    Inputs are never mutated (agent outputs may be shared cache entries).
+    """
+    if isinstance(value, dict):
+        return {k: compact_payload(v) for k, v in value.items() if k not in COMPACT_DROP_KEYS}
+    if isinstance(value, list):
+        return [compact_payload(v) for v in value]
+    if isinstance(value, MODELS):
+        return compact_payload(value.to_dict())
+    return value
+
+
+def json_response(content, compact=False, status_code=200, headers=None):
+    """Builds a FastJSONResponse, applying compact mode when requested."""
+    if compact:
+        content = compact_payload(content)
+    return FastJSONResponse(content, status_code=status_code, headers=headers)
@@ -0,0 +1,161 @@
+"""
+api/serve.py
+------------
+Multi-worker launcher for the API (pre-fork, no extra dependencies).
+
+The supervisor imports api.main once, binds the listening socket and then
+forks WEB_CONCURRENCY uvicorn workers that all accept on it. Modules, agents
+and numpy are loaded before the fork and shared copy-on-write (gc.freeze
+keeps the collector from dirtying those pages). Workers that die are
+respawned; SIGTERM / SIGINT shut every worker down gracefully.
+
+State the workers must share lives outside the process:
+  • caches use the SQLite tier (CACHE_BACKEND=sqlite unless set), and
+    CACHE_MEMORY_BYTES is split between the workers' in-process LRUs
+  • jobs are multi-process safe (core/jobs.py); interrupted jobs are
+    re-queued here, all of them at start and a dead worker's own when it is
+    respawned
+  • search index segments are shared (core/search_index.py)
+
+Multi-worker mode is not yet safe for analytics or fresh index documents:
+the analytics score store (core/analytics.py), the index's unflushed buffer
+and its dedup of buffered keys are per worker, so /analytics/* and
+/search/* answer from whichever worker takes the request. Keep
+WEB_CONCURRENCY=1 (the default) unless those routes are unused.
+
+    python -m api.serve --workers 4 --port 8000
+"""
+
+import argparse
+import gc
+import logging
+import os
+import signal
+import socket
+import sys
+import time
+
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", "1"))
+HOST = os.getenv("HOST", "0.0.0.0")
+PORT = int(os.getenv("PORT", "8000"))
+RESPAWN_DELAY = 1.0  # seconds, when a worker dies right after starting
+
+log = logging.getLogger("brok.serve")
+
+
+def configure_workers(workers):
+    """Environment defaults for N workers; must run before the app is imported."""
+    os.environ["WEB_CONCURRENCY"] = str(workers)
+    os.environ["JOB_RECOVER"] = "0"  # the supervisor re-queues: at start and for each dead worker
+    if workers > 1:
+        os.environ.setdefault("CACHE_BACKEND", "sqlite")
+
+
+def bind(host, port, backlog=2048):
+    sock = socket.socket(socket.AF_INET6 if ":" in host else socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def _run_worker(config, sock):
+    import uvicorn
+
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+def _spawn(config, sock):
+    pid = os.fork()
+    if pid == 0:
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+        code = 0
+        try:
+            _run_worker(config, sock)
+        except BaseException:
+            log.exception("Worker %s crashed", os.getpid())
+            code = 1
+        finally:
+            os._exit(code)
+    return pid
+
+
+def requeue_jobs(owner=None):
+    """Re-queues jobs left running by every worker, or by the dead worker owner."""
+    from core.jobs import JobStore
+
+    store = JobStore()
+    try:
+        return store.requeue_interrupted(owner)
+    finally:
+        store.close()
+
+
+def serve(workers=WEB_CONCURRENCY, host=HOST, port=PORT, log_level="info"):
+    import uvicorn
+
+    configure_workers(workers)
+    requeue_jobs()
+
+    from api.main import app  # preload: imported once, shared by every worker
+    config = uvicorn.Config(app, log_level=log_level, lifespan="on")
+    sock = bind(host, port)
+    if workers <= 1:
+        _run_worker(config, sock)
+        return
+
+    from agents.content_agent.service import preload_parsers
+    preload_parsers()  # imported once here rather than warmed up in every worker
+    gc.collect()
+    gc.freeze()
+    started = {}  # pid -> start time
+    for _ in range(workers):
+        started[_spawn(config, sock)] = time.monotonic()
+    log.warning("Serving on %s:%s with %d workers (pid %s)", host, port, workers, os.getpid())
+    log.warning("Analytics and unflushed search documents are per worker; their routes may disagree between requests")
+
+    stopping = False
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in list(started):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    while started:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        born = started.pop(pid, None)
+        if stopping or born is None:
+            continue
+        # Its replacement picks these up from the queued rows on start
+        requeued = requeue_jobs(pid)
+        log.warning("Worker %s exited (status %s, %d jobs re-queued); respawning", pid, status, requeued)
+        if time.monotonic() - born < RESPAWN_DELAY:
+            time.sleep(RESPAWN_DELAY)
+        started[_spawn(config, sock)] = time.monotonic()
+    sock.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=WEB_CONCURRENCY)
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, stream=sys.stderr)
+    serve(args.workers, args.host, args.port, args.log_level)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+benchmarks/_asgi.py
+-------------------
+Minimal in-process ASGI client used by the benchmarks.
+Talks to the FastAPI app directly, so no server or extra HTTP library is needed.
+"""
+
+import asyncio
+import json
+import time
+import uuid
+from urllib.parse import urlencode
+
+
+async def request(app, method, path, body=b"", headers=None, query=None):
+    """
+    Sends one HTTP request to an ASGI app.
+    Returns (status, headers dict, body bytes, latency seconds).
+    """
+    raw_headers = [(k.lower().encode(), v.encode()) for k, v in (headers or {}).items()]
+    raw_headers.append((b"content-length", str(len(body)).encode()))
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": urlencode(query or {}).encode(),
+        "headers": raw_headers,
+        "client": ("127.0.0.1", 50000),
+        "server": ("testserver", 80),
+    }
+    sent = False
+    finished = asyncio.Event()
+    status, resp_headers, chunks = 0, {}, []
+
+    async def receive():
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        # Streaming responses poll for disconnects; only report one once done
+        await finished.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal status, resp_headers
+        if message["type"] == "http.response.start":
+            status = message["status"]
+            resp_headers = {k.decode(): v.decode() for k, v in message.get("headers", [])}
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                finished.set()
+
+    start = time.perf_counter()
+    await app(scope, receive, send)
+    return status, resp_headers, b"".join(chunks), time.perf_counter() - start
+
+
+def form_body(fields):
+    """URL-encodes form fields, e.g. {"syllabus": "..."}."""
+    return urlencode(fields).encode(), {"content-type": "application/x-www-form-urlencoded"}
+
+
+def multipart_body(field, filename, payload, content_type="application/octet-stream"):
+    """Builds a single-file multipart/form-data body."""
+    boundary = uuid.uuid4().hex
+    head = (
+        f"--{boundary}\r\n"
+        f'Content-Disposition: form-data; name="{field}"; filename="{filename}"\r\n'
+        f"Content-Type: {content_type}\r\n\r\n"
+    ).encode()
+    tail = f"\r\n--{boundary}--\r\n".encode()
+    return head + payload + tail, {"content-type": f"multipart/form-data; boundary={boundary}"}
+
+
+def percentiles(samples, points=(50, 95, 99)):
+    """Returns {"n": count, "p50": ms, ..., "max": ms} for a list of latencies in seconds."""
+    if not samples:
+        return {"n": 0, **{f"p{p}": None for p in points}, "max": None}
+    ordered = sorted(samples)
+    out = {"n": len(ordered)}
+    for p in points:
+        idx = min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))
+        out[f"p{p}"] = round(ordered[idx] * 1000, 3)
+    out["max"] = round(ordered[-1] * 1000, 3)
+    return out
+
+
+async def load(app, make_request, total, concurrency):
+    """
+    Closed-loop load generator: `concurrency` virtual users share `total`
+    requests. make_request(i) returns (method, path, body, headers, query).
+    Returns {"requests", "errors", "statuses", "rps", "latency_ms"}; errors
+    counts non-2xx responses (e.g. 503 backpressure), statuses breaks them down.
+    """
+    counter = iter(range(total))
+    samples, statuses = [], {}
+
+    async def user():
+        for i in counter:
+            method, path, body, headers, query = make_request(i)
+            status, _, _, latency = await request(app, method, path, body, headers, query)
+            samples.append(latency)
+            statuses[status] = statuses.get(status, 0) + 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*[user() for _ in range(concurrency)])
+    elapsed = time.perf_counter() - start
+    return {
+        "requests": len(samples),
+        "errors": sum(n for status, n in statuses.items() if not 200 <= status < 300),
+        "statuses": {str(status): n for status, n in sorted(statuses.items())},
+        "rps": round(len(samples) / elapsed, 1) if elapsed else None,
+        "latency_ms": percentiles(samples),
+    }
+
+
+def dump(result, path=None):
+    text = json.dumps(result, indent=2)
+    if path:
+        with open(path, "w") as f:
+            f.write(text)
+    print(text)
@@ -0,0 +1,165 @@
+"""
+benchmarks/bench_agent_executor.py
+----------------------------------
+Wall-clock overlap of the five workflow agents.
+
+  io   the agents call a remote generator (the stub server, started
+       in-process with --latency-ms per call). "serial" calls the five
+       services one after another on the event loop, as the old
+       asyncio.gather over sync calls did; "executor" runs the workflow graph
+       through the agent executor. overlap = sum of agent times / wall time.
+  cpu  --tasks concurrent calls of a CPU-bound function registered as kind
+       "io" (threads, serialized by the GIL) and as kind "cpu" (process
+       pool). Overlap needs more than one core; cpu_count is reported.
+
+    python -m benchmarks.bench_agent_executor --runs 20 --latency-ms 50
+"""
+
+import argparse
+import asyncio
+import os
+import shutil
+import socket
+import tempfile
+import threading
+import time
+
+from benchmarks._asgi import dump
+from benchmarks.fixtures import syllabus_text
+
+
+def spin(n):
+    """CPU-bound stand-in agent (module level so the process pool can pickle it)."""
+    total = 0
+    for i in range(n):
+        total += i * i
+    return total
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _start_stub(port):
+    import uvicorn
+    from core.generator_stub import app
+
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    return server
+
+
+async def _io_scenario(args):
+    from agents.analytics_agent import service as analytics
+    from agents.content_agent import service as content
+    from agents.evaluator_agent import service as evaluator
+    from agents.exam_agent import service as exam
+    from agents.rubric_agent import service as rubric
+    from core.syllabus import Syllabus
+    from core.workflow import build_agent_graph
+
+    services = (content.generate_content, exam.generate_exam, rubric.design_rubric,
+                evaluator.evaluate_responses, analytics.analyze_performance)
+
+    async def serial(parsed):
+        start = time.perf_counter()
+        agent_ms = 0.0
+        for fn in services:
+            t = time.perf_counter()
+            fn(parsed)
+            agent_ms += (time.perf_counter() - t) * 1000
+        return (time.perf_counter() - start) * 1000, agent_ms
+
+    async def executor(parsed):
+        run = await build_agent_graph().run_async(syllabus=parsed)
+        report = run.report()
+        return report["wall_time_ms"], sum(s["duration_ms"] for s in report["stages"].values())
+
+    results = {}
+    for seed_base, (name, fn) in enumerate((("serial", serial), ("executor", executor)), start=1):
+        parsed = [Syllabus.parse(syllabus_text(args.topics, seed=seed_base * 10 ** 6 + i)) for i in range(args.runs)]
+        await fn(Syllabus.parse(syllabus_text(args.topics, seed=seed_base * 10 ** 7)))  # warm pools/connections
+        walls, agents = [], []
+        for p in parsed:
+            wall, agent_ms = await fn(p)
+            walls.append(wall)
+            agents.append(agent_ms)
+        results[name] = {
+            "workflow_ms": round(sum(walls) / len(walls), 2),
+            "agent_ms_sum": round(sum(agents) / len(agents), 2),
+            "overlap": round(sum(agents) / sum(walls), 2),
+        }
+
+        # Throughput with several workflows in flight at once
+        parsed = [Syllabus.parse(syllabus_text(args.topics, seed=seed_base * 10 ** 8 + i)) for i in range(args.runs)]
+        start = time.perf_counter()
+        await asyncio.gather(*[fn(p) for p in parsed])
+        results[name]["concurrent_workflows_per_s"] = round(len(parsed) / (time.perf_counter() - start), 1)
+    return results
+
+
+async def _cpu_scenario(args):
+    from core.agent_executor import CPU, IO, AgentExecutor
+
+    executor = AgentExecutor()
+    executor.register("spin_io", spin, IO, limit=args.tasks)
+    executor.register("spin_cpu", spin, CPU, limit=args.tasks)
+    single_start = time.perf_counter()
+    spin(args.spin)
+    single_ms = (time.perf_counter() - single_start) * 1000
+
+    results = {"single_call_ms": round(single_ms, 1)}
+    for name in ("spin_io", "spin_cpu"):
+        await executor.run(name, 1000)  # start the pool outside the timing
+        start = time.perf_counter()
+        await asyncio.gather(*[executor.run(name, args.spin) for _ in range(args.tasks)])
+        wall = (time.perf_counter() - start) * 1000
+        results[name] = {"wall_ms": round(wall, 1), "overlap": round(args.tasks * single_ms / wall, 2)}
+    executor.shutdown()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--topics", type=int, default=20)
+    parser.add_argument("--latency-ms", type=float, default=50, help="stub generator latency per call")
+    parser.add_argument("--tasks", type=int, default=4, help="concurrent CPU-bound calls")
+    parser.add_argument("--spin", type=int, default=2_000_000, help="loop iterations per CPU-bound call")
+    parser.add_argument("--out", default=os.getenv("BENCH_OUT"))
+    args = parser.parse_args()
+
+    data_dir = tempfile.mkdtemp(prefix="bench_executor_")
+    port = _free_port()
+    os.environ.update(
+        CACHE_DIR=os.path.join(data_dir, "cache"),
+        INDEX_DIR=os.path.join(data_dir, "index"),
+        GENERATOR_BACKEND="http",
+        GENERATOR_URL=f"http://127.0.0.1:{port}/generate",
+        STUB_LATENCY_MS=str(args.latency_ms),
+    )
+    server = _start_stub(port)
+    try:
+        io_results = asyncio.run(_io_scenario(args))
+        cpu_results = asyncio.run(_cpu_scenario(args))
+    finally:
+        server.should_exit = True
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+    dump({
+        "benchmark": "agent_executor",
+        "cpu_count": os.cpu_count(),
+        "runs": args.runs,
+        "topics": args.topics,
+        "stub_latency_ms": args.latency_ms,
+        "io": io_results,
+        "cpu": cpu_results,
+    }, args.out)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+benchmarks/bench_analytics.py
+-----------------------------
+Loads millions of question scores into the columnar score store in graded
+batches, then times slice queries (cohort, topic, cohort x topic, student,
+weakest topics) answered from the running aggregates. A full numpy rescan of
+the same slice is timed alongside for comparison.
+
+    python -m benchmarks.bench_analytics --students 100000 --questions 50
+"""
+
+import argparse
+import os
+import time
+
+import numpy as np
+
+from benchmarks._asgi import dump, percentiles
+
+
+def _query_latency(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return percentiles(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--students", type=int, default=100000)
+    parser.add_argument("--questions", type=int, default=50)
+    parser.add_argument("--batch", type=int, default=10000, help="students per ingested batch")
+    parser.add_argument("--cohorts", type=int, default=10)
+    parser.add_argument("--topics", type=int, default=25)
+    parser.add_argument("--repeat", type=int, default=1000)
+    parser.add_argument("--out", default=os.getenv("BENCH_OUT"))
+    args = parser.parse_args()
+
+    from core.analytics import ScoreStore
+    from core.scoring import AnswerSheet, Rubric, grade
+
+    rubric = Rubric()
+    store = ScoreStore()
+    rng = np.random.default_rng(3)
+    questions = [f"q{i}" for i in range(args.questions)]
+    topics = {q: f"topic_{i % args.topics}" for i, q in enumerate(questions)}
+
+    ingest_s = 0.0
+    for batch, first in enumerate(range(0, args.students, args.batch)):
+        n = min(args.batch, args.students - first)
+        marks = rng.integers(0, 11, size=(n, args.questions, len(rubric.criteria))).astype(np.float32)
+        sheet = AnswerSheet(
+            [f"s{first + i}" for i in range(n)], questions, rubric.criteria,
+            marks, np.ones((n, args.questions), dtype=bool),
+        )
+        result = grade(sheet, rubric)
+        start = time.perf_counter()
+        store.ingest(result, cohort=f"cohort_{batch % args.cohorts}", topics=topics)
+        ingest_s += time.perf_counter() - start
+
+    columns = {name: column.view() for name, column in store.columns.items()}
+    cohort_code = store.cohorts.get("cohort_0")
+    topic_code = store.topics.get("topic_0")
+
+    def rescan_cohort_topic():
+        mask = (columns["cohort"] == cohort_code) & (columns["topic"] == topic_code)
+        values = columns["score"][mask]
+        return values.mean(), values.std(), np.percentile(values, (10, 25, 50, 75, 90))
+
+    dump({
+        "benchmark": "analytics",
+        "scores": len(store),
+        "students": len(store.students),
+        "cohorts": args.cohorts,
+        "topics": args.topics,
+        "ingest_s": round(ingest_s, 3),
+        "ingest_scores_per_s": round(len(store) / ingest_s),
+        "column_mb": round(sum(c.data.nbytes for c in store.columns.values()) / 2 ** 20, 1),
+        "query_ms": {
+            "summary": _query_latency(store.summary, args.repeat),
+            "cohort": _query_latency(lambda: store.cohort("cohort_0"), args.repeat),
+            "topic": _query_latency(lambda: store.topic("topic_0"), args.repeat),
+            "cohort_topic": _query_latency(lambda: store.topic("topic_0", "cohort_0"), args.repeat),
+            "student": _query_latency(lambda: store.student("s42"), args.repeat),
+            "weak_topics": _query_latency(lambda: store.weak_topics("cohort_0"), args.repeat),
+            "rescan_cohort_topic": _query_latency(rescan_cohort_topic, max(args.repeat // 100, 5)),
+        },
+    }, args.out)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+benchmarks/bench_answer_ingestion.py
+------------------------------------
+Throughput and peak RSS of streaming answer-file ingestion (core/ingestion.py):
+parse + validate -> grade -> analytics score store + SQLite results store.
+
+Each case writes a --rows answer file (students x --questions, one row per
+answer, --invalid of them malformed) and ingests it in a fresh subprocess, so
+ru_maxrss reflects that case alone. Peak RSS staying flat as --rows grows is
+the bounded-memory check; --skip-analytics leaves out the analytics score
+store, which by design keeps 20 bytes of columns per accepted answer.
+
+    python -m benchmarks.bench_answer_ingestion --rows 500000 5000000 --formats csv ndjson
+    python -m benchmarks.bench_answer_ingestion --rows 500000 5000000 --skip-analytics
+"""
+
+import argparse
+import json
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+CRITERIA = ("knowledge", "clarity", "creativity")
+
+
+def write_answers(path, rows, questions, fmt, invalid=0.001, seed=0, chunk=200_000):
+    """Writes a synthetic answer file in chunks; returns its size in bytes."""
+    rng = np.random.default_rng(seed)
+    with open(path, "w", encoding="utf-8") as f:
+        if fmt == "csv":
+            f.write(",".join(("student_id", "question_id") + CRITERIA) + "\n")
+        for start in range(0, rows, chunk):
+            n = min(chunk, rows - start)
+            index = np.arange(start, start + n)
+            marks = rng.integers(0, 11, size=(n, len(CRITERIA)))
+            bad = set(np.flatnonzero(rng.random(n) < invalid).tolist())
+            lines = []
+            for i, (row, m) in enumerate(zip(index.tolist(), marks.tolist())):
+                student, question = f"s{row // questions}", f"q{row % questions}"
+                if i in bad:
+                    m[0] = "x"
+                if fmt == "csv":
+                    lines.append(f"{student},{question},{m[0]},{m[1]},{m[2]}\n")
+                else:
+                    lines.append(json.dumps({"student_id": student, "question_id": question,
+                                             "scores": dict(zip(CRITERIA, m))}) + "\n")
+            f.writelines(lines)
+    return os.path.getsize(path)
+
+
+class _NoAnalytics:
+    def add(self, *args, **kwargs):
+        pass
+
+
+def _measure(fmt, rows, questions, invalid, skip_analytics=False):
+    data_dir = tempfile.mkdtemp(prefix="bench_answer_ingestion_")
+    os.environ["RESULTS_DB_PATH"] = os.path.join(data_dir, "results.sqlite3")
+    os.environ["JOB_DB_PATH"] = os.path.join(data_dir, "jobs.sqlite3")
+    os.environ["RUBRIC_DB_PATH"] = os.path.join(data_dir, "rubrics.sqlite3")
+    try:
+        from core.ingestion import ingest_file, results_store
+        from core.scoring import Rubric
+
+        path = os.path.join(data_dir, f"answers.{fmt}")
+        size = write_answers(path, rows, questions, fmt, invalid)
+        base_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        start = time.perf_counter()
+        analytics = {"analytics": _NoAnalytics()} if skip_analytics else {}
+        result = ingest_file(path, fmt, Rubric(), **analytics)
+        elapsed = time.perf_counter() - start
+        peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        results_store.close()
+        return {
+            "format": fmt,
+            "analytics": not skip_analytics,
+            "rows": result["rows"],
+            "accepted": result["accepted"],
+            "rejected": result["rejected"],
+            "students": result["students"],
+            "file_mb": round(size / 1e6, 1),
+            "seconds": round(elapsed, 2),
+            "rows_per_second": round(result["rows"] / elapsed),
+            "mb_per_second": round(size / 1e6 / elapsed, 1),
+            "stage_seconds": result["stage_seconds"],
+            "baseline_rss_mb": round(base_rss / 1024, 1),
+            "peak_rss_mb": round(peak_rss / 1024, 1),
+            "rss_growth_mb": round((peak_rss - base_rss) / 1024, 1),
+        }
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[500_000, 5_000_000])
+    parser.add_argument("--questions", type=int, default=50)
+    parser.add_argument("--invalid", type=float, default=0.001, help="fraction of malformed rows")
+    parser.add_argument("--formats", nargs="+", default=["csv"], choices=["csv", "ndjson"])
+    parser.add_argument("--skip-analytics", action="store_true")
+    parser.add_argument("--case", nargs=2, help=argparse.SUPPRESS)
+    parser.add_argument("--out", default=os.getenv("BENCH_OUT"))
+    args = parser.parse_args()
+
+    if args.case:
+        print(json.dumps(_measure(args.case[0], int(args.case[1]), args.questions, args.invalid, args.skip_analytics)))
+        return
+
+    from benchmarks._asgi import dump
+
+    results = []
+    for fmt in args.formats:
+        for rows in args.rows:
+            proc = subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_answer_ingestion", "--case", fmt, str(rows),
+                 "--questions", str(args.questions), "--invalid", str(args.invalid)]
+                + (["--skip-analytics"] if args.skip_analytics else []),
+                capture_output=True, text=True, check=True,
+            )
+            results.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+    dump({"benchmark": "answer_ingestion", "questions": args.questions, "results": results}, args.out)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""
+benchmarks/bench_cold_start.py
+------------------------------
+Cold-start budget check. In fresh interpreters it measures:
+
+  • `import api.main` wall time, and the slowest modules by cumulative
+    import time (python -X importtime)
+  • that the heavy upload parsers (PyPDF2, docx) are not imported eagerly
+  • time from process spawn to the first 200 from /health of a real server
+    (python -m api.serve --workers 1)
+
+Exits non-zero when the median time-to-first-/health exceeds --budget-ms
+(COLD_START_BUDGET_MS) or a lazy module was imported, so it can gate CI.
+
+    python -m benchmarks.bench_cold_start --runs 5 --budget-ms 1500
+"""
+
+import argparse
+import os
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+from benchmarks._asgi import dump
+
+LAZY_MODULES = ("PyPDF2", "docx")
+
+_PROBE = """
+import sys, time
+start = time.perf_counter()
+import api.main
+print((time.perf_counter() - start) * 1000)
+print(",".join(m for m in {lazy!r} if m in sys.modules))
+"""
+
+
+def isolated_env(data_dir):
+    return dict(
+        os.environ,
+        CACHE_DIR=os.path.join(data_dir, "cache"),
+        JOB_DB_PATH=os.path.join(data_dir, "jobs.sqlite3"),
+        INDEX_DIR=os.path.join(data_dir, "index"),
+        UPLOAD_DIR=os.path.join(data_dir, "uploads"),
+        RUBRIC_DB_PATH=os.path.join(data_dir, "rubrics.sqlite3"),
+        SYLLABUS_DB_PATH=os.path.join(data_dir, "syllabi.sqlite3"),
+        RESULTS_DB_PATH=os.path.join(data_dir, "results.sqlite3"),
+        INGEST_DIR=os.path.join(data_dir, "uploads", "answers"),
+    )
+
+
+def import_profile(env, top):
+    """(import ms, eagerly imported lazy modules, slowest modules) from one fresh interpreter."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _PROBE.format(lazy=LAZY_MODULES)],
+        env=env, capture_output=True, text=True, check=True,
+    )
+    import_ms, eager = proc.stdout.split("\n")[:2]
+    modules = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        modules.append((int(cumulative_us), int(self_us), name.strip()))
+    modules.sort(reverse=True)
+    slowest = [{"module": name, "cumulative_ms": round(c / 1000, 1), "self_ms": round(s / 1000, 1)}
+               for c, s, name in modules[:top]]
+    return float(import_ms), [m for m in eager.split(",") if m], slowest
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def time_to_health(env, timeout=30):
+    port = _free_port()
+    url = f"http://127.0.0.1:{port}/health"
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "api.serve", "--workers", "1", "--host", "127.0.0.1", "--port", str(port),
+         "--log-level", "warning"],
+        env=env,
+    )
+    try:
+        with httpx.Client(timeout=1) as client:
+            while time.perf_counter() - start < timeout:
+                try:
+                    if client.get(url).status_code == 200:
+                        return (time.perf_counter() - start) * 1000
+                except httpx.TransportError:
+                    time.sleep(0.005)
+        raise RuntimeError("server did not answer /health")
+    finally:
+        proc.terminate()
+        proc.wait(timeout=30)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15, help="slowest modules to report")
+    parser.add_argument("--budget-ms", type=float, default=float(os.getenv("COLD_START_BUDGET_MS", "1500")))
+    parser.add_argument("--out", default=os.getenv("BENCH_OUT"))
+    args = parser.parse_args()
+
+    data_dir = tempfile.mkdtemp(prefix="bench_cold_")
+    env = isolated_env(data_dir)
+    try:
+        profiles = [import_profile(env, args.top) for _ in range(args.runs)]
+        health = [time_to_health(env) for _ in range(args.runs)]
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+    eager = sorted({m for _, mods, _ in profiles for m in mods})
+    health_ms = statistics.median(health)
+    result = {
+        "benchmark": "cold_start",
+        "runs": args.runs,
+        "import_ms": {"median": round(statistics.median(p[0] for p in profiles), 1),
+                      "min": round(min(p[0] for p in profiles), 1)},
+        "time_to_health_ms": {"median": round(health_ms, 1), "min": round(min(health), 1),
+                              "max": round(max(health), 1)},
+        "budget_ms": args.budget_ms,
+        "eager_lazy_modules": eager,
+        "slowest_imports": profiles[-1][2],
+        "within_budget": health_ms <= args.budget_ms and not eager,
+    }
+    dump(result, args.out)
+    if not result["within_budget"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+benchmarks/bench_exam_assembly.py
+---------------------------------
+Near-duplicate clustering and exam assembly over synthetic question pools.
+
+Pools are built from distinct base topics (random pseudo-words), each
+appearing in --variants near-duplicate spellings (case, plural, a dropped
+letter, stopwords) and with one question per difficulty. For every pool size
+the benchmark reports clustering and assembly time and the clustering quality
+against the known groups:
+
+  recall      share of true near-duplicate pairs merged
+  precision   share of merged pairs that are true near-duplicates
+
+The all-pairs Jaccard baseline runs up to --pairwise-max candidates to show
+the quadratic curve the LSH path avoids.
+
+    python -m benchmarks.bench_exam_assembly --sizes 1000 10000 50000
+"""
+
+import argparse
+import os
+import random
+import time
+from collections import Counter
+
+from benchmarks._asgi import dump
+from core.exam_assembly import assemble, jaccard, near_duplicate_clusters, shingles, similarity_text
+from core.models import Question
+
+_LEVELS = (("easy", 5), ("medium", 10), ("hard", 15))
+
+
+def _word(rng):
+    return "".join(rng.choice("abcdefghiklmnoprstuvw") for _ in range(rng.randint(5, 9)))
+
+
+def _variant(topic, rng):
+    words = topic.split()
+    kind = rng.randrange(4)
+    if kind == 0:
+        return topic.upper() if rng.random() < 0.5 else topic.lower()
+    if kind == 1:
+        return " ".join(w + "s" for w in words)
+    if kind == 2:
+        i = rng.randrange(len(words))
+        w = words[i]
+        j = rng.randrange(1, len(w))
+        words[i] = w[:j] + w[j + 1:]
+        return " ".join(words)
+    return f"The {words[0]} of {' '.join(words[1:])}"
+
+
+def question_pool(candidates, variants, seed=7):
+    """candidates questions; returns (questions, true group id per question)."""
+    rng = random.Random(seed)
+    per_topic = variants * len(_LEVELS)
+    questions, groups = [], []
+    for group in range(-(-candidates // per_topic)):
+        base = " ".join(_word(rng).capitalize() for _ in range(rng.randint(2, 3)))
+        spellings = [base] + [_variant(base, rng) for _ in range(variants - 1)]
+        for spelling in spellings:
+            for level, marks in _LEVELS:
+                questions.append(Question(spelling, f"Explain {spelling}.", marks, level))
+                groups.append(group)
+    order = list(range(len(questions)))
+    rng.shuffle(order)
+    return [questions[i] for i in order][:candidates], [groups[i] for i in order][:candidates]
+
+
+def _pair_quality(clusters, groups):
+    """Pairwise precision / recall of clusters against true groups, counted per (cluster, group) cell."""
+    pairs = lambda counts: sum(n * (n - 1) // 2 for n in counts.values())
+    together = pairs(Counter(zip(clusters, groups)))
+    merged = pairs(Counter(clusters))
+    true = pairs(Counter(groups))
+    return {
+        "precision": round(together / merged, 4) if merged else 1.0,
+        "recall": round(together / true, 4) if true else 1.0,
+    }
+
+
+def _pairwise_clusters(texts, threshold):
+    """All-pairs baseline over distinct normalized forms."""
+    forms = [similarity_text(t) for t in texts]
+    distinct = list(dict.fromkeys(forms))
+    sets = [shingles(f) for f in distinct]
+    parent = list(range(len(distinct)))
+    for i in range(len(sets)):
+        for j in range(i + 1, len(sets)):
+            if jaccard(sets[i], sets[j]) >= threshold:
+                parent[j] = parent[i]
+    return len(set(parent))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000], help="candidate questions")
+    parser.add_argument("--variants", type=int, default=4, help="spellings per base topic")
+    parser.add_argument("--threshold", type=float, default=0.6)
+    parser.add_argument("--total-marks", type=int, default=100)
+    parser.add_argument("--pairwise-max", type=int, default=5000)
+    parser.add_argument("--out", default=os.getenv("BENCH_OUT"))
+    args = parser.parse_args()
+
+    results = []
+    for size in args.sizes:
+        questions, groups = question_pool(size, args.variants)
+        topics = [q.topic for q in questions]
+
+        start = time.perf_counter()
+        clusters = near_duplicate_clusters(topics, args.threshold)
+        cluster_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        exam = assemble(questions, total_marks=args.total_marks, mix="easy=0.3,medium=0.5,hard=0.2",
+                        threshold=args.threshold)
+        assemble_ms = (time.perf_counter() - start) * 1000
+
+        row = {
+            "candidates": size,
+            "distinct_topics": len(set(topics)),
+            "true_groups": len(set(groups)),
+            "clusters": len(set(clusters)),
+            **_pair_quality(clusters, groups),
+            "cluster_ms": round(cluster_ms, 1),
+            "assemble_ms": round(assemble_ms, 1),
+            "selected": exam["total_questions"],
+            "selected_marks": exam["total_marks"],
+            "by_difficulty": exam["by_difficulty"],
+        }
+        if size <= args.pairwise_max:
+            start = time.perf_counter()
+            _pairwise_clusters(topics, args.threshold)
+            row["pairwise_ms"] = round((time.perf_counter() - start) * 1000, 1)
+        results.append(row)
+
+    dump({
+        "benchmark": "exam_assembly",
+        "variants_per_topic": args.variants,
+        "threshold": args.threshold,
+        "results": results,
+    }, args.out)
+
+
+if __name__ == "__main__":
+    main()
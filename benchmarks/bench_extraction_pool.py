@@ -0,0 +1,90 @@
+"""
+benchmarks/bench_extraction_pool.py
+-----------------------------------
+Saturates /content/upload with large PDFs while probing /health and /exam/create,
+and reports probe latency percentiles. With the extraction pool the probe p99
+should stay flat; --inline runs extraction on the event loop for comparison.
+
+    python -m benchmarks.bench_extraction_pool --uploads 16 --pdf-mb 20
+"""
+
+import argparse
+import asyncio
+import os
+import time
+
+from benchmarks._asgi import request, form_body, multipart_body, percentiles, dump
+from benchmarks.fixtures import fixture, syllabus_text
+
+
+async def _probe(app, path, body, headers, stop, samples):
+    while not stop.is_set():
+        _, _, _, latency = await request(app, "GET" if not body else "POST", path, body, headers)
+        samples.append(latency)
+        await asyncio.sleep(0.01)
+
+
+async def run(uploads, pdf_mb, inline):
+    from api.main import app
+    from core.extraction_pool import extraction_pool
+
+    if inline:
+        async def _inline_submit(fn, *args, timeout=None):
+            return fn(*args)
+        async def _inline_imap(fn, arg_list, window=None, timeout=None):
+            for args in arg_list:
+                yield fn(*args)
+        extraction_pool.submit = _inline_submit
+        extraction_pool.imap = _inline_imap
+
+    with open(fixture("pdf", pdf_mb * 1024 * 1024), "rb") as f:
+        payload = f.read()
+    upload_body, upload_headers = multipart_body("file", "bench.pdf", payload, "application/pdf")
+    exam_body, exam_headers = form_body({"syllabus": syllabus_text(50)})
+
+    stop = asyncio.Event()
+    health, exam = [], []
+    probes = [
+        asyncio.create_task(_probe(app, "/health", b"", {}, stop, health)),
+        asyncio.create_task(_probe(app, "/exam/create", exam_body, exam_headers, stop, exam)),
+    ]
+    await asyncio.sleep(0.5)
+    baseline_health, baseline_exam = list(health), list(exam)
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*[
+        request(app, "POST", "/content/upload", upload_body, upload_headers) for _ in range(uploads)
+    ])
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await asyncio.gather(*probes)
+    extraction_pool.shutdown()
+
+    statuses = {}
+    for status, _, _, _ in results:
+        statuses[str(status)] = statuses.get(str(status), 0) + 1
+    return {
+        "mode": "inline" if inline else f"pool:{extraction_pool.backend}x{extraction_pool.max_workers}",
+        "uploads": uploads,
+        "pdf_mb": pdf_mb,
+        "upload_wall_s": round(elapsed, 3),
+        "upload_statuses": statuses,
+        "health_idle_ms": percentiles(baseline_health),
+        "health_loaded_ms": percentiles(health[len(baseline_health):]),
+        "exam_idle_ms": percentiles(baseline_exam),
+        "exam_loaded_ms": percentiles(exam[len(baseline_exam):]),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--uploads", type=int, default=8)
+    parser.add_argument("--pdf-mb", type=int, default=10)
+    parser.add_argument("--inline", action="store_true", help="parse on the event loop (old behaviour)")
+    parser.add_argument("--out", default=os.getenv("BENCH_OUT"))
+    args = parser.parse_args()
+    dump(asyncio.run(run(args.uploads, args.pdf_mb, args.inline)), args.out)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+benchmarks/bench_generator.py
+-----------------------------
+Throughput of the HTTP generator backend against the local stub server
+(core/generator_stub.py, started in-process on a free port). Many concurrent
+callers each request a batch of prompts drawn from a shared topic pool, so
+prompts overlap across callers. Compared configurations:
+
+  naive     one prompt per backend call, no coalescing
+  batched   micro-batching, no coalescing
+  full      micro-batching plus coalescing of identical in-flight prompts
+
+    python -m benchmarks.bench_generator --callers 64 --prompts 20 --latency-ms 20
+"""
+
+import argparse
+import os
+import random
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks._asgi import dump, percentiles
+from benchmarks.fixtures import topic_names
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _start_stub(port):
+    import uvicorn
+    from core.generator_stub import app
+
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    return server, app
+
+
+def _run(generator, workloads):
+    samples = []
+
+    def call(prompts):
+        start = time.perf_counter()
+        generator.generate_many(prompts)
+        samples.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=len(workloads)) as pool:
+        list(pool.map(call, workloads))
+    return time.perf_counter() - start, samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--callers", type=int, default=64, help="concurrent generate_many callers")
+    parser.add_argument("--prompts", type=int, default=20, help="prompts per caller")
+    parser.add_argument("--topics", type=int, default=200, help="shared topic pool size")
+    parser.add_argument("--latency-ms", type=float, default=20, help="stub latency per backend call")
+    parser.add_argument("--out", default=os.getenv("BENCH_OUT"))
+    args = parser.parse_args()
+
+    os.environ["STUB_LATENCY_MS"] = str(args.latency_ms)
+    from core.generation import Generator, HTTPBackend, prompt
+
+    port = _free_port()
+    server, stub = _start_stub(port)
+    url = f"http://127.0.0.1:{port}/generate"
+
+    rng = random.Random(11)
+    pool = topic_names(args.topics, seed=11)
+    workloads = [
+        [prompt("lesson", topic=t) for t in rng.sample(pool, args.prompts)] for _ in range(args.callers)
+    ]
+    total = args.callers * args.prompts
+
+    configs = {
+        "naive": {"max_batch": 1, "batch_window_ms": 0, "coalesce": False},
+        "batched": {"coalesce": False},
+        "full": {},
+    }
+    results = {}
+    for name, options in configs.items():
+        generator = Generator(HTTPBackend(url), **options)
+        generator.generate_many([prompt("lesson", topic="warmup")])  # open the connection pool
+        stub.state.calls = stub.state.prompts = 0
+        elapsed, samples = _run(generator, workloads)
+        stats = generator.stats()
+        results[name] = {
+            "wall_s": round(elapsed, 3),
+            "prompts_per_s": round(total / elapsed),
+            "caller_latency_ms": percentiles(samples),
+            "backend_calls": stub.state.calls,
+            "backend_prompts": stub.state.prompts,
+            "coalesced": stats["coalesced"],
+            "avg_batch": stats["avg_batch"],
+        }
+        generator.close()
+
+    server.should_exit = True
+    dump({
+        "benchmark": "generator",
+        "callers": args.callers,
+        "prompts_per_caller": args.prompts,
+        "topic_pool": args.topics,
+        "stub_latency_ms": args.latency_ms,
+        "results": results,
+    }, args.out)
+
+
+if __name__ == "__main__":
+    main()
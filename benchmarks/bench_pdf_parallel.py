@@ -0,0 +1,83 @@
+"""
+benchmarks/bench_pdf_parallel.py
+--------------------------------
+Wall time of PDF topic extraction against page count and worker count:
+serial (one process reads every page) versus page-range-parallel extraction
+over a process pool of 1..16 workers. Also times early topic detection, with
+a topic budget and with a table-of-contents first page.
+
+    python -m benchmarks.bench_pdf_parallel --pages 50 200 800 --workers 1 2 4 8 16
+"""
+
+import argparse
+import asyncio
+import os
+import time
+
+from benchmarks._asgi import dump
+from benchmarks.fixtures import FIXTURE_DIR, write_pdf
+
+
+def _pdf(pages, toc=None):
+    os.makedirs(FIXTURE_DIR, exist_ok=True)
+    path = os.path.join(FIXTURE_DIR, f"pages_{pages}{'_toc' if toc else ''}.pdf")
+    if not os.path.exists(path):
+        write_pdf(path, 0, pages=pages, toc=toc)
+    return path
+
+
+def _best_of(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return round(best * 1000, 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pages", type=int, nargs="+", default=[50, 200, 800])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    parser.add_argument("--budget", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--out", default=os.getenv("BENCH_OUT"))
+    args = parser.parse_args()
+
+    # Every PDF takes the page-parallel path, whatever its size
+    os.environ["PDF_PARALLEL_MIN_PAGES"] = "1"
+    from agents.content_agent import service
+    from core.extraction_pool import ExtractionPool
+
+    toc_titles = ["Graph Theory", "Linear Algebra", "Compiler Design", "Operating Systems"]
+    results = []
+    for pages in args.pages:
+        path = _pdf(pages)
+        toc_path = _pdf(pages, toc=toc_titles)
+        row = {
+            "pages": pages,
+            "serial_ms": _best_of(lambda: service.extract_topics_from_file(path, "pdf", 0), args.repeat),
+            "serial_budget_ms": _best_of(
+                lambda: service.extract_topics_from_file(path, "pdf", args.budget), args.repeat),
+            "serial_toc_ms": _best_of(lambda: service.extract_topics_from_file(toc_path, "pdf", 0), args.repeat),
+            "parallel_ms": {},
+        }
+        for workers in args.workers:
+            pool = ExtractionPool(backend="process", max_workers=workers, max_pending=workers)
+            run = lambda: asyncio.run(service.extract_topics_from_pdf_parallel(path, pool, 0))
+            run()  # spawn the workers outside the timing
+            row["parallel_ms"][workers] = _best_of(run, args.repeat)
+            pool.shutdown()
+        results.append(row)
+
+    dump({
+        "benchmark": "pdf_parallel",
+        "cpu_count": os.cpu_count(),
+        "pages_per_task": service.PDF_PAGES_PER_TASK,
+        "topic_budget": args.budget,
+        "results": results,
+    }, args.out)
+
+
+if __name__ == "__main__":
+    main()
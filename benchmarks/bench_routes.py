@@ -0,0 +1,167 @@
+"""
+benchmarks/bench_routes.py
+--------------------------
+In-process ASGI load test of every agent route and the workflow endpoints.
+Each route is driven closed-loop at fixed concurrency and reports RPS and
+p50/p95/p99 latency:
+
+  cold  a fresh input per request (unique syllabus / upload), so caches miss
+  warm  one repeated input, served from the agent output caches
+
+Uploads use synthetic PDF/DOCX/CSV fixtures of --upload-kb, one distinct file
+per request. Caches, the search index and uploads go to a temporary
+directory, so runs are reproducible and comparable with benchmarks.compare.
+
+    python -m benchmarks.bench_routes --requests 200 --concurrency 16 --topics 20
+    python -m benchmarks.bench_routes --routes workflow exam --out results.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import tempfile
+
+from benchmarks._asgi import dump, form_body, load, multipart_body, request
+from benchmarks.fixtures import answers_csv, fixture, syllabus_text
+
+_UPLOAD_TYPES = {
+    "pdf": "application/pdf",
+    "docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    "csv": "text/csv",
+}
+
+
+def _form(path, field="syllabus"):
+    """Route taking a syllabus form field; returns a make_request(syllabus) factory."""
+    def make(syllabus):
+        body, headers = form_body({field: syllabus})
+        return "POST", path, body, headers, None
+    return make
+
+
+def _query(path, **extra):
+    def make(syllabus):
+        return "POST", path, b"", {}, {"syllabus": syllabus, **extra}
+    return make
+
+
+def _syllabus_routes(batch_size, topics):
+    def batch(syllabus):
+        # run_batch: the syllabus plus batch_size - 1 variants sharing its topics
+        body = json.dumps([syllabus] + [f"{syllabus}, Extra Topic {i}" for i in range(batch_size - 1)])
+        return "POST", "/workflow/run_batch", body.encode(), {"content-type": "application/json"}, None
+
+    return {
+        "content.generate": _form("/content/generate"),
+        "exam.create": _form("/exam/create"),
+        "rubric.design": _form("/rubric/design"),
+        "evaluate.evaluate": _form("/evaluate/evaluate"),
+        "analytics.analyze": _form("/analytics/analyze"),
+        "workflow.run_async": _query("/workflow/run_async"),
+        "workflow.stream": _query("/workflow/stream", format="ndjson"),
+        "workflow.run_batch": batch,
+    }
+
+
+def _upload(path, field, payloads, filename, content_type):
+    def make(i):
+        body, headers = multipart_body(field, filename, payloads[i % len(payloads)], content_type)
+        return "POST", path, body, headers, None
+    return make
+
+
+def _get(path, query=None):
+    return lambda i: ("GET", path, b"", {}, query)
+
+
+async def run(args):
+    from api.main import app
+
+    results = {}
+    selected = lambda name: not args.routes or any(r in name for r in args.routes)
+
+    for name, make in _syllabus_routes(args.batch_size, args.topics).items():
+        if not selected(name):
+            continue
+        fixed = syllabus_text(args.topics, seed=1)
+        await request(app, *make(fixed))  # prime the caches for the warm run
+        results[name] = {
+            "cold": await load(
+                app, lambda i, make=make: make(syllabus_text(args.topics, seed=10 ** 6 + i)),
+                args.requests, args.concurrency,
+            ),
+            "warm": await load(app, lambda i, make=make: make(fixed), args.requests, args.concurrency),
+        }
+
+    for kind, content_type in _UPLOAD_TYPES.items():
+        name = f"content.upload.{kind}"
+        if not selected(name):
+            continue
+        payloads = []
+        for seed in range(args.upload_requests):
+            with open(fixture(kind, args.upload_kb * 1024, seed=100 + seed), "rb") as f:
+                payloads.append(f.read())
+        make = _upload("/content/upload", "file", payloads, f"syllabus.{kind}", content_type)
+        results[name] = {
+            "cold": await load(app, make, len(payloads), args.concurrency),
+            "warm": await load(app, make, args.requests, args.concurrency),
+        }
+
+    answers = [answers_csv(args.students, args.questions, seed=seed) for seed in range(4)]
+    for name, path in (("evaluate.grade", "/evaluate/grade"), ("analytics.ingest", "/analytics/ingest")):
+        if selected(name):
+            make = _upload(path, "file", answers, "answers.csv", "text/csv")
+            results[name] = {"cold": await load(app, make, max(args.requests // 10, 4), args.concurrency)}
+
+    reads = {
+        "health": _get("/health"),
+        "analytics.summary": _get("/analytics/summary"),
+        "analytics.cohort": _get("/analytics/cohorts/default"),
+        "analytics.student": _get("/analytics/students/s1"),
+        "analytics.weak_topics": _get("/analytics/weak_topics"),
+        "search": _get("/search", {"q": syllabus_text(1, seed=1).split()[0]}),
+    }
+    for name, make in reads.items():
+        if selected(name):
+            results[name] = {"warm": await load(app, make, args.requests, args.concurrency)}
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200, help="requests per route and mode")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--topics", type=int, default=20, help="topics per syllabus")
+    parser.add_argument("--batch-size", type=int, default=10, help="syllabi per /workflow/run_batch call")
+    parser.add_argument("--upload-kb", type=int, default=256)
+    parser.add_argument("--upload-requests", type=int, default=16, help="distinct files per upload type")
+    parser.add_argument("--students", type=int, default=200)
+    parser.add_argument("--questions", type=int, default=20)
+    parser.add_argument("--routes", nargs="*", help="only routes whose name contains one of these")
+    parser.add_argument("--out", default=os.getenv("BENCH_OUT"))
+    args = parser.parse_args()
+
+    data_dir = tempfile.mkdtemp(prefix="bench_routes_")
+    for var, sub in (("CACHE_DIR", "cache"), ("INDEX_DIR", "index"), ("UPLOAD_DIR", "uploads"),
+                     ("JOB_DB_PATH", "jobs.sqlite3")):
+        os.environ[var] = os.path.join(data_dir, sub)
+    try:
+        results = asyncio.run(run(args))
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+    dump({
+        "benchmark": "routes",
+        "cpu_count": os.cpu_count(),
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "topics": args.topics,
+        "upload_kb": args.upload_kb,
+        "routes": results,
+    }, args.out)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+benchmarks/bench_rubrics.py
+---------------------------
+Payload size and per-call cost of referenced rubric templates.
+
+  bytes     /rubric/design and /workflow/run_async response sizes with the
+            rubric referenced by id (current) against the embedded form
+            (criteria descriptions + the echoed syllabus text), per syllabus
+            size, raw and gzip
+  design_us one design_rubric call: registry reference against rebuilding
+            the four-criterion dict per call
+  rubric_us scoring rubric per grading call: Rubric(weights) validation
+            against the precompiled template
+
+    python -m benchmarks.bench_rubrics --sizes 10 100 1000
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import tempfile
+import time
+
+from benchmarks._asgi import dump, form_body, request
+from benchmarks.fixtures import syllabus_text
+
+
+def _best_us(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return round(best * 1e6, 2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000], help="topics per syllabus")
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--out", default=os.getenv("BENCH_OUT"))
+    args = parser.parse_args()
+
+    data_dir = tempfile.mkdtemp(prefix="bench_rubrics_")
+    for var, sub in (("CACHE_DIR", "cache"), ("INDEX_DIR", "index"), ("RUBRIC_DB_PATH", "rubrics.sqlite3"),
+                     ("JOB_DB_PATH", "jobs.sqlite3")):
+        os.environ[var] = os.path.join(data_dir, sub)
+
+    from agents.rubric_agent import service as rubric
+    from api.main import app
+    from api.middleware.compression import compress
+    from api.responses import dumps
+    from core.generation import generator, prompt
+    from core.rubrics import rubric_registry
+    from core.scoring import Rubric
+
+    template = rubric.agent.standard_template()
+
+    def embedded(result, text):
+        # The pre-registry rubric output: every criterion description plus the syllabus
+        legacy = {k: v for k, v in result.items() if k != "rubric"}
+        return {**legacy, "criteria": dict(zip(template.criteria, template.descriptions)), "syllabus": text}
+
+    def sizes(payload):
+        raw = dumps(payload)
+        return {"raw": len(raw), "gzip": len(compress(raw, "gzip"))}
+
+    async def measure():
+        rows = {}
+        for size in args.sizes:
+            text = syllabus_text(size, seed=size)
+            body, headers = form_body({"syllabus": text})
+            _, _, design, _ = await request(app, "POST", "/rubric/design", body, headers)
+            design = json.loads(design)
+            _, _, workflow, _ = await request(app, "POST", "/workflow/run_async", query={"syllabus": text})
+            workflow = json.loads(workflow)
+            legacy_workflow = json.loads(json.dumps(workflow))
+            results = legacy_workflow["workflow_results"]
+            results["Rubric Agent"] = embedded(results["Rubric Agent"], text)
+            rows[size] = {
+                "rubric_design": {
+                    "referenced": sizes(design),
+                    "embedded": sizes({**design, "data": embedded(design["data"], text)}),
+                },
+                "workflow_run_async": {"referenced": sizes(workflow), "embedded": sizes(legacy_workflow)},
+            }
+            for route in rows[size].values():
+                route["reduction"] = round(1 - route["referenced"]["raw"] / route["embedded"]["raw"], 4)
+        return rows
+
+    def rebuild():
+        criteria = ["Knowledge", "Clarity", "Creativity", "Application"]
+        descriptions = generator.generate_many([prompt("criterion", criterion=c.lower()) for c in criteria])
+        return dict(zip(criteria, descriptions))
+
+    weights = {"knowledge": 0.4, "clarity": 0.3, "creativity": 0.3}
+    graded = rubric_registry.register("bench", dict.fromkeys(weights, ""), weights)
+    try:
+        bytes_by_size = asyncio.run(measure())
+        result = {
+            "benchmark": "rubrics",
+            "bytes": bytes_by_size,
+            "design_us": {
+                "referenced": _best_us(lambda: rubric.design_rubric("A, B"), args.repeat),
+                "rebuilt": _best_us(rebuild, args.repeat),
+            },
+            "rubric_us": {
+                "precompiled": _best_us(lambda: rubric_registry.compiled(graded.id), args.repeat),
+                "from_weights": _best_us(lambda: Rubric(weights), args.repeat),
+            },
+        }
+    finally:
+        rubric_registry.close()
+        shutil.rmtree(data_dir, ignore_errors=True)
+    dump(result, args.out)
+
+
+if __name__ == "__main__":
+    main()
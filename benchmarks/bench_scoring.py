@@ -0,0 +1,102 @@
+"""
+benchmarks/bench_scoring.py
+---------------------------
+Grades a synthetic cohort (default 100k students x 50 questions x 3 rubric
+criteria) with the vectorized scoring engine, and compares it with a plain
+Python loop over the same answers (run on a slice and reported per answer).
+Also times CSV parsing of an answer upload.
+
+    python -m benchmarks.bench_scoring --students 100000 --questions 50
+"""
+
+import argparse
+import os
+import time
+
+import numpy as np
+
+from benchmarks._asgi import dump
+
+
+def _timed(fn):
+    start = time.perf_counter()
+    value = fn()
+    return value, round((time.perf_counter() - start) * 1000, 3)
+
+
+def _loop_grade(marks, weights, max_score):
+    totals = []
+    for student in marks.tolist():
+        total = 0.0
+        for answer in student:
+            total += sum(m * w for m, w in zip(answer, weights)) / max_score
+        totals.append(100.0 * total / len(student))
+    return totals
+
+
+def _csv_body(marks, criteria):
+    lines = ["student_id,question_id," + ",".join(criteria)]
+    for s, student in enumerate(marks.tolist()):
+        for q, answer in enumerate(student):
+            lines.append(f"s{s},q{q}," + ",".join(f"{m:g}" for m in answer))
+    return ("\n".join(lines) + "\n").encode()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--students", type=int, default=100000)
+    parser.add_argument("--questions", type=int, default=50)
+    parser.add_argument("--loop-students", type=int, default=2000)
+    parser.add_argument("--csv-students", type=int, default=5000)
+    parser.add_argument("--out", default=os.getenv("BENCH_OUT"))
+    args = parser.parse_args()
+
+    from core.scoring import AnswerSheet, Rubric, SCORE_MAX, grade, parse_answers
+
+    rubric = Rubric()
+    criteria = rubric.criteria
+    rng = np.random.default_rng(7)
+    marks = rng.integers(0, int(SCORE_MAX) + 1, size=(args.students, args.questions, len(criteria))).astype(np.float32)
+    answers = args.students * args.questions
+
+    student_ids = np.repeat(np.arange(args.students), args.questions).astype(str).tolist()
+    question_ids = np.tile(np.arange(args.questions), args.students).astype(str).tolist()
+    sheet, build_ms = _timed(lambda: AnswerSheet.from_columns(
+        student_ids, question_ids, marks.reshape(-1, len(criteria)), criteria))
+    result, grade_ms = _timed(lambda: grade(sheet, rubric))
+    _, summary_ms = _timed(result.summary)
+
+    loop_marks = marks[:args.loop_students]
+    weights = rubric.weights.tolist()
+    loop_totals, loop_ms = _timed(lambda: _loop_grade(loop_marks, weights, SCORE_MAX))
+    check = grade(AnswerSheet(
+        list(range(len(loop_marks))), list(range(args.questions)), criteria,
+        loop_marks, np.ones(loop_marks.shape[:2], dtype=bool)), rubric).totals
+    assert np.allclose(check, loop_totals, atol=1e-3)
+
+    body = _csv_body(marks[:args.csv_students], criteria)
+    _, parse_ms = _timed(lambda: parse_answers(body, criteria, "csv"))
+    csv_rows = args.csv_students * args.questions
+
+    loop_per_answer_us = loop_ms * 1000 / (len(loop_marks) * args.questions)
+    dump({
+        "benchmark": "scoring",
+        "students": args.students,
+        "questions": args.questions,
+        "criteria": len(criteria),
+        "answers": answers,
+        "tensor_mb": round(sheet.scores.nbytes / 2 ** 20, 1),
+        "build_sheet_ms": build_ms,
+        "vectorized_grade_ms": grade_ms,
+        "summary_ms": summary_ms,
+        "vectorized_answers_per_s": round(answers / (grade_ms / 1000)),
+        "python_loop_answers_per_s": round(1e6 / loop_per_answer_us),
+        "python_loop_projected_ms": round(loop_per_answer_us * answers / 1000, 1),
+        "csv_rows": csv_rows,
+        "csv_parse_ms": parse_ms,
+        "csv_rows_per_s": round(csv_rows / (parse_ms / 1000)),
+    }, args.out)
+
+
+if __name__ == "__main__":
+    main()
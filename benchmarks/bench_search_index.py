@@ -0,0 +1,107 @@
+"""
+benchmarks/bench_search_index.py
+--------------------------------
+Builds the search index incrementally over N documents (exam questions,
+lessons and syllabi drawn from a shared topic pool), reopens it from disk, and
+times term, multi-term, phrase and topic queries. Question reuse is measured
+by generating an exam whose topics are already indexed.
+
+    python -m benchmarks.bench_search_index --docs 100000
+"""
+
+import argparse
+import os
+import random
+import shutil
+import tempfile
+import time
+
+from benchmarks._asgi import dump, percentiles
+from benchmarks.fixtures import topic_names
+
+
+def _latency(fn, queries):
+    samples = []
+    for query in queries:
+        start = time.perf_counter()
+        fn(query)
+        samples.append(time.perf_counter() - start)
+    return percentiles(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--docs", type=int, default=100000)
+    parser.add_argument("--topics", type=int, default=20000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--out", default=os.getenv("BENCH_OUT"))
+    args = parser.parse_args()
+
+    path = tempfile.mkdtemp(prefix="bench_index_")
+    os.environ["INDEX_DIR"] = path
+    from core.search_index import SearchIndex, search_index
+    from agents.exam_agent.service import agent as exam_agent
+
+    rng = random.Random(5)
+    pool = topic_names(args.topics, seed=5)
+
+    index = SearchIndex(path)
+    start = time.perf_counter()
+    batch = []
+    for i in range(args.docs):
+        topic = pool[i % len(pool)]
+        kind = ("question", "lesson", "syllabus")[i % 3]
+        if kind == "syllabus":
+            topics = rng.sample(pool, 8)
+            text = " ".join(topics)
+        else:
+            topics = [topic]
+            text = f"{topic} Explain the core concepts of {topic} with worked examples."
+        batch.append({"kind": kind, "text": text, "key": f"{kind}:{i}", "topics": topics, "data": {"n": i}})
+        if len(batch) == 1000:
+            index.add_many(batch)
+            batch = []
+    index.add_many(batch)
+    index.flush()
+    build_s = time.perf_counter() - start
+    stats = index.stats()
+    index.close()
+
+    start = time.perf_counter()
+    index = search_index  # the shared instance, reopened from disk
+    index.stats()
+    reopen_ms = (time.perf_counter() - start) * 1000
+
+    sample = [rng.choice(pool) for _ in range(args.queries)]
+    words = [t.split()[0] for t in sample]
+    result = {
+        "benchmark": "search_index",
+        "documents": stats["documents"],
+        "segments": stats["segments"],
+        "disk_mb": round(stats["disk_bytes"] / 2 ** 20, 1),
+        "build_s": round(build_s, 3),
+        "docs_per_s": round(args.docs / build_s),
+        "reopen_ms": round(reopen_ms, 3),
+        "query_ms": {
+            "term": _latency(lambda w: index.search(w, limit=10), words),
+            "two_terms": _latency(lambda t: index.search(t, limit=10), sample),
+            "phrase": _latency(lambda t: index.search(f'"{t}"', limit=10), sample),
+            "term_kind_filter": _latency(lambda w: index.search(w, kind="question", limit=10), words),
+            "topic_lookup": _latency(lambda t: index.find_topics([t]), sample),
+        },
+    }
+
+    # Question reuse: an exam over already-indexed topics
+    exam_topics = ", ".join(sample[:200])
+    start = time.perf_counter()
+    exam = exam_agent.generate_exam(exam_topics)
+    result["exam_200_topics_ms"] = round((time.perf_counter() - start) * 1000, 3)
+    result["exam_reused_questions"] = exam["reused_questions"]
+
+    index.close()
+    shutil.rmtree(path, ignore_errors=True)
+    dump(result, args.out)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+benchmarks/bench_serialization.py
+---------------------------------
+Serialization cost and wire size of a large /workflow/run_async response:
+FastAPI's default path (jsonable_encoder + stdlib json) against
+FastJSONResponse, full against compact payloads, and raw against gzip / br.
+
+    python -m benchmarks.bench_serialization --topics 5000
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+
+from benchmarks._asgi import request, dump, percentiles
+from benchmarks.fixtures import syllabus_text
+
+
+def _best_of(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return round(best * 1000, 3)
+
+
+async def _latencies(app, query, headers, repeat):
+    samples, size = [], 0
+    for _ in range(repeat):
+        status, _, body, latency = await request(app, "POST", "/workflow/run_async", headers=headers, query=query)
+        assert status == 200
+        samples.append(latency)
+        size = len(body)
+    return {"bytes": size, **percentiles(samples)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--topics", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--out", default=os.getenv("BENCH_OUT"))
+    args = parser.parse_args()
+
+    os.environ.setdefault("CACHE_DIR", tempfile.mkdtemp(prefix="bench_serialization_"))
+    import asyncio
+    from fastapi.encoders import jsonable_encoder
+    from api.main import app
+    from api.middleware import compression
+    from api.responses import FastJSONResponse, compact_payload, orjson
+
+    text = syllabus_text(args.topics)
+    status, _, body, _ = asyncio.run(request(app, "POST", "/workflow/run_async", query={"syllabus": text}))
+    assert status == 200
+    payload = json.loads(body)
+    compact = compact_payload(payload)
+
+    def legacy(content):
+        return json.dumps(jsonable_encoder(content), ensure_ascii=False, allow_nan=False,
+                          indent=None, separators=(",", ":")).encode("utf-8")
+
+    def fast(content):
+        return FastJSONResponse(content).body
+
+    sizes = {}
+    for label, content in (("full", payload), ("compact", compact)):
+        raw = fast(content)
+        sizes[label] = {"raw": len(raw), "gzip": len(compression.compress(raw, "gzip"))}
+        if compression.brotli is not None:
+            sizes[label]["br"] = len(compression.compress(raw, "br"))
+
+    async def end_to_end():
+        out = {}
+        for label, query in (("full", {"syllabus": text}), ("compact", {"syllabus": text, "compact": "true"})):
+            out[label] = await _latencies(app, query, {}, args.repeat)
+            out[label + "_gzip"] = await _latencies(app, query, {"accept-encoding": "gzip"}, args.repeat)
+        return out
+
+    dump({
+        "benchmark": "serialization",
+        "topics": args.topics,
+        "orjson": orjson is not None,
+        "brotli": compression.brotli is not None,
+        "encode_ms": {
+            "jsonable_encoder_json_full": _best_of(lambda: legacy(payload), args.repeat),
+            "fast_json_full": _best_of(lambda: fast(payload), args.repeat),
+            "fast_json_compact": _best_of(lambda: fast(compact_payload(payload)), args.repeat),
+        },
+        "bytes": sizes,
+        "end_to_end": asyncio.run(end_to_end()),
+    }, args.out)
+
+
+if __name__ == "__main__":
+    main()
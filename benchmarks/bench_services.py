@@ -0,0 +1,117 @@
+"""
+benchmarks/bench_services.py
+----------------------------
+Micro-benchmarks of every agent service function across syllabus sizes,
+called directly (no HTTP):
+
+  cold  the agent method on a fresh syllabus each repeat (no cache hits,
+        no search-index reuse)
+  warm  the memoized module-level function on one repeated syllabus
+
+Also times topic extraction from PDF/DOCX/CSV fixtures of --file-kb and
+answer grading / analytics ingestion for cohorts of the same sizes.
+
+    python -m benchmarks.bench_services --sizes 10 100 1000 --repeat 20
+"""
+
+import argparse
+import os
+import shutil
+import statistics
+import tempfile
+import time
+
+from benchmarks._asgi import dump
+from benchmarks.fixtures import answers_csv, fixture, syllabus_text
+
+
+def _timings(fn, repeat):
+    """fn(i) for i in range(repeat); returns median / min / max in ms."""
+    samples = []
+    for i in range(repeat):
+        start = time.perf_counter()
+        fn(i)
+        samples.append((time.perf_counter() - start) * 1000)
+    return {
+        "median_ms": round(statistics.median(samples), 3),
+        "min_ms": round(min(samples), 3),
+        "max_ms": round(max(samples), 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000], help="topics per syllabus")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--file-kb", type=int, nargs="+", default=[64, 1024])
+    parser.add_argument("--questions", type=int, default=20, help="questions per student when grading")
+    parser.add_argument("--out", default=os.getenv("BENCH_OUT"))
+    args = parser.parse_args()
+
+    data_dir = tempfile.mkdtemp(prefix="bench_services_")
+    os.environ["CACHE_DIR"] = os.path.join(data_dir, "cache")
+    os.environ["INDEX_DIR"] = os.path.join(data_dir, "index")
+    os.environ["UPLOAD_DIR"] = os.path.join(data_dir, "uploads")
+
+    from agents.analytics_agent import service as analytics
+    from agents.content_agent import service as content
+    from agents.evaluator_agent import service as evaluator
+    from agents.exam_agent import service as exam
+    from agents.rubric_agent import service as rubric
+    from core.syllabus import Syllabus
+
+    agents = {
+        "syllabus.parse": (Syllabus.parse, None),
+        "content.generate_content": (lambda s: content.agent._build_content(s.topics), content.generate_content),
+        "exam.generate_exam": (exam.agent.generate_exam, exam.generate_exam),
+        "rubric.design_rubric": (rubric.agent.design_rubric, rubric.design_rubric),
+        "evaluator.evaluate_responses": (evaluator.agent.evaluate_responses, evaluator.evaluate_responses),
+        "analytics.analyze_performance": (analytics.agent.analyze_performance, analytics.analyze_performance),
+    }
+
+    try:
+        by_size = {}
+        for size in args.sizes:
+            fixed = Syllabus.parse(syllabus_text(size, seed=1))
+            row = {}
+            for name, (cold, warm) in agents.items():
+                # Fresh text and topics per repeat, offset per function so none reuse another's output
+                seed = 10 ** 6 * (len(row) + 1) + size * 1000
+                if name == "syllabus.parse":
+                    texts = [syllabus_text(size, seed=seed + i) for i in range(args.repeat)]
+                    row[name] = {"cold": _timings(lambda i: cold(texts[i]), args.repeat)}
+                    continue
+                parsed = [Syllabus.parse(syllabus_text(size, seed=seed + i)) for i in range(args.repeat)]
+                warm(fixed)
+                row[name] = {
+                    "cold": _timings(lambda i: cold(parsed[i]), args.repeat),
+                    "warm": _timings(lambda i: warm(fixed), args.repeat),
+                }
+            cohort = [answers_csv(size, args.questions, seed=s) for s in range(args.repeat)]
+            row["evaluator.grade_answers"] = {"cold": _timings(lambda i: evaluator.grade_answers(cohort[i]), args.repeat)}
+            row["analytics.record_answers"] = {
+                "cold": _timings(lambda i: analytics.record_answers(cohort[i], cohort=f"c{i}"), args.repeat)
+            }
+            by_size[size] = row
+
+        extraction = {}
+        for kind in ("pdf", "docx", "csv"):
+            for kb in args.file_kb:
+                path = fixture(kind, kb * 1024)
+                extraction[f"{kind}_{kb}kb"] = _timings(
+                    lambda i: content.extract_topics_from_file(path, kind), max(3, args.repeat // 4)
+                )
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+    dump({
+        "benchmark": "services",
+        "repeat": args.repeat,
+        "questions_per_student": args.questions,
+        "by_syllabus_size": by_size,
+        "extraction": extraction,
+    }, args.out)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+benchmarks/bench_syllabus_parse.py
+----------------------------------
+Compares the old per-agent topic splitting (three comma splits plus the content
+agent's whitespace scan) with parsing a Syllabus once and sharing it across all
+five agents.
+
+    python -m benchmarks.bench_syllabus_parse --topics 10000
+"""
+
+import argparse
+import os
+import time
+
+from benchmarks._asgi import dump
+from benchmarks.fixtures import syllabus_text
+
+
+def _best_of(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return round(best * 1000, 3)
+
+
+def _legacy_topic_passes(text):
+    for _ in range(3):  # exam, evaluator, analytics
+        [t.strip() for t in text.split(",") if t.strip()]
+    list({w for w in text.split() if w.istitle() and len(w) > 3})
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--topics", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--out", default=os.getenv("BENCH_OUT"))
+    args = parser.parse_args()
+
+    from core.syllabus import Syllabus
+    from agents.content_agent.service import agent as content
+    from agents.exam_agent.service import agent as exam
+    from agents.rubric_agent.service import agent as rubric
+    from agents.evaluator_agent.service import agent as evaluator
+    from agents.analytics_agent.service import agent as analytics
+
+    text = syllabus_text(args.topics)
+
+    def all_agents(syllabus):
+        content._build_content(Syllabus.coerce(syllabus).topics)
+        exam.generate_exam(syllabus)
+        rubric.design_rubric(syllabus)
+        evaluator.evaluate_responses(syllabus)
+        analytics.analyze_performance(syllabus)
+
+    parsed = Syllabus.parse(text)
+    dump({
+        "benchmark": "syllabus_parse",
+        "topics": args.topics,
+        "unique_topics": len(parsed),
+        "legacy_topic_passes_ms": _best_of(lambda: _legacy_topic_passes(text), args.repeat),
+        "syllabus_parse_once_ms": _best_of(lambda: Syllabus.parse(text), args.repeat),
+        "agents_parse_each_ms": _best_of(lambda: all_agents(text), args.repeat),
+        "agents_shared_syllabus_ms": _best_of(lambda: all_agents(Syllabus.parse(text)), args.repeat),
+    }, args.out)
+
+
+if __name__ == "__main__":
+    main()
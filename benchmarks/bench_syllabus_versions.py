@@ -0,0 +1,98 @@
+"""
+benchmarks/bench_syllabus_versions.py
+-------------------------------------
+Cost of re-processing an edited syllabus through /workflow/run_async.
+
+A --topics syllabus is stored as version 1 under a syllabus id, then edited
+--edits times, each edit rewriting one topic. Every edit is sent twice, as
+two different rewrites so neither run sees the other's cached outputs:
+
+  full         without syllabus_id (every agent over every topic)
+  incremental  with syllabus_id (only the rewritten topic is reprocessed)
+
+Reported per mode: median / max latency and generator prompts per edit.
+
+    python -m benchmarks.bench_syllabus_versions --topics 2000 --edits 5
+"""
+
+import argparse
+import asyncio
+import os
+import shutil
+import statistics
+import tempfile
+
+from benchmarks._asgi import dump, request
+from benchmarks.fixtures import topic_names
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--topics", type=int, default=2000)
+    parser.add_argument("--edits", type=int, default=5)
+    parser.add_argument("--out", default=os.getenv("BENCH_OUT"))
+    args = parser.parse_args()
+
+    data_dir = tempfile.mkdtemp(prefix="bench_syllabus_versions_")
+    for var, sub in (("CACHE_DIR", "cache"), ("INDEX_DIR", "index"), ("RUBRIC_DB_PATH", "rubrics.sqlite3"),
+                     ("JOB_DB_PATH", "jobs.sqlite3"), ("SYLLABUS_DB_PATH", "syllabi.sqlite3")):
+        os.environ[var] = os.path.join(data_dir, sub)
+
+    from api.main import app
+    from core.generation import generator
+    from core.rubrics import rubric_registry
+    from core.syllabus_versions import syllabus_versions
+
+    topics = topic_names(args.topics, seed=args.topics)
+
+    async def run(text, syllabus_id=None):
+        query = {"syllabus": text}
+        if syllabus_id:
+            query["syllabus_id"] = syllabus_id
+        prompts = generator.stats()["prompts"]
+        status, _, body, latency = await request(app, "POST", "/workflow/run_async", query=query)
+        if status != 200 or b'"status":"error"' in body[:200]:
+            raise RuntimeError(body[:200])
+        return latency * 1000, generator.stats()["prompts"] - prompts, len(body)
+
+    async def measure():
+        first = await run(", ".join(topics), "bench")
+        modes = {"full": [], "incremental": []}
+        for edit in range(args.edits):
+            slot = (edit * 7919) % len(topics)
+            for mode in modes:
+                revised = list(topics)
+                revised[slot] = f"Revised {mode} topic {edit}"
+                modes[mode].append(await run(", ".join(revised), "bench" if mode == "incremental" else None))
+            topics[slot] = f"Revised incremental topic {edit}"
+        return first, modes
+
+    try:
+        first, modes = asyncio.run(measure())
+    finally:
+        rubric_registry.close()
+        syllabus_versions.close()
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+    summary = {
+        mode: {
+            "median_ms": round(statistics.median(ms for ms, _, _ in runs), 2),
+            "max_ms": round(max(ms for ms, _, _ in runs), 2),
+            "prompts_per_edit": statistics.median(p for _, p, _ in runs),
+            "response_bytes": runs[-1][2],
+        }
+        for mode, runs in modes.items()
+    }
+    summary["speedup"] = round(summary["full"]["median_ms"] / summary["incremental"]["median_ms"], 2)
+    dump({
+        "benchmark": "syllabus_versions",
+        "topics": args.topics,
+        "edits": args.edits,
+        "first_version_ms": round(first[0], 2),
+        "first_version_prompts": first[1],
+        "per_edit": summary,
+    }, args.out)
+
+
+if __name__ == "__main__":
+    main()
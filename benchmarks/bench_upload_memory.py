@@ -0,0 +1,70 @@
+"""
+benchmarks/bench_upload_memory.py
+---------------------------------
+Measures peak RSS of the upload path (chunked save + streaming topic extraction)
+for PDF and CSV syllabi of increasing size. Each case runs in a fresh subprocess
+so ru_maxrss reflects that case alone.
+
+    python -m benchmarks.bench_upload_memory --sizes-mb 1 50 500
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+
+def _measure(kind, size_mb):
+    from types import SimpleNamespace
+    from benchmarks.fixtures import fixture
+    from agents.content_agent import service
+
+    path = fixture(kind, size_mb * 1024 * 1024)
+    base_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    with open(path, "rb") as f:
+        filepath, ext, _ = service.save_upload(SimpleNamespace(filename=f"bench.{kind}", file=f))
+    topics = service.extract_topics_from_file(filepath, ext)
+    elapsed = time.perf_counter() - start
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return {
+        "kind": kind,
+        "size_mb": size_mb,
+        "seconds": round(elapsed, 3),
+        "topics": len(topics),
+        "baseline_rss_mb": round(base_rss / 1024, 1),
+        "peak_rss_mb": round(peak_rss / 1024, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes-mb", type=int, nargs="+", default=[1, 50, 500])
+    parser.add_argument("--kinds", nargs="+", default=["pdf", "csv"])
+    parser.add_argument("--case", nargs=2, help=argparse.SUPPRESS)
+    parser.add_argument("--out", default=os.getenv("BENCH_OUT"))
+    args = parser.parse_args()
+
+    if args.case:
+        print(json.dumps(_measure(args.case[0], int(args.case[1]))))
+        return
+
+    results = []
+    for kind in args.kinds:
+        for size in args.sizes_mb:
+            proc = subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_upload_memory", "--case", kind, str(size)],
+                capture_output=True, text=True, check=True,
+            )
+            results.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+            print(json.dumps(results[-1]), file=sys.stderr)
+
+    from benchmarks._asgi import dump
+    dump({"benchmark": "upload_memory", "results": results}, args.out)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""
+benchmarks/bench_workers.py
+---------------------------
+Load test of the multi-worker launcher (api/serve.py). For each worker count
+a real server is started on a free port with fresh data directories, then
+driven over HTTP at fixed concurrency with:
+
+  cold  /workflow/run_async on a unique syllabus per request (CPU-bound)
+  hot   /workflow/run_async over a small repeating set, answered from the
+        shared cache whichever worker computed it first
+
+Reports requests/s and latency per worker count, plus the summed PSS of the
+worker processes (shared copy-on-write pages are split between them).
+
+    python -m benchmarks.bench_workers --workers 1 2 4 --concurrency 32 --duration 10
+"""
+
+import argparse
+import asyncio
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+from benchmarks._asgi import dump, percentiles
+from benchmarks.fixtures import syllabus_text
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _children(pid):
+    try:
+        with open(f"/proc/{pid}/task/{pid}/children") as f:
+            return [int(p) for p in f.read().split()]
+    except OSError:
+        return []
+
+
+def _pss_mb(pids):
+    total = 0
+    for pid in pids:
+        try:
+            with open(f"/proc/{pid}/smaps_rollup") as f:
+                total += next(int(line.split()[1]) for line in f if line.startswith("Pss:"))
+        except (OSError, StopIteration):
+            return None
+    return round(total / 1024, 1)
+
+
+def _start(workers, port, data_dir):
+    env = dict(
+        os.environ,
+        CACHE_DIR=os.path.join(data_dir, "cache"),
+        JOB_DB_PATH=os.path.join(data_dir, "jobs.sqlite3"),
+        INDEX_DIR=os.path.join(data_dir, "index"),
+    )
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "api.serve", "--workers", str(workers), "--host", "127.0.0.1",
+         "--port", str(port), "--log-level", "warning"],
+        env=env,
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/health", timeout=1).status_code == 200:
+                return proc
+        except httpx.HTTPError:
+            time.sleep(0.1)
+    proc.kill()
+    raise RuntimeError("server did not start")
+
+
+async def _load(base, syllabi, concurrency, duration):
+    samples, errors = [], 0
+    counter = iter(range(10 ** 9))
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base, timeout=60, limits=limits) as client:
+        deadline = time.perf_counter() + duration
+
+        async def user():
+            nonlocal errors
+            while time.perf_counter() < deadline:
+                syllabus = syllabi(next(counter))
+                start = time.perf_counter()
+                response = await client.post("/workflow/run_async", params={"syllabus": syllabus})
+                samples.append(time.perf_counter() - start)
+                errors += response.status_code != 200
+
+        start = time.perf_counter()
+        await asyncio.gather(*[user() for _ in range(concurrency)])
+        elapsed = time.perf_counter() - start
+    return {"requests": len(samples), "rps": round(len(samples) / elapsed, 1), "errors": errors,
+            "latency_ms": percentiles(samples)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=10, help="seconds per scenario")
+    parser.add_argument("--topics", type=int, default=40, help="topics per syllabus")
+    parser.add_argument("--hot-set", type=int, default=20, help="distinct syllabi in the hot scenario")
+    parser.add_argument("--out", default=os.getenv("BENCH_OUT"))
+    args = parser.parse_args()
+
+    hot = [syllabus_text(args.topics, seed=1000 + i) for i in range(args.hot_set)]
+    results = []
+    for workers in args.workers:
+        data_dir = tempfile.mkdtemp(prefix="bench_workers_")
+        port = _free_port()
+        proc = _start(workers, port, data_dir)
+        try:
+            base = f"http://127.0.0.1:{port}"
+            row = {
+                "workers": workers,
+                "cold": asyncio.run(_load(
+                    base, lambda i: syllabus_text(args.topics, seed=workers * 10 ** 6 + i),
+                    args.concurrency, args.duration,
+                )),
+                "hot": asyncio.run(_load(base, lambda i: hot[i % len(hot)], args.concurrency, args.duration)),
+            }
+            pids = _children(proc.pid) or [proc.pid]
+            row["worker_pss_mb"] = _pss_mb(pids)
+            results.append(row)
+        finally:
+            proc.terminate()
+            proc.wait(timeout=30)
+            shutil.rmtree(data_dir, ignore_errors=True)
+
+    dump({
+        "benchmark": "workers",
+        "cpu_count": os.cpu_count(),
+        "concurrency": args.concurrency,
+        "duration_s": args.duration,
+        "topics_per_syllabus": args.topics,
+        "results": results,
+    }, args.out)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+benchmarks/bench_workflow_batch.py
+----------------------------------
+Compares N sequential POST /workflow/run_async calls with one
+POST /workflow/run_batch carrying the same N syllabi. Syllabi draw from a
+shared topic pool and a fraction are exact repeats, as at term start.
+
+    python -m benchmarks.bench_workflow_batch --syllabi 200 --topics 40
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import tempfile
+import time
+
+from benchmarks._asgi import request, dump
+from benchmarks.fixtures import topic_names
+
+
+def make_batch(n, topics_per, pool_size, repeat_ratio, seed=11):
+    rng = random.Random(seed)
+    pool = topic_names(pool_size, seed)
+    batch = []
+    for _ in range(n):
+        if batch and rng.random() < repeat_ratio:
+            batch.append(rng.choice(batch))
+        else:
+            batch.append(", ".join(rng.sample(pool, topics_per)))
+    return batch
+
+
+async def run(args):
+    # Fresh cache so neither side is served from earlier runs
+    os.environ["CACHE_DIR"] = tempfile.mkdtemp(prefix="bench_batch_")
+    from api.main import app
+    from core.cache import CACHES
+
+    batch = make_batch(args.syllabi, args.topics, args.pool, args.repeat_ratio)
+
+    start = time.perf_counter()
+    for syllabus in batch:
+        status, _, _, _ = await request(app, "POST", "/workflow/run_async", query={"syllabus": syllabus})
+        assert status == 200
+    sequential = time.perf_counter() - start
+
+    for cache in CACHES.values():
+        cache.clear_memory()
+    os.environ["CACHE_DIR"] = tempfile.mkdtemp(prefix="bench_batch_")
+    for cache in CACHES.values():
+        cache.disk_dir = os.path.join(os.environ["CACHE_DIR"], cache.name)
+
+    body = json.dumps(batch).encode()
+    status, _, payload, batched = await request(
+        app, "POST", "/workflow/run_batch", body, {"content-type": "application/json"},
+        query={"concurrency": args.concurrency},
+    )
+    records = [json.loads(line) for line in payload.splitlines()]
+    assert status == 200 and len(records) == len(batch)
+
+    return {
+        "benchmark": "workflow_batch",
+        "syllabi": args.syllabi,
+        "topics_per_syllabus": args.topics,
+        "topic_pool": args.pool,
+        "deduplicated_syllabi": sum(r["deduplicated"] for r in records),
+        "sequential_s": round(sequential, 3),
+        "batch_s": round(batched, 3),
+        "speedup": round(sequential / batched, 2) if batched else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--syllabi", type=int, default=200)
+    parser.add_argument("--topics", type=int, default=40)
+    parser.add_argument("--pool", type=int, default=2000)
+    parser.add_argument("--repeat-ratio", type=float, default=0.2)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--out", default=os.getenv("BENCH_OUT"))
+    args = parser.parse_args()
+    dump(asyncio.run(run(args)), args.out)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+benchmarks/bench_workflow_memory.py
+-----------------------------------
+Per-request allocations and memory of the agent workflow on large syllabi.
+
+For each syllabus size a fresh syllabus (no cache hits) is run through the
+five agents, then the merged result is serialized as /workflow/run_async
+would. Reported per phase:
+
+  ms             wall time (measured without tracing)
+  blocks         Python memory blocks still allocated afterwards (the
+                 result, cache entries, index buffers)
+  retained_kb    traced memory still allocated afterwards
+  peak_kb        traced peak during the phase
+
+    python -m benchmarks.bench_workflow_memory --sizes 1000 10000
+"""
+
+import argparse
+import asyncio
+import gc
+import os
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks._asgi import dump
+from benchmarks.fixtures import syllabus_text
+
+
+def _measure(fn):
+    """Runs fn under tracemalloc; returns (result, stats)."""
+    gc.collect()
+    blocks = sys.getallocatedblocks()
+    tracemalloc.start()
+    base, _ = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    result = fn()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    gc.collect()
+    return result, {
+        "blocks": sys.getallocatedblocks() - blocks,
+        "retained_kb": round((current - base) / 1024, 1),
+        "peak_kb": round((peak - base) / 1024, 1),
+    }
+
+
+def _timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, round((time.perf_counter() - start) * 1000, 2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000], help="topics per syllabus")
+    parser.add_argument("--out", default=os.getenv("BENCH_OUT"))
+    args = parser.parse_args()
+
+    data_dir = tempfile.mkdtemp(prefix="bench_workflow_memory_")
+    for var, sub in (("CACHE_DIR", "cache"), ("INDEX_DIR", "index"), ("RUBRIC_DB_PATH", "rubrics.sqlite3")):
+        os.environ[var] = os.path.join(data_dir, sub)
+
+    from api.responses import dumps, json_response
+    from core.workflow import run_agent_workflow
+
+    def workflow(text):
+        return asyncio.run(run_agent_workflow(text))
+
+    results = {}
+    try:
+        workflow(syllabus_text(10, seed=1))  # pools, registry, imports
+        for size in args.sizes:
+            _, workflow_ms = _timed(lambda: workflow(syllabus_text(size, seed=10 ** 6 + size)))
+            merged, workflow_mem = _measure(lambda: workflow(syllabus_text(size, seed=2 * 10 ** 6 + size)))
+            body, serialize_ms = _timed(lambda: dumps({"status": "success", "workflow_results": merged}))
+            _, serialize_mem = _measure(lambda: dumps({"status": "success", "workflow_results": merged}))
+            _, compact_ms = _timed(lambda: json_response({"workflow_results": merged}, compact=True).body)
+            results[size] = {
+                "workflow": {"ms": workflow_ms, **workflow_mem},
+                "serialize": {"ms": serialize_ms, "bytes": len(body), **serialize_mem},
+                "serialize_compact_ms": compact_ms,
+            }
+            del merged, body
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+    dump({"benchmark": "workflow_memory", "python": sys.version.split()[0], "by_topics": results}, args.out)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+benchmarks/compare.py
+---------------------
+Compares two benchmark results (JSON files, or suite result directories
+matched by file name) metric by metric and flags regressions:
+
+  latencies and durations (p50/p95/p99, *_ms, *_s)  lower is better
+  throughputs (rps, *_per_s)                         higher is better
+
+Other numbers (counts, configuration) and single worst samples (max,
+max_ms) are ignored as too noisy. Exits 1 when any metric
+regressed by more than --threshold.
+
+    python -m benchmarks.compare data/bench_results/base data/bench_results/new --threshold 0.15
+"""
+
+import argparse
+import json
+import os
+import sys
+
+_LATENCY_KEYS = {"p50", "p95", "p99"}
+_NOISY_KEYS = {"max", "max_ms"}
+
+
+def direction(key):
+    """+1 when higher is better, -1 when lower is better, 0 when not a performance metric."""
+    if key in _NOISY_KEYS:
+        return 0
+    if key == "rps" or key.endswith("per_s"):
+        return 1
+    if key in _LATENCY_KEYS or key.endswith("_ms") or key.endswith("_s"):
+        return -1
+    return 0
+
+
+def metrics(node, prefix=""):
+    """Flattens a result into {dotted.path: (value, direction)} for its performance metrics."""
+    found = {}
+    if isinstance(node, dict):
+        for key, value in node.items():
+            path = f"{prefix}.{key}" if prefix else str(key)
+            if isinstance(value, (dict, list)):
+                found.update(metrics(value, path))
+            elif isinstance(value, (int, float)) and not isinstance(value, bool) and direction(str(key)):
+                found[path] = (float(value), direction(str(key)))
+    elif isinstance(node, list):
+        for i, value in enumerate(node):
+            found.update(metrics(value, f"{prefix}[{i}]"))
+    return found
+
+
+def compare(baseline, current, threshold, floor):
+    rows = []
+    old, new = metrics(baseline), metrics(current)
+    for path in sorted(old.keys() & new.keys()):
+        (before, sign), (after, _) = old[path], new[path]
+        if before == 0 or (sign < 0 and max(before, after) < floor):
+            continue
+        change = (after - before) / before
+        rows.append({
+            "metric": path,
+            "baseline": before,
+            "current": after,
+            "change": round(change, 4),
+            "regression": -sign * change > threshold,
+        })
+    return rows
+
+
+def _load_pairs(baseline, current):
+    if os.path.isdir(baseline):
+        names = sorted(
+            n for n in os.listdir(baseline)
+            if n.endswith(".json") and n != "meta.json" and os.path.exists(os.path.join(current, n))
+        )
+        return [(n[:-5], os.path.join(baseline, n), os.path.join(current, n)) for n in names]
+    return [(os.path.basename(baseline)[:-5], baseline, current)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--threshold", type=float, default=0.10, help="allowed relative slowdown")
+    parser.add_argument("--floor", type=float, default=1.0,
+                        help="ignore lower-is-better metrics below this value in both runs (noise)")
+    parser.add_argument("--all", action="store_true", help="print every metric, not only regressions")
+    args = parser.parse_args()
+
+    regressions = 0
+    for name, base_path, current_path in _load_pairs(args.baseline, args.current):
+        with open(base_path) as f:
+            baseline = json.load(f)
+        with open(current_path) as f:
+            current = json.load(f)
+        for row in compare(baseline, current, args.threshold, args.floor):
+            regressions += row["regression"]
+            if args.all or row["regression"]:
+                flag = "REGRESSION" if row["regression"] else ""
+                print(f"{name}:{row['metric']:<70} {row['baseline']:>12g} -> {row['current']:>12g} "
+                      f"{row['change']:+8.1%} {flag}")
+    print(f"{regressions} regression(s) beyond {args.threshold:.0%}")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+benchmarks/fixtures.py
+----------------------
+Synthetic syllabus fixtures (.pdf, .csv, .docx, plain text) of configurable size.
+PDFs are written object-by-object straight to disk so even very large files
+never need to fit in memory.
+"""
+
+import csv
+import os
+import random
+
+FIXTURE_DIR = os.getenv("BENCH_FIXTURE_DIR", "data/bench_fixtures")
+
+_WORDS = (
+    "Neural Networks Probability Linear Algebra Graph Theory Optimization Compilers "
+    "Databases Networking Cryptography Statistics Calculus Robotics Vision Ethics "
+    "Algorithms Complexity Automata Learning Systems Security Quantum Computing"
+).split()
+
+
+def topic_names(n, seed=7):
+    rng = random.Random(seed)
+    return [f"{rng.choice(_WORDS)} {rng.choice(_WORDS)} {i}" for i in range(n)]
+
+
+def syllabus_text(n_topics, seed=7):
+    """Comma-separated plain-text syllabus, the format the /*/generate routes accept."""
+    return ", ".join(topic_names(n_topics, seed))
+
+
+def _line(rng):
+    return " ".join(rng.choice(_WORDS) for _ in range(12))
+
+
+def _pdf_escape(text):
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def write_pdf(path, target_bytes, lines_per_page=40, seed=7, pages=None, toc=None):
+    """
+    Writes a text-only PDF of roughly target_bytes (or exactly `pages` pages).
+    Object 1 is the catalog, 2 the page tree (written last), 3 the font,
+    then one (page, content stream) pair per page. toc, a list of titles,
+    adds a "Table of Contents" first page with dotted page references.
+    """
+    rng = random.Random(seed)
+    offsets = {}
+    page_ids = []
+    with open(path, "wb") as f:
+        def obj(num, body):
+            offsets[num] = f.tell()
+            f.write(f"{num} 0 obj\n".encode() + body + b"\nendobj\n")
+
+        f.write(b"%PDF-1.4\n")
+        obj(1, b"<< /Type /Catalog /Pages 2 0 R >>")
+        obj(3, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+        num = 4
+        toc_lines = ["Table of Contents"] + [f"{i + 1}. {t} ........ {i + 2}" for i, t in enumerate(toc or ())]
+        while (len(page_ids) < pages) if pages else (f.tell() < target_bytes or not page_ids):
+            ops = ["BT /F1 10 Tf 40 800 Td 12 TL"]
+            if toc and not page_ids:
+                ops += [f"({_pdf_escape(line)}) Tj T*" for line in toc_lines]
+            else:
+                ops += [f"({_pdf_escape(_line(rng))}) Tj T*" for _ in range(lines_per_page)]
+            ops.append("ET")
+            stream = "\n".join(ops).encode()
+            obj(num, b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+                     b"/Resources << /Font << /F1 3 0 R >> >> /Contents "
+                     + f"{num + 1} 0 R".encode() + b" >>")
+            obj(num + 1, f"<< /Length {len(stream)} >>\nstream\n".encode() + stream + b"\nendstream")
+            page_ids.append(num)
+            num += 2
+        kids = " ".join(f"{p} 0 R" for p in page_ids)
+        obj(2, f"<< /Type /Pages /Kids [{kids}] /Count {len(page_ids)} >>".encode())
+
+        xref = f.tell()
+        f.write(f"xref\n0 {num}\n0000000000 65535 f \n".encode())
+        for i in range(1, num):
+            f.write(f"{offsets[i]:010d} 00000 n \n".encode())
+        f.write(f"trailer\n<< /Size {num} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode())
+    return path
+
+
+def write_csv(path, target_bytes, seed=7):
+    rng = random.Random(seed)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["week", "topic", "notes"])
+        week = 0
+        while f.tell() < target_bytes:
+            week += 1
+            writer.writerow([week, f"{rng.choice(_WORDS)} {rng.choice(_WORDS)}", _line(rng)])
+    return path
+
+
+def write_docx(path, paragraphs, seed=7):
+    import docx
+
+    rng = random.Random(seed)
+    document = docx.Document()
+    for _ in range(paragraphs):
+        document.add_paragraph(_line(rng))
+    document.save(path)
+    return path
+
+
+def answers_csv(students, questions, criteria=("knowledge", "clarity", "creativity"), seed=7):
+    """Answer upload for /evaluate/grade and /analytics/ingest: one row per (student, question)."""
+    rng = random.Random(seed)
+    lines = ["student_id,question_id," + ",".join(criteria)]
+    for s in range(students):
+        for q in range(questions):
+            lines.append(f"s{s},q{q}," + ",".join(str(rng.randint(0, 10)) for _ in criteria))
+    return ("\n".join(lines) + "\n").encode()
+
+
+def fixture(kind, size_bytes, seed=7):
+    """
+    Returns the path of a cached fixture, generating it on first use.
+    Different seeds give same-sized files with different content (and hashes).
+    """
+    os.makedirs(FIXTURE_DIR, exist_ok=True)
+    suffix = "" if seed == 7 else f"_{seed}"
+    path = os.path.join(FIXTURE_DIR, f"syllabus_{size_bytes}{suffix}.{kind}")
+    if not os.path.exists(path):
+        if kind == "pdf":
+            write_pdf(path, size_bytes, seed=seed)
+        elif kind == "csv":
+            write_csv(path, size_bytes, seed=seed)
+        elif kind == "docx":
+            write_docx(path, max(1, size_bytes // 100), seed=seed)
+        else:
+            raise ValueError(f"Unknown fixture kind: {kind}")
+    return path
@@ -0,0 +1,87 @@
+"""
+benchmarks/suite.py
+-------------------
+Runs a set of benchmarks, each in a fresh interpreter, and saves one JSON file
+per benchmark plus meta.json (git commit, python, cpu count) into a results
+directory, for comparison with benchmarks.compare.
+
+    python -m benchmarks.suite                       # routes + services
+    python -m benchmarks.suite --quick --out-dir data/bench_results/base
+    python -m benchmarks.suite --benchmarks routes scoring analytics
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+DEFAULT_BENCHMARKS = ("routes", "services")
+
+# Smaller workloads for a fast smoke run (e.g. in CI)
+QUICK_ARGS = {
+    "routes": ["--requests", "50", "--concurrency", "8", "--upload-kb", "64", "--upload-requests", "4"],
+    "services": ["--sizes", "10", "100", "--repeat", "5", "--file-kb", "64"],
+    "scoring": ["--students", "10000"],
+    "analytics": ["--students", "10000", "--repeat", "100"],
+    "search_index": ["--docs", "10000", "--queries", "100"],
+    "exam_assembly": ["--sizes", "1000", "10000", "--pairwise-max", "1000"],
+    "workflow_memory": ["--sizes", "1000"],
+    "syllabus_versions": ["--topics", "500", "--edits", "3"],
+    "answer_ingestion": ["--rows", "200000"],
+}
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--benchmarks", nargs="+", default=list(DEFAULT_BENCHMARKS),
+                        help="names of benchmarks/bench_<name>.py modules")
+    parser.add_argument("--out-dir", default=None)
+    parser.add_argument("--quick", action="store_true")
+    args = parser.parse_args()
+
+    stamp = datetime.datetime.utcnow().strftime("%Y%m%dT%H%M%SZ")
+    out_dir = args.out_dir or os.path.join("data", "bench_results", stamp)
+    os.makedirs(out_dir, exist_ok=True)
+
+    meta = {
+        "started_at": stamp,
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "quick": args.quick,
+        "benchmarks": {},
+    }
+    failed = False
+    for name in args.benchmarks:
+        out = os.path.join(out_dir, f"{name}.json")
+        cmd = [sys.executable, "-m", f"benchmarks.bench_{name}", "--out", out]
+        if args.quick:
+            cmd += QUICK_ARGS.get(name, [])
+        start = time.perf_counter()
+        proc = subprocess.run(cmd, stdout=subprocess.DEVNULL)
+        meta["benchmarks"][name] = {"exit_code": proc.returncode, "seconds": round(time.perf_counter() - start, 1)}
+        failed |= proc.returncode != 0
+        print(f"{name}: {'ok' if proc.returncode == 0 else 'FAILED'} -> {out}", file=sys.stderr)
+
+    with open(os.path.join(out_dir, "meta.json"), "w") as f:
+        json.dump(meta, f, indent=2)
+    print(out_dir)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+"""
+core/agent_executor.py
+----------------------
+Agent execution layer for the async workflows.
+
+Every agent is registered with an execution kind, and each call is dispatched
+accordingly instead of running synchronously on the event loop:
+
+  • async  coroutine functions, awaited directly
+  • io     blocking calls that mostly wait (cache / SQLite / index I/O,
+           remote generator requests): a shared thread pool
+  • cpu    pure computation: a process pool, so it runs beside the event
+           loop and outside the GIL (arguments and results must pickle)
+
+Each agent also has a concurrency limit (calls in flight per event loop);
+extra calls wait their turn. Kinds and limits given at registration can be
+overridden per agent, e.g. AGENT_KINDS="content=cpu" AGENT_LIMITS="exam=2".
+"""
+
+import asyncio
+import contextvars
+import os
+import threading
+import time
+import weakref
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+
+ASYNC, IO, CPU = "async", "io", "cpu"
+KINDS = (ASYNC, IO, CPU)
+
+AGENT_THREADS = int(os.getenv("AGENT_THREADS", "16"))
+AGENT_PROCESSES = int(os.getenv("AGENT_PROCESSES", str(os.cpu_count() or 1)))
+AGENT_DEFAULT_LIMIT = int(os.getenv("AGENT_DEFAULT_LIMIT", "8"))
+
+
+def _parse_overrides(raw):
+    """"content=cpu, exam=io" -> {"content": "cpu", "exam": "io"}"""
+    pairs = (item.split("=", 1) for item in raw.split(",") if "=" in item)
+    return {name.strip(): value.strip() for name, value in pairs}
+
+
+AGENT_KINDS = _parse_overrides(os.getenv("AGENT_KINDS", ""))
+AGENT_LIMITS = {name: int(limit) for name, limit in _parse_overrides(os.getenv("AGENT_LIMITS", "")).items()}
+
+
+class AgentSpec:
+    __slots__ = ("name", "fn", "kind", "limit", "running", "waiting", "completed", "failed", "busy_seconds")
+
+    def __init__(self, name, fn, kind, limit):
+        self.name = name
+        self.fn = fn
+        self.kind = kind
+        self.limit = limit
+        self.running = 0
+        self.waiting = 0
+        self.completed = 0
+        self.failed = 0
+        self.busy_seconds = 0.0
+
+
+class AgentExecutor:
+    def __init__(self, threads=AGENT_THREADS, processes=AGENT_PROCESSES, default_limit=AGENT_DEFAULT_LIMIT):
+        self.threads = threads
+        self.processes = processes
+        self.default_limit = default_limit
+        self.agents = {}
+        self._thread_pool = None
+        self._process_pool = None
+        self._semaphores = weakref.WeakKeyDictionary()  # event loop -> {agent: Semaphore}
+        self._lock = threading.Lock()
+
+    def register(self, name, fn, kind=IO, limit=None):
+        kind = AGENT_KINDS.get(name, kind)
+        if kind not in KINDS:
+            raise ValueError(f"Unknown execution kind for agent '{name}': {kind}")
+        if (kind == ASYNC) != asyncio.iscoroutinefunction(fn):
+            raise ValueError(f"Agent '{name}': only coroutine functions can (and must) use kind '{ASYNC}'.")
+        limit = AGENT_LIMITS.get(name, limit or self.default_limit)
+        self.agents[name] = AgentSpec(name, fn, kind, max(1, limit))
+        return fn
+
+    # -------------------------
+    # 🔹 Pools
+    # -------------------------
+    def _threads(self):
+        # Created lazily so importing the app never starts threads or forks
+        with self._lock:
+            if self._thread_pool is None:
+                self._thread_pool = ThreadPoolExecutor(max_workers=self.threads, thread_name_prefix="agent")
+            return self._thread_pool
+
+    def _processes(self):
+        with self._lock:
+            if self._process_pool is None:
+                self._process_pool = ProcessPoolExecutor(max_workers=self.processes)
+            return self._process_pool
+
+    def _semaphore(self, spec):
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            per_loop = self._semaphores.setdefault(loop, {})
+            semaphore = per_loop.get(spec.name)
+            if semaphore is None:
+                semaphore = per_loop[spec.name] = asyncio.Semaphore(spec.limit)
+            return semaphore
+
+    # -------------------------
+    # 🔹 Dispatch
+    # -------------------------
+    async def _dispatch(self, spec, args):
+        if spec.kind == ASYNC:
+            return await spec.fn(*args)
+        loop = asyncio.get_running_loop()
+        if spec.kind == CPU:
+            return await loop.run_in_executor(self._processes(), spec.fn, *args)
+        # Carry the current tracing span into the worker thread
+        ctx = contextvars.copy_context()
+        return await loop.run_in_executor(self._threads(), partial(ctx.run, spec.fn, *args))
+
+    async def run(self, name, *args):
+        """Runs agent `name` on args within its concurrency limit and returns its result."""
+        spec = self.agents.get(name)
+        if spec is None:
+            raise ValueError(f"Unknown agent: {name}")
+        semaphore = self._semaphore(spec)
+        with self._lock:
+            spec.waiting += 1
+        try:
+            await semaphore.acquire()
+        finally:
+            with self._lock:
+                spec.waiting -= 1
+        with self._lock:
+            spec.running += 1
+        start = time.perf_counter()
+        failed = True
+        try:
+            result = await self._dispatch(spec, args)
+            failed = False
+            return result
+        finally:
+            with self._lock:
+                spec.running -= 1
+                spec.busy_seconds += time.perf_counter() - start
+                spec.failed += failed
+                spec.completed += not failed
+            semaphore.release()
+
+    def stats(self):
+        with self._lock:
+            return {
+                spec.name: {
+                    "kind": spec.kind,
+                    "limit": spec.limit,
+                    "running": spec.running,
+                    "waiting": spec.waiting,
+                    "completed": spec.completed,
+                    "failed": spec.failed,
+                    "avg_ms": round(1000 * spec.busy_seconds / (spec.completed + spec.failed), 3)
+                    if spec.completed + spec.failed else None,
+                }
+                for spec in self.agents.values()
+            }
+
+    def shutdown(self):
+        with self._lock:
+            pools = (self._thread_pool, self._process_pool)
+            self._thread_pool = self._process_pool = None
+        for pool in pools:
+            if pool is not None:
+                pool.shutdown(wait=False, cancel_futures=True)
+
+
+# Shared executor; the agents are registered in core/workflow.py
+agent_executor = AgentExecutor()
@@ -0,0 +1,335 @@
+"""
+core/analytics.py
+-----------------
+Columnar score store with incremental aggregates.
+
+Graded answers are appended to array-backed columns (interned int32 codes for
+student, question, topic and cohort; float32 score as a percentage). Every
+append also folds the batch into running aggregates grouped by cohort, topic,
+cohort x topic, student and rubric criterion:
+
+  • count / sum / sum of squares / min / max  → mean, variance
+  • a fixed-bin histogram sketch over [0, 100] → percentiles within
+    100 / ANALYTICS_SKETCH_BINS points, mergeable and O(bins) to query
+
+Updates are vectorized (bincount over the batch), so queries never rescan the
+stored rows; only per-question drill-downs scan the columns.
+"""
+
+import os
+import threading
+
+import numpy as np
+
+ANALYTICS_SKETCH_BINS = int(os.getenv("ANALYTICS_SKETCH_BINS", "1000"))
+ANALYTICS_INITIAL_ROWS = int(os.getenv("ANALYTICS_INITIAL_ROWS", "65536"))
+
+DEFAULT_COHORT = "default"
+PERCENTILES = (10, 25, 50, 75, 90)
+
+_PAIR_SEP = "\x1f"
+
+
+class Column:
+    """Append-only numpy column that grows by doubling."""
+
+    __slots__ = ("data", "size")
+
+    def __init__(self, dtype, capacity=ANALYTICS_INITIAL_ROWS):
+        self.data = np.empty(capacity, dtype=dtype)
+        self.size = 0
+
+    def append(self, values):
+        end = self.size + len(values)
+        if end > len(self.data):
+            grown = np.empty(max(end, 2 * len(self.data)), dtype=self.data.dtype)
+            grown[:self.size] = self.data[:self.size]
+            self.data = grown
+        self.data[self.size:end] = values
+        self.size = end
+
+    def view(self):
+        return self.data[:self.size]
+
+
+class Interner:
+    """Maps names to dense int32 codes."""
+
+    __slots__ = ("names", "_codes")
+
+    def __init__(self):
+        self.names = []
+        self._codes = {}
+
+    def __len__(self):
+        return len(self.names)
+
+    def code(self, name):
+        code = self._codes.get(name)
+        if code is None:
+            code = self._codes[name] = len(self.names)
+            self.names.append(name)
+        return code
+
+    def codes(self, names):
+        return np.fromiter((self.code(str(n)) for n in names), dtype=np.int32, count=len(names))
+
+    def get(self, name):
+        return self._codes.get(name)
+
+
+class GroupAggregates:
+    """
+    Running count / sum / sum of squares / min / max per group code, plus an
+    optional histogram sketch. Arrays grow as new group codes appear (sketch
+    rows by doubling); an update only touches the groups in its batch.
+    """
+
+    def __init__(self, sketch=True, bins=ANALYTICS_SKETCH_BINS):
+        self.bins = bins
+        self.count = np.zeros(0, dtype=np.int64)
+        self.total = np.zeros(0, dtype=np.float64)
+        self.sumsq = np.zeros(0, dtype=np.float64)
+        self.minimum = np.zeros(0, dtype=np.float64)
+        self.maximum = np.zeros(0, dtype=np.float64)
+        self.hist = np.zeros((0, bins), dtype=np.int64) if sketch else None
+
+    def _grow(self, size):
+        extra = size - len(self.count)
+        if extra <= 0:
+            return
+        self.count = np.concatenate([self.count, np.zeros(extra, dtype=np.int64)])
+        self.total = np.concatenate([self.total, np.zeros(extra)])
+        self.sumsq = np.concatenate([self.sumsq, np.zeros(extra)])
+        self.minimum = np.concatenate([self.minimum, np.full(extra, np.inf)])
+        self.maximum = np.concatenate([self.maximum, np.full(extra, -np.inf)])
+        if self.hist is not None and size > len(self.hist):
+            # Sketch rows are the bulk of the memory; double instead of copying per new group
+            grown = np.zeros((max(size, 2 * len(self.hist)), self.bins), dtype=np.int64)
+            grown[:len(self.hist)] = self.hist
+            self.hist = grown
+
+    def update(self, codes, values, groups):
+        """
+        Folds a batch of (group code, value) pairs into the aggregates. Work is
+        proportional to the batch: when the dense bincounts would be larger
+        than the batch, they run over the groups present in it (local codes)
+        instead of over every group seen so far.
+        """
+        self._grow(groups)
+        values = values.astype(np.float64, copy=False)
+        if groups * (self.bins if self.hist is not None else 1) <= len(codes):
+            present, local = slice(0, groups), codes
+            k = groups
+        else:
+            present, local = np.unique(codes, return_inverse=True)
+            k = len(present)
+        self.count[present] += np.bincount(local, minlength=k)
+        self.total[present] += np.bincount(local, weights=values, minlength=k)
+        self.sumsq[present] += np.bincount(local, weights=values * values, minlength=k)
+        np.minimum.at(self.minimum, codes, values)
+        np.maximum.at(self.maximum, codes, values)
+        if self.hist is not None:
+            b = np.clip((values * (self.bins / 100.0)).astype(np.int64), 0, self.bins - 1)
+            flat = np.bincount(local.astype(np.int64) * self.bins + b, minlength=k * self.bins)
+            self.hist[present] += flat.reshape(k, self.bins)
+
+    def means(self):
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return self.total / self.count
+
+    def percentiles(self, code, points=PERCENTILES):
+        """Percentiles from the sketch, interpolated linearly inside a bin."""
+        counts = self.hist[code]
+        n = counts.sum()
+        if not n:
+            return {}
+        cumulative = np.cumsum(counts)
+        ranks = np.asarray(points, dtype=np.float64) / 100.0 * n
+        idx = np.minimum(np.searchsorted(cumulative, ranks, side="left"), self.bins - 1)
+        below = np.where(idx > 0, cumulative[idx - 1], 0)
+        inside = np.maximum(counts[idx], 1)
+        width = 100.0 / self.bins
+        values = (idx + np.clip((ranks - below) / inside, 0, 1)) * width
+        values = np.clip(values, self.minimum[code], self.maximum[code])
+        return {f"p{p}": round(float(v), 3) for p, v in zip(points, values)}
+
+    def stats(self, code):
+        if code is None or code >= len(self.count) or not self.count[code]:
+            return None
+        n = int(self.count[code])
+        mean = self.total[code] / n
+        variance = max(self.sumsq[code] / n - mean * mean, 0.0)
+        stats = {
+            "count": n,
+            "mean": round(float(mean), 3),
+            "std": round(float(np.sqrt(variance)), 3),
+            "min": round(float(self.minimum[code]), 3),
+            "max": round(float(self.maximum[code]), 3),
+        }
+        if self.hist is not None:
+            stats["percentiles"] = self.percentiles(code)
+        return stats
+
+
+class ScoreStore:
+    """
+    In-process columnar store of question scores (percentages) with running
+    aggregates. Safe to share across threads.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.students = Interner()
+        self.questions = Interner()
+        self.topics = Interner()
+        self.cohorts = Interner()
+        self.criteria = Interner()
+        self.pairs = Interner()  # cohort x topic
+        self.columns = {
+            "student": Column(np.int32),
+            "question": Column(np.int32),
+            "topic": Column(np.int32),
+            "cohort": Column(np.int32),
+            "score": Column(np.float32),
+        }
+        self.overall = GroupAggregates()
+        self.by_cohort = GroupAggregates()
+        self.by_topic = GroupAggregates()
+        self.by_cohort_topic = GroupAggregates()
+        self.by_criterion = GroupAggregates()
+        self.by_student = GroupAggregates(sketch=False)
+
+    def __len__(self):
+        return self.columns["score"].size
+
+    # -------------------------
+    # 🔹 Ingestion
+    # -------------------------
+    def add(self, student_ids, question_ids, scores, cohort=DEFAULT_COHORT, topics=None,
+            criterion_marks=None, criteria=()):
+        """
+        Appends one batch of question scores (0-100).
+        topics maps question id -> topic (default: the question id itself).
+        criterion_marks is an optional (rows, len(criteria)) array of 0-100 marks.
+        """
+        with self._lock:
+            s_codes = self.students.codes(student_ids)
+            q_codes = self.questions.codes(question_ids)
+            return self._append(s_codes, q_codes, scores, cohort, topics, criterion_marks, criteria)
+
+    def ingest(self, result, cohort=DEFAULT_COHORT, topics=None):
+        """Appends every answered question of a core.scoring.GradeResult."""
+        sheet = result.sheet
+        s_idx, q_idx = np.nonzero(sheet.answered)
+        scores = result.question_scores[s_idx, q_idx] * np.float32(100.0)
+        marks = np.clip(sheet.scores[s_idx, q_idx] / np.float32(result.max_score), 0, 1) * np.float32(100.0)
+        with self._lock:
+            # Intern each distinct id once, then index per answer
+            s_codes = self.students.codes(sheet.students)[s_idx]
+            q_codes = self.questions.codes(sheet.questions)[q_idx]
+            return self._append(s_codes, q_codes, scores, cohort, topics, marks, sheet.criteria)
+
+    def _append(self, s_codes, q_codes, scores, cohort, topics, criterion_marks, criteria):
+        scores = np.asarray(scores, dtype=np.float32)
+        topics = topics or {}
+        distinct_q, q_inverse = np.unique(q_codes, return_inverse=True)
+        names = self.questions.names
+        t_codes = np.fromiter(
+            (self.topics.code(str(topics.get(names[q], names[q]))) for q in distinct_q.tolist()),
+            dtype=np.int32, count=len(distinct_q),
+        )[q_inverse]
+        distinct_t, t_inverse = np.unique(t_codes, return_inverse=True)
+        pair_codes = np.fromiter(
+            (self.pairs.code(f"{cohort}{_PAIR_SEP}{self.topics.names[t]}") for t in distinct_t.tolist()),
+            dtype=np.int32, count=len(distinct_t),
+        )[t_inverse]
+        c_codes = np.full(len(scores), self.cohorts.code(str(cohort)), dtype=np.int32)
+
+        for name, values in (("student", s_codes), ("question", q_codes), ("topic", t_codes),
+                             ("cohort", c_codes), ("score", scores)):
+            self.columns[name].append(values)
+
+        self.overall.update(np.zeros(len(scores), dtype=np.int32), scores, 1)
+        self.by_cohort.update(c_codes, scores, len(self.cohorts))
+        self.by_topic.update(t_codes, scores, len(self.topics))
+        self.by_cohort_topic.update(pair_codes, scores, len(self.pairs))
+        self.by_student.update(s_codes, scores, len(self.students))
+        if criterion_marks is not None and len(criteria):
+            marks = np.asarray(criterion_marks, dtype=np.float32)
+            k_codes = np.asarray([self.criteria.code(c) for c in criteria], dtype=np.int32)
+            self.by_criterion.update(np.tile(k_codes, len(marks)), marks.ravel(), len(self.criteria))
+        return len(scores)
+
+    # -------------------------
+    # 🔹 Queries
+    # -------------------------
+    def summary(self):
+        with self._lock:
+            return {
+                "scores": len(self),
+                "students": len(self.students),
+                "questions": len(self.questions),
+                "topics": len(self.topics),
+                "cohorts": list(self.cohorts.names),
+                "overall": self.overall.stats(0),
+                "criteria": {
+                    name: self.by_criterion.stats(code) for code, name in enumerate(self.criteria.names)
+                },
+            }
+
+    def cohort(self, cohort):
+        with self._lock:
+            return self.by_cohort.stats(self.cohorts.get(cohort))
+
+    def topic(self, topic, cohort=None):
+        with self._lock:
+            if cohort is None:
+                return self.by_topic.stats(self.topics.get(topic))
+            return self.by_cohort_topic.stats(self.pairs.get(f"{cohort}{_PAIR_SEP}{topic}"))
+
+    def student(self, student_id):
+        with self._lock:
+            return self.by_student.stats(self.students.get(student_id))
+
+    def weak_topics(self, cohort=None, limit=10):
+        """Topics ranked by ascending mean score (weakest first)."""
+        with self._lock:
+            if cohort is None:
+                aggregates, names = self.by_topic, self.topics.names
+            else:
+                prefix = f"{cohort}{_PAIR_SEP}"
+                aggregates = self.by_cohort_topic
+                names = [n[len(prefix):] if n.startswith(prefix) else None for n in self.pairs.names]
+            means = aggregates.means()
+            valid = np.array([n is not None for n in names], dtype=bool) & (aggregates.count > 0)
+            order = np.flatnonzero(valid)[np.argsort(means[valid], kind="stable")][:limit]
+            return [
+                {"topic": names[i], "mean": round(float(means[i]), 3), "count": int(aggregates.count[i])}
+                for i in order
+            ]
+
+    def question(self, question_id, cohort=None):
+        """Per-question stats; scans the score column (no aggregate is kept)."""
+        with self._lock:
+            code = self.questions.get(question_id)
+            if code is None:
+                return None
+            mask = self.columns["question"].view() == code
+            if cohort is not None:
+                mask &= self.columns["cohort"].view() == self.cohorts.get(cohort)
+            values = self.columns["score"].view()[mask]
+        if not len(values):
+            return None
+        return {
+            "count": int(len(values)),
+            "mean": round(float(values.mean()), 3),
+            "std": round(float(values.std()), 3),
+            "percentiles": {
+                f"p{p}": round(float(v), 3) for p, v in zip(PERCENTILES, np.percentile(values, PERCENTILES))
+            },
+        }
+
+
+# Shared store used by the API
+score_store = ScoreStore()
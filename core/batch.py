@@ -0,0 +1,143 @@
+"""
+core/batch.py
+-------------
+Batch workflow execution: many syllabi in one request.
+
+Work shared across the batch is done once. Identical syllabi (same normalized
+topics) are processed once, and the per-topic agents (content, exam, evaluator)
+run a single time over the union of all topics. Each syllabus is then assembled
+from that shared output, with a bounded number running at once, and results
+are yielded in completion order.
+"""
+
+import asyncio
+import json
+import os
+
+from agents.content_agent import service as content_agent
+from agents.exam_agent import service as exam_agent
+from agents.rubric_agent import service as rubric_agent
+from agents.evaluator_agent import service as evaluator_agent
+from agents.analytics_agent import service as analytics_agent
+from core.syllabus import Syllabus
+
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "8"))
+BATCH_MAX_CONCURRENCY = int(os.getenv("BATCH_MAX_CONCURRENCY", "64"))
+BATCH_MAX_SYLLABI = int(os.getenv("BATCH_MAX_SYLLABI", "5000"))
+
+
+def parse_batch_body(body: bytes, content_type: str = ""):
+    """
+    Accepts a JSON list of syllabi, {"syllabi": [...]}, or NDJSON with one
+    syllabus per line. Each item may be a string or {"syllabus": "..."}.
+    """
+    try:
+        if "ndjson" in content_type or "jsonlines" in content_type:
+            items = [json.loads(line) for line in body.decode("utf-8").splitlines() if line.strip()]
+        else:
+            items = json.loads(body or b"null")
+            if isinstance(items, dict):
+                items = items.get("syllabi")
+    except (UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise ValueError(f"Malformed batch body: {e}") from None
+
+    if not isinstance(items, list) or not items:
+        raise ValueError("Batch body must contain a non-empty list of syllabi.")
+    if len(items) > BATCH_MAX_SYLLABI:
+        raise ValueError(f"Batch exceeds {BATCH_MAX_SYLLABI} syllabi.")
+
+    syllabi = []
+    for item in items:
+        if isinstance(item, dict):
+            item = item.get("syllabus")
+        if not isinstance(item, str):
+            raise ValueError("Each batch item must be a syllabus string or {\"syllabus\": ...}.")
+        syllabi.append(item)
+    return syllabi
+
+
+class BatchPlan:
+    """
+    Deduplicates a batch before any agent runs.
+
+    groups     list of input-index lists; each group shares one result
+    canonical  casefolded topic -> first spelling seen in the batch
+    union      Syllabus over every distinct topic in the batch
+    """
+
+    def __init__(self, syllabi):
+        self.parsed = [Syllabus.parse(text) for text in syllabi]
+        groups = {}
+        self.canonical = {}
+        for i, syllabus in enumerate(self.parsed):
+            key = tuple(t.casefold() for t in syllabus.topics)
+            groups.setdefault(key, []).append(i)
+            for topic in syllabus.topics:
+                self.canonical.setdefault(topic.casefold(), topic)
+        self.groups = list(groups.values())
+        self.union = Syllabus.from_topics(self.canonical.values())
+
+    def topics_for(self, index):
+        return [self.canonical[t.casefold()] for t in self.parsed[index].topics]
+
+
+def _assemble(plan, index, shared):
+    syllabus = plan.parsed[index]
+    topics = plan.topics_for(index)
+    if topics:
+        content = content_agent.select_topics(shared["content"], topics)
+    else:
+        content = content_agent.generate_content(syllabus)
+    return {
+        "Content Agent": content,
+        "Exam Agent": exam_agent.select_topics(shared["exam"], topics),
+        "Rubric Agent": rubric_agent.design_rubric(syllabus),
+        "Evaluator Agent": evaluator_agent.select_topics(shared["evaluation"], topics),
+        "Analytics Agent": analytics_agent.analyze_performance(syllabus),
+    }
+
+
+async def run_batch(syllabi, concurrency=BATCH_CONCURRENCY):
+    """
+    Async generator yielding one record per input syllabus, in completion order:
+    {"index", "status", "deduplicated", "workflow_results" | "message"}.
+    If a shared stage fails, every syllabus gets an error record.
+    """
+    plan = BatchPlan(syllabi)
+    union = plan.union
+    try:
+        content, exam, evaluation = await asyncio.gather(
+            asyncio.to_thread(content_agent.generate_content, union),
+            asyncio.to_thread(exam_agent.generate_exam, union),
+            asyncio.to_thread(evaluator_agent.evaluate_responses, union),
+        )
+    except Exception as e:
+        for group in plan.groups:
+            for i in group:
+                yield {"index": i, "deduplicated": i != group[0], "status": "error", "message": str(e)}
+        return
+    shared = {"content": content, "exam": exam, "evaluation": evaluation}
+
+    limit = asyncio.Semaphore(max(1, min(concurrency, BATCH_MAX_CONCURRENCY)))
+
+    async def process(group):
+        async with limit:
+            try:
+                return group, await asyncio.to_thread(_assemble, plan, group[0], shared), None
+            except Exception as e:
+                return group, None, e
+
+    tasks = [asyncio.ensure_future(process(group)) for group in plan.groups]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            group, results, error = await next_done
+            for i in group:
+                record = {"index": i, "deduplicated": i != group[0]}
+                if error is None:
+                    record.update(status="success", workflow_results=results)
+                else:
+                    record.update(status="error", message=str(error))
+                yield record
+    finally:
+        for task in tasks:
+            task.cancel()
@@ -0,0 +1,293 @@
+"""
+core/cache.py
+-------------
+Two-tier memo cache: an in-process LRU bounded by payload size, backed by a
+content-addressed on-disk store. Used for extracted syllabus text/topics and
+for agent outputs, so repeated work is served without recomputation.
+
+The on-disk tier is shared by every worker process. CACHE_BACKEND picks it:
+  • files   one JSON file per entry under CACHE_DIR/<cache name>/ (default)
+  • sqlite  one WAL-mode database (CACHE_DB_PATH) for all caches, read through
+            mmap so hot entries live once in the OS page cache rather than
+            once per worker; the multi-worker launcher (api/serve.py) uses it
+
+Cached values are shared between callers and must be treated as read-only.
+Domain models (core/models.py) are stored as JSON; a load function passed to
+get / get_or_compute / memoize rebuilds them from entries read off disk.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+from collections import OrderedDict
+from functools import wraps
+
+from core.models import to_jsonable
+
+CACHE_DIR = os.getenv("CACHE_DIR", "data/cache")
+# Memory budget of the whole deployment; each worker process's LRU gets its share
+CACHE_MEMORY_BYTES = int(os.getenv("CACHE_MEMORY_BYTES", str(64 * 1024 * 1024))) // max(
+    1, int(os.getenv("WEB_CONCURRENCY", "1"))
+)
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "files")  # "files" | "sqlite"
+CACHE_DB_PATH = os.getenv("CACHE_DB_PATH", os.path.join(CACHE_DIR, "cache.sqlite3"))
+CACHE_DB_MMAP_BYTES = int(os.getenv("CACHE_DB_MMAP_BYTES", str(256 * 1024 * 1024)))
+
+_MISSING = object()
+
+
+def sha256_hex(data) -> str:
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    return hashlib.sha256(data).hexdigest()
+
+
+# -------------------------
+# 🔹 Shared Stores
+# -------------------------
+class FileStore:
+    """One JSON file per entry, sharded by key digest."""
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def _path(self, key):
+        digest = sha256_hex(key)
+        return os.path.join(self.directory, digest[:2], digest + ".json")
+
+    def get(self, key):
+        try:
+            with open(self._path(key), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def put(self, key, raw):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(raw)
+        os.replace(tmp, path)
+
+
+class SQLiteStore:
+    """
+    Entries of every cache in one SQLite table, safe for concurrent worker
+    processes (WAL: readers never block, writes are short upserts). The
+    connection is opened lazily and reopened after a fork.
+    """
+
+    _SCHEMA = """
+    CREATE TABLE IF NOT EXISTS entries (
+        cache TEXT NOT NULL,
+        key   TEXT NOT NULL,
+        value BLOB NOT NULL,
+        PRIMARY KEY (cache, key)
+    ) WITHOUT ROWID
+    """
+
+    def __init__(self, path=CACHE_DB_PATH, mmap_bytes=CACHE_DB_MMAP_BYTES):
+        self.path = path
+        self.mmap_bytes = mmap_bytes
+        self._conn = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def _connection(self):
+        if self._conn is None or self._pid != os.getpid():
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(f"PRAGMA mmap_size={self.mmap_bytes}")
+            conn.execute(self._SCHEMA)
+            self._conn, self._pid = conn, os.getpid()
+        return self._conn
+
+    def get(self, cache, key):
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT value FROM entries WHERE cache = ? AND key = ?", (cache, sha256_hex(key))
+            ).fetchone()
+        return row[0] if row else None
+
+    def put(self, cache, key, raw):
+        with self._lock:
+            self._connection().execute(
+                "INSERT OR REPLACE INTO entries (cache, key, value) VALUES (?, ?, ?)", (cache, sha256_hex(key), raw)
+            )
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None and self._pid == os.getpid():
+                self._conn.close()
+            self._conn = None
+
+
+_sqlite_store = None
+
+
+def shared_sqlite_store():
+    global _sqlite_store
+    if _sqlite_store is None:
+        _sqlite_store = SQLiteStore()
+    return _sqlite_store
+
+
+class TwoTierCache:
+    def __init__(self, name, max_bytes=CACHE_MEMORY_BYTES, disk_dir=None, backend=CACHE_BACKEND):
+        if backend not in ("files", "sqlite"):
+            raise ValueError(f"Unknown cache backend: {backend}")
+        self.name = name
+        self.max_bytes = max_bytes
+        self.backend = backend
+        self._files = FileStore(disk_dir if disk_dir is not None else os.path.join(CACHE_DIR, name))
+        self._memory = OrderedDict()  # key -> (value, size)
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    # -------------------------
+    # 🔹 Disk Tier
+    # -------------------------
+    @property
+    def disk_dir(self):
+        return self._files.directory
+
+    @disk_dir.setter
+    def disk_dir(self, directory):
+        self._files.directory = directory
+
+    def _read_disk(self, key):
+        if self.backend == "sqlite":
+            raw = shared_sqlite_store().get(self.name, key)
+        else:
+            raw = self._files.get(key)
+        if raw is None:
+            return _MISSING, 0
+        return json.loads(raw), len(raw)
+
+    def _write_disk(self, key, raw):
+        if self.backend == "sqlite":
+            shared_sqlite_store().put(self.name, key, raw)
+        else:
+            self._files.put(key, raw)
+
+    # -------------------------
+    # 🔹 Memory Tier
+    # -------------------------
+    def _remember(self, key, value, size):
+        with self._lock:
+            old = self._memory.pop(key, None)
+            if old is not None:
+                self._memory_bytes -= old[1]
+            if size > self.max_bytes:
+                return
+            self._memory[key] = (value, size)
+            self._memory_bytes += size
+            while self._memory_bytes > self.max_bytes:
+                _, (_, evicted) = self._memory.popitem(last=False)
+                self._memory_bytes -= evicted
+                self.evictions += 1
+
+    def get(self, key, default=None, load=None):
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return entry[0]
+        value, size = self._read_disk(key)
+        if value is _MISSING:
+            with self._lock:
+                self.misses += 1
+            return default
+        with self._lock:
+            self.disk_hits += 1
+        if load is not None:
+            value = load(value)
+        self._remember(key, value, size)
+        return value
+
+    def set(self, key, value):
+        raw = json.dumps(value, separators=(",", ":"), default=to_jsonable).encode("utf-8")
+        self._write_disk(key, raw)
+        self._remember(key, value, len(raw))
+        return value
+
+    def get_or_compute(self, key, compute, load=None):
+        value = self.get(key, _MISSING, load)
+        if value is _MISSING:
+            value = self.set(key, compute())
+        return value
+
+    def memoize(self, namespace, key_fn=None, load=None):
+        """
+        Decorator memoizing a function by a hash of its arguments.
+        key_fn(*args, **kwargs) may return a custom key string; load rebuilds
+        a result read from disk (see get).
+        """
+        def decorator(fn):
+            @wraps(fn)
+            def wrapper(*args, **kwargs):
+                if key_fn is not None:
+                    raw_key = key_fn(*args, **kwargs)
+                else:
+                    raw_key = json.dumps([args, kwargs], sort_keys=True, default=str)
+                return self.get_or_compute(f"{namespace}:{sha256_hex(raw_key)}", lambda: fn(*args, **kwargs), load)
+            return wrapper
+        return decorator
+
+    def stats(self):
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            return {
+                "backend": self.backend,
+                "memory_entries": len(self._memory),
+                "memory_bytes": self._memory_bytes,
+                "max_bytes": self.max_bytes,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": round((self.memory_hits + self.disk_hits) / lookups, 4) if lookups else 0.0,
+            }
+
+    def clear_memory(self):
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+
+
+def syllabus_key(syllabus, *args, **kwargs):
+    """
+    memoize key_fn for agent functions taking a Syllabus or raw text first.
+    """
+    digest = getattr(syllabus, "digest", None) or sha256_hex(syllabus)
+    return json.dumps([digest, args, kwargs], sort_keys=True, default=str)
+
+
+# -------------------------
+# 🔹 Cache Registry
+# -------------------------
+CACHES = {}
+
+
+def get_cache(name, **kwargs):
+    """
+    Returns the process-wide cache called name, creating it on first use.
+    """
+    if name not in CACHES:
+        CACHES[name] = TwoTierCache(name, **kwargs)
+    return CACHES[name]
+
+
+def cache_stats():
+    return {name: cache.stats() for name, cache in CACHES.items()}
@@ -0,0 +1,353 @@
+"""
+core/engine.py
+--------------
+Declarative stage-graph workflow engine.
+
+Each Stage names its inputs (external workflow inputs or other stages' outputs)
+and publishes its result under its own name. The scheduler starts every stage
+whose inputs are ready, so independent stages always run concurrently.
+
+Two execution backends share the same graph:
+  • run_async() — asyncio scheduler; async stages are awaited, sync stages run
+    in a thread executor.
+  • run()       — thread-pool scheduler for sync callers (max_workers=1 gives a
+    step-by-step debug run); async stages get their own event loop.
+
+Per-stage timeouts and retries are supported, a failed stage cancels everything
+still pending, and every run reports per-stage timings and the critical path.
+Each stage runs inside a tracing span feeding brok_stage_duration_seconds.
+An optional on_stage(name, event, result) callback sees "started" and
+"completed" events as they happen (progress reporting, streaming).
+"""
+
+import asyncio
+import contextvars
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from functools import partial
+
+from core.tracing import span
+
+
+class GraphError(ValueError):
+    """Raised for an invalid stage graph (duplicate names, unknown inputs, cycles)."""
+
+
+class StageError(RuntimeError):
+    """Raised when a stage fails after exhausting its retries."""
+
+    def __init__(self, stage, cause):
+        super().__init__(f"Stage '{stage}' failed: {cause!r}")
+        self.stage = stage
+        self.cause = cause
+
+
+class StageTimeout(TimeoutError):
+    """Raised inside a stage attempt that exceeded its timeout."""
+
+
+class Stage:
+    __slots__ = ("name", "fn", "inputs", "timeout", "retries", "retry_delay", "is_async")
+
+    def __init__(self, name, fn, inputs=(), timeout=None, retries=0, retry_delay=0.0):
+        self.name = name
+        self.fn = fn
+        self.inputs = tuple(inputs)
+        self.timeout = timeout
+        self.retries = retries
+        self.retry_delay = retry_delay
+        self.is_async = asyncio.iscoroutinefunction(fn)
+
+    def __repr__(self):
+        return f"Stage({self.name!r}, inputs={self.inputs})"
+
+
+class WorkflowRun:
+    """Outputs and timing report of one graph execution."""
+
+    def __init__(self, graph):
+        self.graph = graph
+        self.results = {}
+        self.timings = {}  # name -> {"start", "end", "attempts"} (seconds since run start)
+        self.completed = []  # stage names in completion order
+        self.wall_time = 0.0
+
+    def critical_path(self):
+        """
+        Longest dependency chain by finish time: starting from the last stage to
+        finish, repeatedly step to the input stage that finished latest.
+        """
+        if not self.completed:
+            return []
+        path = [max(self.completed, key=lambda n: self.timings[n]["end"])]
+        while True:
+            upstream = [i for i in self.graph.stages[path[-1]].inputs if i in self.timings]
+            if not upstream:
+                break
+            path.append(max(upstream, key=lambda n: self.timings[n]["end"]))
+        return path[::-1]
+
+    def report(self):
+        path = self.critical_path()
+        return {
+            "wall_time_ms": round(self.wall_time * 1000, 3),
+            "critical_path": path,
+            "critical_path_ms": round(self.timings[path[-1]]["end"] * 1000, 3) if path else 0.0,
+            "stages": {
+                name: {
+                    "start_ms": round(t["start"] * 1000, 3),
+                    "duration_ms": round((t["end"] - t["start"]) * 1000, 3),
+                    "attempts": t["attempts"],
+                }
+                for name, t in self.timings.items()
+            },
+        }
+
+
+class StageGraph:
+    def __init__(self, stages, inputs=()):
+        self.inputs = tuple(inputs)
+        self.stages = {}
+        for stage in stages:
+            if stage.name in self.stages or stage.name in self.inputs:
+                raise GraphError(f"Duplicate stage name: {stage.name}")
+            self.stages[stage.name] = stage
+        for stage in self.stages.values():
+            for name in stage.inputs:
+                if name not in self.stages and name not in self.inputs:
+                    raise GraphError(f"Stage '{stage.name}' depends on unknown input '{name}'")
+        self.order = self._topological_order()
+
+    def _topological_order(self):
+        remaining = {n: {i for i in s.inputs if i in self.stages} for n, s in self.stages.items()}
+        order = []
+        while remaining:
+            ready = [n for n, deps in remaining.items() if not deps]
+            if not ready:
+                raise GraphError(f"Cycle between stages: {sorted(remaining)}")
+            for n in ready:
+                order.append(n)
+                del remaining[n]
+            for deps in remaining.values():
+                deps.difference_update(ready)
+        return order
+
+    def _check_inputs(self, inputs):
+        missing = [n for n in self.inputs if n not in inputs]
+        if missing:
+            raise GraphError(f"Missing workflow inputs: {missing}")
+
+    def _ready(self, available, started):
+        return [
+            self.stages[n] for n in self.order
+            if n not in started and all(i in available for i in self.stages[n].inputs)
+        ]
+
+    # -------------------------
+    # 🔹 Async Backend
+    # -------------------------
+    async def _run_stage_async(self, stage, args, executor):
+        with span(f"stage.{stage.name}", metric=("brok_stage_duration_seconds", {"stage": stage.name})) as stage_span:
+            result, attempts = await self._attempt_stage_async(stage, args, executor)
+            stage_span.set(attempts=attempts)
+            return result, attempts
+
+    async def _attempt_stage_async(self, stage, args, executor):
+        loop = asyncio.get_running_loop()
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                if stage.is_async:
+                    coro = stage.fn(*args)
+                else:
+                    # Carry the current span into the worker thread
+                    ctx = contextvars.copy_context()
+                    coro = loop.run_in_executor(executor, partial(ctx.run, stage.fn, *args))
+                if stage.timeout is None:
+                    return await coro, attempt
+                try:
+                    return await asyncio.wait_for(coro, stage.timeout), attempt
+                except asyncio.TimeoutError:
+                    raise StageTimeout(f"exceeded {stage.timeout:g}s") from None
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                if attempt > stage.retries:
+                    raise StageError(stage.name, e) from e
+                if stage.retry_delay:
+                    await asyncio.sleep(stage.retry_delay)
+
+    async def run_async(self, executor=None, on_stage=None, keep_results=True, **inputs):
+        """
+        Runs the graph on the current event loop. Sync stages go to executor
+        (the loop's default executor when None).
+        With keep_results=False, outputs are handed to on_stage only and each
+        one is released as soon as every downstream stage has started, so
+        run.results stays empty and large outputs are not held to the end.
+        """
+        self._check_inputs(inputs)
+        run = WorkflowRun(self)
+        available = dict(inputs)
+        consumers = {n: sum(n in s.inputs for s in self.stages.values()) for n in self.stages}
+        clock = time.monotonic
+        t0 = clock()
+        running = {}  # task -> stage name
+
+        try:
+            while True:
+                for stage in self._ready(available, run.timings):
+                    run.timings[stage.name] = {"start": clock() - t0, "end": None, "attempts": 0}
+                    args = [available[i] for i in stage.inputs]
+                    if not keep_results:
+                        for i in stage.inputs:
+                            if i in consumers:
+                                consumers[i] -= 1
+                                if not consumers[i]:
+                                    del available[i]
+                    task = asyncio.ensure_future(self._run_stage_async(stage, args, executor))
+                    running[task] = stage.name
+                    if on_stage is not None:
+                        on_stage(stage.name, "started", None)
+                if not running:
+                    break
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    name = running.pop(task)
+                    result, attempts = task.result()  # StageError propagates
+                    run.timings[name].update(end=clock() - t0, attempts=attempts)
+                    if keep_results:
+                        run.results[name] = result
+                    if keep_results or consumers[name]:
+                        available[name] = result
+                    run.completed.append(name)
+                    if on_stage is not None:
+                        on_stage(name, "completed", result)
+                    del result
+        finally:
+            # Cancellation propagation: a failure, or the caller being
+            # cancelled, stops every stage still in flight.
+            for task in running:
+                task.cancel()
+            if running:
+                await asyncio.gather(*running, return_exceptions=True)
+
+        run.wall_time = clock() - t0
+        return run
+
+    async def stream(self, executor=None, **inputs):
+        """
+        Async generator yielding (stage name, output) as each stage completes,
+        then ("__run__", WorkflowRun) with the timing report. Outputs are not
+        retained by the engine once yielded and no longer needed downstream.
+        Closing the generator early cancels the remaining stages.
+        """
+        events = asyncio.Queue()
+        done = object()
+
+        def on_stage(name, event, result):
+            if event == "completed":
+                events.put_nowait((name, result))
+
+        async def drive():
+            try:
+                run = await self.run_async(executor, on_stage=on_stage, keep_results=False, **inputs)
+                events.put_nowait(("__run__", run))
+            finally:
+                events.put_nowait(done)
+
+        runner = asyncio.ensure_future(drive())
+        try:
+            while True:
+                item = await events.get()
+                if item is done:
+                    break
+                yield item
+            await runner  # re-raises StageError
+        finally:
+            if not runner.done():
+                runner.cancel()
+                await asyncio.gather(runner, return_exceptions=True)
+
+    # -------------------------
+    # 🔹 Sync Backend
+    # -------------------------
+    @staticmethod
+    def _call_sync(stage, args):
+        with span(f"stage.{stage.name}", metric=("brok_stage_duration_seconds", {"stage": stage.name})):
+            if stage.is_async:
+                return asyncio.run(stage.fn(*args))
+            return stage.fn(*args)
+
+    def run(self, max_workers=None, on_stage=None, **inputs):
+        """
+        Runs the graph from synchronous code on a thread pool.
+        Timed-out attempts are abandoned (threads cannot be interrupted) and
+        retried or failed exactly like in the async backend.
+        """
+        self._check_inputs(inputs)
+        run = WorkflowRun(self)
+        available = dict(inputs)
+        clock = time.monotonic
+        t0 = clock()
+        running = {}  # future -> (stage, args, attempt, deadline)
+        retry_at = []  # (ready_time, stage, args, attempt)
+
+        def submit(pool, stage, args, attempt):
+            deadline = clock() + stage.timeout if stage.timeout is not None else None
+            ctx = contextvars.copy_context()
+            running[pool.submit(ctx.run, self._call_sync, stage, args)] = (stage, args, attempt, deadline)
+
+        def failed(stage, args, attempt, error):
+            if attempt > stage.retries:
+                raise StageError(stage.name, error) from error
+            retry_at.append((clock() + stage.retry_delay, stage, args, attempt + 1))
+
+        pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="workflow")
+        try:
+            while True:
+                for stage in self._ready(available, run.timings):
+                    run.timings[stage.name] = {"start": clock() - t0, "end": None, "attempts": 0}
+                    submit(pool, stage, [available[i] for i in stage.inputs], 1)
+                    if on_stage is not None:
+                        on_stage(stage.name, "started", None)
+                now = clock()
+                for item in [r for r in retry_at if r[0] <= now]:
+                    retry_at.remove(item)
+                    submit(pool, *item[1:])
+                if not running and not retry_at:
+                    break
+
+                wakeups = [d for (_, _, _, d) in running.values() if d is not None]
+                wakeups += [r[0] for r in retry_at]
+                timeout = max(0.0, min(wakeups) - clock()) if wakeups else None
+                if running:
+                    done, _ = wait(running, timeout=timeout, return_when=FIRST_COMPLETED)
+                else:
+                    time.sleep(timeout)
+                    done = ()
+
+                for future in done:
+                    stage, args, attempt, _ = running.pop(future)
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        failed(stage, args, attempt, e)
+                        continue
+                    run.timings[stage.name].update(end=clock() - t0, attempts=attempt)
+                    run.results[stage.name] = available[stage.name] = result
+                    run.completed.append(stage.name)
+                    if on_stage is not None:
+                        on_stage(stage.name, "completed", result)
+
+                now = clock()
+                for future, (stage, args, attempt, deadline) in list(running.items()):
+                    if deadline is not None and now >= deadline:
+                        del running[future]
+                        future.cancel()
+                        failed(stage, args, attempt, StageTimeout(f"exceeded {stage.timeout:g}s"))
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+        run.wall_time = clock() - t0
+        return run
@@ -0,0 +1,367 @@
+"""
+core/exam_assembly.py
+---------------------
+Near-duplicate detection and diversity-aware exam assembly.
+
+Topics (or any question key) are compared on character shingles of a
+normalized form: casefolded, punctuation and stopwords dropped, plurals
+trimmed, so "Neural Nets" and "neural networks" land close together.
+Duplicates are found without comparing every pair:
+
+  1. exact duplicates of the normalized form collapse first
+  2. each distinct form gets a MinHash signature (EXAM_MINHASH_PERMUTATIONS
+     hash functions, computed for a whole block of strings at once)
+  3. LSH banding buckets strings sharing a band; each bucket member is a
+     candidate against the bucket's first member only
+  4. candidates are confirmed on exact shingle Jaccard >= threshold and on
+     word overlap (EXAM_WORD_THRESHOLD; a word matches an equal word, one it
+     abbreviates, or a close misspelling), then merged with union-find; the
+     first-seen string represents its cluster
+
+Shingles alone cannot tell a duplicate from a sibling topic, so strings whose
+words differ in a numeral ("Calculus 1" / "Calculus 2", "Physics I" /
+"Physics II") or a negation ("Linear" / "Nonlinear", "Organic" /
+"Inorganic") are never merged. Numerals are read from the source text: a
+word of roman-numeral letters ("mix", "civil") only counts when it is
+upper-case there, parenthesized ("(iv)") or follows a numbering word
+("part ii").
+
+assemble() then picks at most one question per cluster, balancing a
+difficulty mix within an optional marks budget and question count.
+"""
+
+import os
+import re
+import zlib
+from collections import deque
+from difflib import SequenceMatcher
+
+import numpy as np
+
+EXAM_DEDUP_THRESHOLD = float(os.getenv("EXAM_DEDUP_THRESHOLD", "0.6"))
+EXAM_WORD_THRESHOLD = float(os.getenv("EXAM_WORD_THRESHOLD", "0.75"))
+EXAM_MINHASH_PERMUTATIONS = int(os.getenv("EXAM_MINHASH_PERMUTATIONS", "128"))
+EXAM_LSH_BANDS = int(os.getenv("EXAM_LSH_BANDS", "32"))
+EXAM_SHINGLE_SIZE = int(os.getenv("EXAM_SHINGLE_SIZE", "3"))
+EXAM_DIFFICULTY_MIX = os.getenv("EXAM_DIFFICULTY_MIX", "easy=0.3,medium=0.5,hard=0.2")
+
+STOPWORDS = frozenset({"a", "an", "and", "the", "of", "to", "in", "on", "for", "with", "by"})
+
+_WORD = re.compile(r"[^\W_]+")
+_ROMAN = re.compile(r"m{0,3}(cm|cd|d?c{0,3})(xc|xl|l?x{0,3})(ix|iv|v?i{0,3})")
+_SOURCE_WORD = re.compile(r"\(\s*([^\W_]+)\s*\)|[^\W_]+")  # a word, or one in parentheses
+NUMBERING_WORDS = frozenset({
+    "part", "pt", "chapter", "ch", "unit", "volume", "vol", "section", "sec", "module",
+    "book", "lecture", "lesson", "level", "phase", "week", "appendix", "no",
+})
+NEGATIONS = frozenset({"non", "not", "no", "un", "anti"})
+NEGATING_PREFIXES = ("non", "un", "in", "im", "il", "ir", "dis", "anti", "a")
+_PRIME = np.uint64(4294967291)  # largest prime below 2**32
+_BLOCK_SHINGLES = 1 << 14  # shingles hashed per vectorized block
+
+
+def similarity_text(text: str) -> str:
+    """Normalized form compared for near-duplicates."""
+    words = []
+    for word in _WORD.findall(text.casefold()):
+        if word in STOPWORDS:
+            continue
+        if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        words.append(word)
+    return " ".join(words)
+
+
+def shingles(text: str, size=EXAM_SHINGLE_SIZE) -> frozenset:
+    if len(text) <= size:
+        return frozenset((text,))
+    return frozenset(text[i:i + size] for i in range(len(text) - size + 1))
+
+
+def jaccard(a, b) -> float:
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+def numerals(text: str) -> frozenset:
+    """
+    Casefolded numerals of a source text: words with digits ("2", "10b"), and
+    roman numerals up to 5 letters that are written as numbers, i.e.
+    parenthesized ("(iv)"), after a numbering word ("Part ii"), or
+    upper-case ("Physics II"; in an all-caps text only as its last word).
+    """
+    words = [(m.group(1) or m.group(0), m.group(1) is not None) for m in _SOURCE_WORD.finditer(text)]
+    all_caps = text.isupper()
+    found = set()
+    for k, (word, parenthesized) in enumerate(words):
+        folded = word.casefold()
+        if any(c.isdigit() for c in word):
+            found.add(folded)
+            continue
+        if len(word) > 5 or _ROMAN.fullmatch(folded) is None:
+            continue
+        upper = word.isupper() and (not all_caps or 0 < k == len(words) - 1)
+        if parenthesized or upper or (k and words[k - 1][0].casefold() in NUMBERING_WORDS):
+            found.add(folded)
+    return frozenset(found)
+
+
+def _negates(a: str, b: str) -> bool:
+    return any(a == p + b or b == p + a for p in NEGATING_PREFIXES if len(b) > 2 and len(a) > 2)
+
+
+def _same_word(a: str, b: str) -> bool:
+    if a == b:
+        return True
+    if min(len(a), len(b)) >= 3 and (a.startswith(b) or b.startswith(a)):
+        return True  # abbreviation: "net" / "network"
+    return min(len(a), len(b)) >= 4 and SequenceMatcher(None, a, b).ratio() >= 0.85
+
+
+def distinct_topics(a: str, b: str, numerals_ab=None) -> bool:
+    """
+    True when two normalized forms name sibling topics rather than one topic:
+    their numerals differ, or one has a negation the other lacks.
+    numerals_ab passes numerals() of their source texts; without it the
+    numerals are read from the forms, where case is already lost.
+    """
+    numerals_a, numerals_b = numerals_ab or (numerals(a), numerals(b))
+    if numerals_a != numerals_b:
+        return True
+    words_a, words_b = set(a.split()), set(b.split())
+    only_a, only_b = words_a - words_b, words_b - words_a
+    if (only_a | only_b) & NEGATIONS:
+        return True
+    return any(_negates(x, y) for x in only_a for y in only_b)
+
+
+def word_similarity(a: str, b: str) -> float:
+    """Share of words matched one-to-one (see _same_word) over the longer form."""
+    words_a, words_b = a.split(), b.split()
+    if not words_a or not words_b:
+        return float(words_a == words_b)
+    unmatched = list(words_b)
+    matched = 0
+    for word in words_a:
+        for k, other in enumerate(unmatched):
+            if _same_word(word, other):
+                del unmatched[k]
+                matched += 1
+                break
+    return matched / max(len(words_a), len(words_b))
+
+
+def same_topic(a: str, b: str, sets=None, threshold=EXAM_DEDUP_THRESHOLD, word_threshold=EXAM_WORD_THRESHOLD,
+               numerals_ab=None):
+    """
+    Near-duplicate check between two normalized forms: shingle Jaccard and
+    word overlap both pass, and neither form is a sibling of the other.
+    sets optionally passes their precomputed shingle sets, numerals_ab the
+    numerals() of their source texts.
+    """
+    if a == b:
+        return True
+    set_a, set_b = sets or (shingles(a), shingles(b))
+    return (
+        jaccard(set_a, set_b) >= threshold
+        and word_similarity(a, b) >= word_threshold
+        and not distinct_topics(a, b, numerals_ab)
+    )
+
+
+# -------------------------
+# 🔹 MinHash / LSH
+# -------------------------
+class MinHasher:
+    """MinHash signatures from universal hashes (a * x + b) mod p over CRC32 shingle hashes."""
+
+    def __init__(self, permutations=EXAM_MINHASH_PERMUTATIONS, seed=1):
+        rng = np.random.default_rng(seed)
+        self.a = rng.integers(1, int(_PRIME), size=(permutations, 1), dtype=np.uint64)
+        self.b = rng.integers(0, int(_PRIME), size=(permutations, 1), dtype=np.uint64)
+
+    @property
+    def permutations(self):
+        return len(self.a)
+
+    def signatures(self, shingle_sets):
+        """uint32 array (len(shingle_sets), permutations); every set must be non-empty."""
+        signatures = np.empty((len(shingle_sets), self.permutations), dtype=np.uint32)
+        start = 0
+        while start < len(shingle_sets):
+            # A block of whole sets totalling about _BLOCK_SHINGLES shingles
+            end, total = start, 0
+            while end < len(shingle_sets) and (total < _BLOCK_SHINGLES or end == start):
+                total += len(shingle_sets[end])
+                end += 1
+            block = shingle_sets[start:end]
+            hashes = np.fromiter(
+                (zlib.crc32(s.encode("utf-8")) for shingle_set in block for s in shingle_set),
+                dtype=np.uint64, count=total,
+            )
+            offsets = np.zeros(len(block), dtype=np.int64)
+            np.cumsum([len(s) for s in block[:-1]], out=offsets[1:])
+            permuted = (self.a * hashes + self.b) % _PRIME
+            signatures[start:end] = np.minimum.reduceat(permuted, offsets, axis=1).T
+            start = end
+        return signatures
+
+
+def lsh_candidates(signatures, bands=EXAM_LSH_BANDS):
+    """
+    (first, other) index pairs sharing at least one band bucket; each bucket
+    contributes one pair per member after its lowest index, so the count
+    stays linear in the number of rows.
+    """
+    rows = signatures.shape[1] // bands
+    if rows == 0:
+        raise ValueError("More LSH bands than MinHash permutations.")
+    pairs = []
+    for band in range(bands):
+        block = signatures[:, band * rows:(band + 1) * rows].astype(np.uint64)
+        keys = block[:, 0].copy()
+        for column in range(1, rows):
+            keys = keys * np.uint64(1000003) ^ block[:, column]
+        order = np.argsort(keys, kind="stable")
+        sorted_keys = keys[order]
+        starts = np.flatnonzero(np.r_[True, sorted_keys[1:] != sorted_keys[:-1]])
+        group_first = order[starts[np.searchsorted(starts, np.arange(len(order)), side="right") - 1]]
+        members = group_first != order
+        if members.any():
+            pairs.append(np.stack([group_first[members], order[members]], axis=1))
+    if not pairs:
+        return np.empty((0, 2), dtype=np.int64)
+    return np.unique(np.concatenate(pairs), axis=0)
+
+
+def near_duplicate_clusters(texts, threshold=EXAM_DEDUP_THRESHOLD, hasher=None):
+    """
+    Cluster id per text: the index of the first text of its near-duplicate
+    cluster (texts[i] is its own representative when clusters[i] == i).
+    """
+    forms = [similarity_text(t) for t in texts]
+    distinct = {}  # normalized form -> first text index
+    form_of = [distinct.setdefault(form, i) for i, form in enumerate(forms)]
+    firsts = list(distinct.values())
+    parent = list(range(len(firsts)))
+
+    if len(firsts) > 1:
+        sets = [shingles(forms[i]) for i in firsts]
+        signatures = (hasher or MinHasher()).signatures(sets)
+
+        def find(x):
+            while parent[x] != x:
+                parent[x] = parent[parent[x]]
+                x = parent[x]
+            return x
+
+        for i, j in lsh_candidates(signatures).tolist():
+            ri, rj = find(i), find(j)
+            if ri != rj and same_topic(
+                forms[firsts[i]], forms[firsts[j]], (sets[i], sets[j]), threshold,
+                numerals_ab=(numerals(texts[firsts[i]]), numerals(texts[firsts[j]])),
+            ):
+                # The lower index (earlier text) stays the representative
+                parent[max(ri, rj)] = min(ri, rj)
+        roots = [find(x) for x in range(len(firsts))]
+    else:
+        roots = parent
+
+    position = {first: k for k, first in enumerate(firsts)}
+    return [firsts[roots[position[form_of[i]]]] for i in range(len(texts))]
+
+
+def merge_near_duplicates(items, threshold=EXAM_DEDUP_THRESHOLD):
+    """
+    Returns (kept items in order, {kept item: [merged near-duplicates]}).
+    """
+    clusters = near_duplicate_clusters(items, threshold)
+    kept, merged = [], {}
+    for i, cluster in enumerate(clusters):
+        if cluster == i:
+            kept.append(items[i])
+        else:
+            merged.setdefault(items[cluster], []).append(items[i])
+    return kept, merged
+
+
+# -------------------------
+# 🔹 Assembly
+# -------------------------
+def parse_mix(mix):
+    """
+    "easy=0.3,medium=0.5" or {"easy": 0.3, ...} -> shares summing to 1.
+    """
+    if isinstance(mix, str):
+        pairs = (item.split("=", 1) for item in mix.split(",") if item.strip())
+        try:
+            mix = {name.strip(): float(share) for name, share in pairs}
+        except ValueError:
+            raise ValueError("Difficulty mix must look like easy=0.3,medium=0.5,hard=0.2.") from None
+    if not isinstance(mix, dict) or not mix:
+        raise ValueError("Difficulty mix must name at least one difficulty.")
+    if any(share < 0 for share in mix.values()) or sum(mix.values()) <= 0:
+        raise ValueError("Difficulty shares must be non-negative and not all zero.")
+    total = sum(mix.values())
+    return {name: share / total for name, share in mix.items() if share > 0}
+
+
+def assemble(questions, total_marks=None, max_questions=None, mix=None, key="topic",
+             threshold=EXAM_DEDUP_THRESHOLD, dedupe=True):
+    """
+    Selects an exam from a question pool.
+
+    questions      Question models (core/models.py); key names the attribute clustered on
+    total_marks    marks budget (no limit when None)
+    max_questions  question count limit (no limit when None)
+    mix            difficulty shares (see parse_mix); when None difficulty is ignored
+    dedupe         cluster near-duplicate keys; when False, equal keys still share a cluster
+
+    At most one question per cluster is taken. Each pick goes to the
+    difficulty furthest below its share, taking that difficulty's next
+    question in pool order whose cluster is unused and which fits the budget.
+    Runs in O(pool) after clustering.
+    """
+    keys = [getattr(q, key) for q in questions]
+    if dedupe:
+        clusters = near_duplicate_clusters(keys, threshold)
+    else:
+        first = {}
+        clusters = [first.setdefault(k, i) for i, k in enumerate(keys)]
+
+    shares = parse_mix(mix) if mix is not None else {None: 1.0}
+    queues = {level: deque() for level in shares}
+    for i, q in enumerate(questions):
+        level = q.difficulty if mix is not None else None
+        if level in queues:
+            queues[level].append(i)
+
+    remaining = float("inf") if total_marks is None else total_marks
+    limit = float("inf") if max_questions is None else max_questions
+    counts = dict.fromkeys(shares, 0)
+    used, selected = set(), []
+    while queues and len(selected) < limit:
+        n = len(selected) + 1
+        level = max(queues, key=lambda d: shares[d] * n - counts[d])
+        queue = queues[level]
+        while queue:
+            i = queue.popleft()
+            if clusters[i] not in used and questions[i].marks <= remaining:
+                break
+        else:
+            del queues[level]
+            continue
+        used.add(clusters[i])
+        counts[level] += 1
+        remaining -= questions[i].marks
+        selected.append(questions[i])
+
+    return {
+        "questions": selected,
+        "total_questions": len(selected),
+        "total_marks": sum(q.marks for q in selected),
+        "by_difficulty": {level: count for level, count in counts.items() if level is not None},
+        "pool_size": len(questions),
+        "distinct_clusters": len(set(clusters)),
+    }
@@ -0,0 +1,165 @@
+"""
+core/extraction_pool.py
+-----------------------
+Bounded worker pool for blocking syllabus extraction (PyPDF2 / python-docx / csv).
+Keeps parsing off the uvicorn event loop, caps how many files are parsed at once
+and rejects new work with a retry hint once the queue is full.
+"""
+
+import asyncio
+import collections
+import itertools
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+EXTRACTION_BACKEND = os.getenv("EXTRACTION_BACKEND", "process")  # "process" | "thread"
+EXTRACTION_WORKERS = int(os.getenv("EXTRACTION_WORKERS", str(min(4, os.cpu_count() or 1))))
+EXTRACTION_QUEUE_SIZE = int(os.getenv("EXTRACTION_QUEUE_SIZE", str(EXTRACTION_WORKERS * 2)))
+EXTRACTION_TIMEOUT = float(os.getenv("EXTRACTION_TIMEOUT", "60"))
+EXTRACTION_RETRY_AFTER = int(os.getenv("EXTRACTION_RETRY_AFTER", "5"))
+
+
+class PoolSaturated(RuntimeError):
+    """Raised when the pool already holds its maximum number of pending jobs."""
+
+    def __init__(self, retry_after: int):
+        super().__init__("Extraction queue is full, retry later.")
+        self.retry_after = retry_after
+
+
+class ExtractionTimeout(TimeoutError):
+    """Raised when a single file takes longer than the per-file timeout."""
+
+
+class ExtractionPool:
+    def __init__(self, backend=EXTRACTION_BACKEND, max_workers=EXTRACTION_WORKERS,
+                 max_pending=EXTRACTION_QUEUE_SIZE, timeout=EXTRACTION_TIMEOUT,
+                 retry_after=EXTRACTION_RETRY_AFTER):
+        if backend not in ("process", "thread"):
+            raise ValueError(f"Unknown extraction backend: {backend}")
+        self.backend = backend
+        self.max_workers = max_workers
+        self.max_pending = max(max_pending, max_workers)
+        self.timeout = timeout
+        self.retry_after = retry_after
+        self._executor = None
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._completed = 0
+        self._rejected = 0
+        self._timed_out = 0
+
+    def _get_executor(self):
+        # Created lazily so importing the app never forks worker processes.
+        if self._executor is None:
+            if self.backend == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="extraction"
+                )
+        return self._executor
+
+    def _release(self, _future=None):
+        with self._lock:
+            self._pending -= 1
+            self._completed += 1
+
+    def check_capacity(self):
+        """
+        Raises PoolSaturated when no slot is free. Route handlers run after
+        the body has been spooled, so api/middleware/upload_guard.py calls
+        this before reading an upload.
+        """
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self._rejected += 1
+                raise PoolSaturated(self.retry_after)
+
+    async def submit(self, fn, *args, timeout=None):
+        """
+        Runs fn(*args) on the pool and awaits its result.
+        A slot stays taken until the worker really finishes, even after a timeout,
+        so a stuck parse keeps counting against the concurrency limit.
+        """
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self._rejected += 1
+                raise PoolSaturated(self.retry_after)
+            self._pending += 1
+
+        try:
+            cf_future = self._get_executor().submit(fn, *args)
+        except Exception:
+            self._release()
+            raise
+        cf_future.add_done_callback(self._release)
+
+        timeout = self.timeout if timeout is None else timeout
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(cf_future), timeout)
+        except asyncio.TimeoutError:
+            cf_future.cancel()
+            with self._lock:
+                self._timed_out += 1
+            raise ExtractionTimeout(f"Extraction exceeded {timeout:g}s.")
+
+    async def imap(self, fn, arg_list, window=None, timeout=None):
+        """
+        Async generator running fn(*args) for every tuple in arg_list and
+        yielding results in input order. At most `window` calls are in flight
+        (default: one per worker) and the whole map holds a single pending
+        slot. Closing the generator early (e.g. via contextlib.aclosing)
+        cancels calls that have not started yet.
+        """
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self._rejected += 1
+                raise PoolSaturated(self.retry_after)
+            self._pending += 1
+
+        executor = self._get_executor()
+        timeout = self.timeout if timeout is None else timeout
+        args = iter(arg_list)
+        in_flight = collections.deque()
+        try:
+            for item in itertools.islice(args, window or self.max_workers):
+                in_flight.append(executor.submit(fn, *item))
+            while in_flight:
+                cf_future = in_flight.popleft()
+                try:
+                    result = await asyncio.wait_for(asyncio.wrap_future(cf_future), timeout)
+                except asyncio.TimeoutError:
+                    with self._lock:
+                        self._timed_out += 1
+                    raise ExtractionTimeout(f"Extraction exceeded {timeout:g}s.")
+                item = next(args, None)
+                if item is not None:
+                    in_flight.append(executor.submit(fn, *item))
+                yield result
+        finally:
+            for cf_future in in_flight:
+                cf_future.cancel()
+            self._release()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "backend": self.backend,
+                "max_workers": self.max_workers,
+                "max_pending": self.max_pending,
+                "pending": self._pending,
+                "completed": self._completed,
+                "rejected": self._rejected,
+                "timed_out": self._timed_out,
+            }
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+# Shared pool used by the upload routes
+extraction_pool = ExtractionPool()
@@ -0,0 +1,313 @@
+"""
+core/generation.py
+------------------
+Pluggable text generation for the agents.
+
+Agents describe what they need as Prompts (a kind plus fields, e.g.
+lesson/topic) and hand them to the shared `generator`:
+
+  • TemplateBackend (default) renders the built-in templates locally, with no
+    batching overhead — outputs are what the agents always produced.
+  • HTTPBackend posts {"prompts": [...]} to GENERATOR_URL over a pooled
+    keep-alive httpx.AsyncClient and expects {"outputs": [...]} back (see
+    core/generator_stub.py for a local stand-in server).
+
+For remote backends the Generator runs on its own event-loop thread and:
+  • coalesces identical in-flight prompts (singleflight),
+  • micro-batches prompts arriving within GENERATOR_BATCH_WINDOW_MS, up to
+    GENERATOR_MAX_BATCH per backend call,
+  • caps concurrent backend calls (GENERATOR_MAX_CONCURRENCY) and their rate
+    (GENERATOR_RATE_LIMIT calls per second, 0 = unlimited).
+"""
+
+import asyncio
+import os
+import threading
+import time
+from typing import NamedTuple
+
+GENERATOR_BACKEND = os.getenv("GENERATOR_BACKEND", "template")  # "template" | "http"
+GENERATOR_URL = os.getenv("GENERATOR_URL", "http://127.0.0.1:9100/generate")
+GENERATOR_TIMEOUT = float(os.getenv("GENERATOR_TIMEOUT", "30"))
+GENERATOR_POOL_SIZE = int(os.getenv("GENERATOR_POOL_SIZE", "16"))
+GENERATOR_BATCH_WINDOW_MS = float(os.getenv("GENERATOR_BATCH_WINDOW_MS", "5"))
+GENERATOR_MAX_BATCH = int(os.getenv("GENERATOR_MAX_BATCH", "32"))
+GENERATOR_MAX_CONCURRENCY = int(os.getenv("GENERATOR_MAX_CONCURRENCY", "8"))
+GENERATOR_RATE_LIMIT = float(os.getenv("GENERATOR_RATE_LIMIT", "0"))
+
+# Prompt text sent to remote backends, and the local template output per kind
+PROMPTS = {
+    "lesson": "Write concise study notes for the topic: {topic}",
+    "question": "Write one exam question testing the core concepts of: {topic}",
+    "recall_question": "Write one short recall question on the definitions of: {topic}",
+    "analysis_question": "Write one exam question applying {topic} to a worked problem",
+    "criterion": "Describe how to grade the rubric criterion: {criterion}",
+}
+TEMPLATES = {
+    "lesson": "Generated notes for {topic}",
+    "question": "Explain the core concepts of {topic}.",
+    "recall_question": "Define {topic} and state its key terms.",
+    "analysis_question": "Apply {topic} to a worked problem and justify each step.",
+    "criterion": "Evaluate {criterion} level for each student submission.",
+}
+
+
+class GenerationError(RuntimeError):
+    """Raised when the backend fails or returns a malformed response."""
+
+
+class Prompt(NamedTuple):
+    kind: str
+    text: str
+    fields: tuple  # sorted (name, value) pairs
+
+    def field_dict(self):
+        return dict(self.fields)
+
+
+def prompt(kind, **fields):
+    if kind not in PROMPTS:
+        raise ValueError(f"Unknown prompt kind: {kind}")
+    return Prompt(kind, PROMPTS[kind].format(**fields), tuple(sorted(fields.items())))
+
+
+# -------------------------
+# 🔹 Backends
+# -------------------------
+class TemplateBackend:
+    """Local templates; synchronous and free, so the Generator bypasses batching."""
+
+    name = "template"
+    local = True
+
+    def render(self, prompts):
+        return [TEMPLATES[p.kind].format(**p.field_dict()) for p in prompts]
+
+    async def generate_batch(self, prompts):
+        return self.render(prompts)
+
+    async def aclose(self):
+        pass
+
+
+class HTTPBackend:
+    """Remote generator reached over a pooled, keep-alive HTTP client."""
+
+    name = "http"
+    local = False
+
+    def __init__(self, url=GENERATOR_URL, timeout=GENERATOR_TIMEOUT, pool_size=GENERATOR_POOL_SIZE):
+        self.url = url
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self._client = None
+
+    def _get_client(self):
+        if self._client is None:
+            import httpx
+
+            limits = httpx.Limits(max_connections=self.pool_size, max_keepalive_connections=self.pool_size)
+            self._client = httpx.AsyncClient(timeout=self.timeout, limits=limits)
+        return self._client
+
+    async def generate_batch(self, prompts):
+        body = {"prompts": [{"kind": p.kind, "text": p.text, "fields": p.field_dict()} for p in prompts]}
+        try:
+            response = await self._get_client().post(self.url, json=body)
+            response.raise_for_status()
+            outputs = response.json()["outputs"]
+        except Exception as e:
+            raise GenerationError(f"Generator backend failed: {e}") from e
+        if not isinstance(outputs, list) or len(outputs) != len(prompts):
+            raise GenerationError("Generator backend returned a mismatched batch.")
+        return outputs
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+def make_backend(name=GENERATOR_BACKEND):
+    if name == "template":
+        return TemplateBackend()
+    if name == "http":
+        return HTTPBackend()
+    raise ValueError(f"Unknown generator backend: {name}")
+
+
+# -------------------------
+# 🔹 Rate Limiting
+# -------------------------
+class TokenBucket:
+    """Async token bucket: `rate` acquisitions per second, bursts up to `burst`."""
+
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        self.capacity = burst or max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+# -------------------------
+# 🔹 Generator
+# -------------------------
+class Generator:
+    def __init__(self, backend=None, batch_window_ms=GENERATOR_BATCH_WINDOW_MS, max_batch=GENERATOR_MAX_BATCH,
+                 max_concurrency=GENERATOR_MAX_CONCURRENCY, rate_limit=GENERATOR_RATE_LIMIT, coalesce=True):
+        self.backend = backend
+        self.batch_window = batch_window_ms / 1000
+        self.max_batch = max(1, max_batch)
+        self.max_concurrency = max_concurrency
+        self.rate_limit = rate_limit
+        self.coalesce = coalesce
+        self._loop = None
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._inflight = {}  # Prompt -> asyncio.Future (singleflight)
+        self._pending = []   # (Prompt, Future) awaiting the next batch
+        self._flush_handle = None
+        self._semaphore = None
+        self._bucket = None
+        # Counters are bumped from the generator thread and from callers' threads
+        self._stats_lock = threading.Lock()
+        self._stats = {"prompts": 0, "coalesced": 0, "batches": 0, "batched_prompts": 0, "errors": 0}
+
+    def _count(self, **increments):
+        with self._stats_lock:
+            for name, n in increments.items():
+                self._stats[name] += n
+
+    def _get_backend(self):
+        if self.backend is None:
+            self.backend = make_backend()
+        return self.backend
+
+    def _ensure_loop(self):
+        # The event loop thread starts on first remote use, never at import
+        with self._start_lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                ready = threading.Event()
+
+                def run():
+                    asyncio.set_event_loop(loop)
+                    self._semaphore = asyncio.Semaphore(self.max_concurrency)
+                    self._bucket = TokenBucket(self.rate_limit) if self.rate_limit > 0 else None
+                    loop.call_soon(ready.set)
+                    loop.run_forever()
+
+                self._thread = threading.Thread(target=run, name="generator", daemon=True)
+                self._thread.start()
+                ready.wait()
+                self._loop = loop
+        return self._loop
+
+    # Runs on the generator loop
+    def _submit(self, item):
+        self._count(prompts=1)
+        if self.coalesce:
+            shared = self._inflight.get(item)
+            if shared is not None:
+                self._count(coalesced=1)
+                return shared
+        future = self._loop.create_future()
+        if self.coalesce:
+            self._inflight[item] = future
+            future.add_done_callback(lambda _f, key=item: self._inflight.pop(key, None))
+        self._pending.append((item, future))
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = self._loop.call_later(self.batch_window, self._flush)
+        return future
+
+    def _flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        while self._pending:
+            batch, self._pending = self._pending[:self.max_batch], self._pending[self.max_batch:]
+            self._loop.create_task(self._dispatch(batch))
+
+    async def _dispatch(self, batch):
+        async with self._semaphore:
+            if self._bucket is not None:
+                await self._bucket.acquire()
+            self._count(batches=1, batched_prompts=len(batch))
+            try:
+                outputs = await self._get_backend().generate_batch([item for item, _ in batch])
+            except Exception as e:
+                self._count(errors=1)
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                return
+        for (_, future), output in zip(batch, outputs):
+            if not future.done():
+                future.set_result(output)
+
+    async def _generate_on_loop(self, items):
+        return await asyncio.gather(*[self._submit(item) for item in items])
+
+    def generate_many(self, prompts):
+        """
+        Blocking entry point for the (synchronous) agents. Call it from a
+        worker thread: on an event loop it stalls the loop for the whole
+        backend round trip (use agenerate_many there).
+        """
+        prompts = list(prompts)
+        backend = self._get_backend()
+        if backend.local:
+            self._count(prompts=len(prompts))
+            return backend.render(prompts)
+        if not prompts:
+            return []
+        loop = self._ensure_loop()
+        return asyncio.run_coroutine_threadsafe(self._generate_on_loop(prompts), loop).result()
+
+    async def agenerate_many(self, prompts):
+        """Async entry point: awaits the generator loop without blocking the caller's loop."""
+        prompts = list(prompts)
+        backend = self._get_backend()
+        if backend.local:
+            self._count(prompts=len(prompts))
+            return backend.render(prompts)
+        if not prompts:
+            return []
+        loop = self._ensure_loop()
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(self._generate_on_loop(prompts), loop))
+
+    def stats(self):
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats["backend"] = self._get_backend().name
+        stats["in_flight"] = len(self._inflight)
+        stats["avg_batch"] = round(stats["batched_prompts"] / stats["batches"], 2) if stats["batches"] else 0
+        return stats
+
+    def close(self):
+        loop = self._loop
+        if loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self.backend.aclose(), loop).result(timeout=5)
+        loop.call_soon_threadsafe(loop.stop)
+        self._thread.join(timeout=5)
+        self._loop = None
+        self._thread = None
+
+
+# Shared generator used by the agents
+generator = Generator()
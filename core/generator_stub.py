@@ -0,0 +1,64 @@
+"""
+core/generator_stub.py
+----------------------
+Local stand-in for a remote generation service, for offline testing and
+throughput measurement of core.generation.HTTPBackend.
+
+    POST /generate  {"prompts": [{"kind", "text", "fields"}, ...]}
+                 -> {"outputs": ["...", ...]}
+
+Each call sleeps STUB_LATENCY_MS plus STUB_PER_PROMPT_MS per prompt, like a
+batched model server, and counts calls and prompts at GET /stats.
+
+    python -m core.generator_stub --port 9100
+"""
+
+import argparse
+import asyncio
+import os
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+from core.generation import TEMPLATES
+
+STUB_LATENCY_MS = float(os.getenv("STUB_LATENCY_MS", "20"))
+STUB_PER_PROMPT_MS = float(os.getenv("STUB_PER_PROMPT_MS", "0.5"))
+
+app = FastAPI(title="Generator stub")
+app.state.calls = 0
+app.state.prompts = 0
+
+
+@app.post("/generate")
+async def generate(request: Request):
+    body = await request.json()
+    prompts = body.get("prompts")
+    if not isinstance(prompts, list):
+        return JSONResponse(status_code=400, content={"error": "prompts must be a list"})
+    app.state.calls += 1
+    app.state.prompts += len(prompts)
+    await asyncio.sleep((STUB_LATENCY_MS + STUB_PER_PROMPT_MS * len(prompts)) / 1000)
+    outputs = []
+    for p in prompts:
+        template = TEMPLATES.get(p.get("kind"))
+        try:
+            outputs.append(template.format(**p.get("fields", {})) if template else p.get("text", ""))
+        except (KeyError, IndexError):
+            outputs.append(p.get("text", ""))
+    return {"outputs": outputs}
+
+
+@app.get("/stats")
+async def stats():
+    return {"calls": app.state.calls, "prompts": app.state.prompts}
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    args = parser.parse_args()
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
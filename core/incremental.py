@@ -0,0 +1,107 @@
+"""
+core/incremental.py
+-------------------
+Incremental re-processing of edited syllabi.
+
+A syllabus submitted under a syllabus id is versioned and diffed against its
+previous version at the topic level (core/syllabus_versions.py). The
+per-topic agents (content, exam, evaluator) then run only over the topics
+the previous version's output does not cover (added and changed topics,
+plus exam topics whose near-duplicate was removed), and their outputs are
+merged with the previous version's outputs for every other topic. The
+whole-syllabus agents (rubric, analytics) are cheap and run on each version.
+
+Each version's results are kept in the "syllabus_versions" cache for the next
+revision to build on. When they are gone (evicted, or the agent never ran for
+that version) the agent runs over the full syllabus instead.
+"""
+
+import asyncio
+
+from agents.content_agent import service as content_agent
+from agents.exam_agent import service as exam_agent
+from agents.evaluator_agent import service as evaluator_agent
+from core.agent_executor import agent_executor
+from core.cache import get_cache
+from core.syllabus import Syllabus
+from core.syllabus_versions import TopicDelta, syllabus_versions
+from core.tracing import span
+from core.workflow import STAGE_EXECUTOR_AGENTS, STAGE_LABELS
+
+# Workflow label -> executor agent name, in workflow order
+LABEL_AGENTS = {STAGE_LABELS[stage]: agent for stage, agent in STAGE_EXECUTOR_AGENTS.items()}
+
+# Agents whose output is per topic: (topics a result lacks, merge of results)
+TOPIC_AGENTS = {
+    "Content Agent": (content_agent.missing_topics, content_agent.merge_topics),
+    "Exam Agent": (exam_agent.missing_topics, exam_agent.merge_topics),
+    "Evaluator Agent": (evaluator_agent.missing_topics, evaluator_agent.merge_topics),
+}
+
+# Rebuild domain models in results read back from the disk tier
+_REVIVE = {
+    "Content Agent": content_agent.revive_content,
+    "Exam Agent": exam_agent.revive_exam,
+}
+
+# Merged workflow results per stored syllabus version
+version_cache = get_cache("syllabus_versions")
+
+
+def _revive(results):
+    return {label: _REVIVE[label](output) if label in _REVIVE else output for label, output in results.items()}
+
+
+def _version_key(version):
+    return f"{version.syllabus_id}:{version.version}:{version.digest}"
+
+
+async def run_incremental(syllabus_id, syllabus, labels=None):
+    """
+    Runs the workflow agents (all, or the given workflow labels) for a
+    revision of syllabus_id, reusing the previous version's per-topic
+    outputs. Returns {"syllabus_id", "version", "previous_version", "delta",
+    "reprocessed", "workflow_results"}; reprocessed maps each label to the
+    number of topics its agent ran over.
+    """
+    syllabus = Syllabus.coerce(syllabus)
+    labels = [label for label in LABEL_AGENTS if labels is None or label in labels]
+    topics = syllabus.topics
+    version, previous = await asyncio.to_thread(syllabus_versions.commit, syllabus_id, topics)
+    if previous is version:
+        delta = TopicDelta((), (), (), len(topics))
+    else:
+        delta = version.delta
+    prior = {}
+    if previous is not None:
+        prior = await asyncio.to_thread(version_cache.get, _version_key(previous), {}, _revive)
+
+    reprocessed = {}
+
+    async def run(label):
+        agent = LABEL_AGENTS[label]
+        if label not in TOPIC_AGENTS or label not in prior or not topics:
+            reprocessed[label] = len(topics)
+            return await agent_executor.run(agent, syllabus)
+        missing, merge = TOPIC_AGENTS[label]
+        fresh = missing(prior[label], topics)
+        reprocessed[label] = len(fresh)
+        if not fresh:
+            return merge([prior[label]], topics)
+        return merge([prior[label], await agent_executor.run(agent, Syllabus.from_topics(fresh))], topics)
+
+    with span("workflow.incremental"):
+        outputs = await asyncio.gather(*(run(label) for label in labels))
+    results = dict(zip(labels, outputs))
+
+    # Keep outputs of agents not run this time when the version is unchanged
+    stored = {**prior, **results} if previous is version else results
+    await asyncio.to_thread(version_cache.set, _version_key(version), stored)
+    return {
+        "syllabus_id": syllabus_id,
+        "version": version.version,
+        "previous_version": previous.version if previous is not None else None,
+        "delta": delta.to_dict(),
+        "reprocessed": reprocessed,
+        "workflow_results": results,
+    }
@@ -0,0 +1,542 @@
+"""
+core/ingestion.py
+-----------------
+Streaming ingestion of large student answer files.
+
+An uploaded CSV / NDJSON answer file (the format of core/scoring.py) is saved
+to INGEST_DIR and processed by a background job (kind "answers", see
+core/jobs.py) without ever being held in memory whole:
+
+  reader thread  parses the file INGEST_BATCH_ROWS rows at a time and
+                 validates every row (both ids present, every rubric
+                 criterion a number in [0, max_score]); invalid rows are
+                 counted and skipped, the first INGEST_ERROR_SAMPLES kept
+  job thread     grades each batch against the rubric in one vectorized
+                 pass, writes it to the results store in one transaction
+                 and stages it for analytics in a temporary file
+
+At most INGEST_QUEUE_BATCHES parsed batches wait between the two, so memory
+is one batch per stage plus per-student aggregates, whatever the file size.
+
+The staged batches reach the analytics score store only once the whole file
+has been ingested, and a failed or cancelled ingestion drops its rows from
+the results store, so a re-upload after a failure is never counted twice.
+
+Student totals match core.scoring.grade with equal question weights: the
+sum of a student's question scores over the number of distinct questions
+in the file, so unanswered questions count 0. Unlike grade, a repeated
+(student, question) row is counted again rather than replaced.
+"""
+
+import asyncio
+import csv
+import io
+import json
+import os
+import queue
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+from itertools import islice, repeat
+from typing import NamedTuple
+
+import numpy as np
+
+from core.analytics import DEFAULT_COHORT, GroupAggregates, Interner, score_store
+from core.jobs import job_queue
+from core.rubrics import rubric_registry, scoring_rubric
+from core.scoring import ID_COLUMNS, SCORE_MAX, answer_scores, grade_letters, total_stats
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+INGEST_DIR = os.getenv("INGEST_DIR", "data/uploads/answers")
+INGEST_MAX_BYTES = int(os.getenv("INGEST_MAX_BYTES", str(4 * 1024 * 1024 * 1024)))
+INGEST_CHUNK_SIZE = int(os.getenv("INGEST_CHUNK_SIZE", str(1024 * 1024)))
+INGEST_BATCH_ROWS = int(os.getenv("INGEST_BATCH_ROWS", "65536"))
+INGEST_QUEUE_BATCHES = int(os.getenv("INGEST_QUEUE_BATCHES", "4"))
+INGEST_ERROR_SAMPLES = int(os.getenv("INGEST_ERROR_SAMPLES", "20"))
+# Stop the ingestion once more rows than this were rejected (0 = never)
+INGEST_MAX_REJECTED = int(os.getenv("INGEST_MAX_REJECTED", "100000"))
+RESULTS_DB_PATH = os.getenv("RESULTS_DB_PATH", "data/results.sqlite3")
+
+_loads = orjson.loads if orjson is not None else json.loads
+
+
+class IngestionError(ValueError):
+    """Raised when an answer file cannot be ingested (bad header, encoding, too many invalid rows)."""
+
+
+class AnswerFileTooLarge(ValueError):
+    """Raised when an answer upload exceeds INGEST_MAX_BYTES."""
+
+
+class AnswerBatch(NamedTuple):
+    student_ids: list
+    question_ids: list
+    marks: np.ndarray  # float32 (rows, criteria)
+    rows: int          # input rows consumed, valid or not
+
+
+class RejectLog:
+    """Counts invalid rows and keeps the first few as examples."""
+
+    def __init__(self, samples=INGEST_ERROR_SAMPLES, limit=INGEST_MAX_REJECTED):
+        self.count = 0
+        self.samples = []
+        self.max_samples = samples
+        self.limit = limit
+
+    def add(self, row, message):
+        self.count += 1
+        if len(self.samples) < self.max_samples:
+            self.samples.append({"row": row, "error": message})
+        if self.limit and self.count > self.limit:
+            raise IngestionError(f"More than {self.limit} invalid rows; ingestion stopped.")
+
+
+# -------------------------
+# 🔹 Parsing
+# -------------------------
+def _mark_column(values):
+    try:
+        return np.asarray(values, dtype=np.float32)
+    except (ValueError, TypeError):
+        # Some marks are not numbers: convert one by one, NaN marks the bad rows
+        column = np.empty(len(values), dtype=np.float32)
+        for i, value in enumerate(values):
+            try:
+                column[i] = float(value)
+            except (ValueError, TypeError):
+                column[i] = np.nan
+        return column
+
+
+def _validated(student_ids, question_ids, mark_values, criteria, max_score, row_numbers, rows, rejects):
+    """Drops rows with a missing id or a mark that is not a number in [0, max_score]."""
+    marks = np.stack([_mark_column(values) for values in mark_values], axis=1) if len(student_ids) else \
+        np.zeros((0, len(criteria)), dtype=np.float32)
+    valid_marks = np.isfinite(marks) & (marks >= 0) & (marks <= max_score)
+    ok = valid_marks.all(axis=1)
+    if "" in student_ids or "" in question_ids:
+        ok &= np.fromiter((bool(s and q) for s, q in zip(student_ids, question_ids)), dtype=bool, count=len(ok))
+    if not ok.all():
+        for i in np.flatnonzero(~ok).tolist():
+            if not (student_ids[i] and question_ids[i]):
+                message = "student_id and question_id are required"
+            else:
+                bad = [c for c, good in zip(criteria, valid_marks[i]) if not good]
+                message = f"marks must be numbers from 0 to {max_score:g}: {', '.join(bad)}"
+            rejects.add(row_numbers[i], message)
+        keep = np.flatnonzero(ok)
+        student_ids = [student_ids[i] for i in keep.tolist()]
+        question_ids = [question_ids[i] for i in keep.tolist()]
+        marks = marks[keep]
+    return AnswerBatch(student_ids, question_ids, marks, rows)
+
+
+def _csv_batches(text, criteria, max_score, batch_rows, rejects):
+    reader = csv.reader(text)
+    header = [h.strip().lower() for h in next(reader, [])]
+    missing = [c for c in ID_COLUMNS + criteria if c not in header]
+    if missing:
+        raise IngestionError(f"CSV header is missing columns: {', '.join(missing)}")
+    width = len(header)
+    student_col, question_col = (header.index(c) for c in ID_COLUMNS)
+    mark_cols = [header.index(c) for c in criteria]
+    seen = 0
+    while True:
+        rows = list(islice(reader, batch_rows))
+        if not rows:
+            return
+        first, consumed = seen + 1, len(rows)
+        seen += consumed
+        numbers = range(first, first + consumed)
+        if any(len(row) != width for row in rows):
+            kept, numbers = [], []
+            for n, row in enumerate(rows, first):
+                if len(row) == width:
+                    kept.append(row)
+                    numbers.append(n)
+                elif row:  # blank lines are skipped silently
+                    rejects.add(n, f"expected {width} fields, got {len(row)}")
+            rows = kept
+        columns = list(zip(*rows)) if rows else [()] * width
+        yield _validated(
+            columns[student_col], columns[question_col], [columns[c] for c in mark_cols],
+            criteria, max_score, numbers, consumed, rejects,
+        )
+
+
+def _ndjson_batches(text, criteria, max_score, batch_rows, rejects):
+    seen = 0
+    while True:
+        lines = list(islice(text, batch_rows))
+        if not lines:
+            return
+        first = seen + 1
+        seen += len(lines)
+        student_ids, question_ids, numbers = [], [], []
+        marks = [[] for _ in criteria]
+        for n, line in enumerate(lines, first):
+            if not line.strip():
+                continue
+            try:
+                record = _loads(line)
+            except ValueError:
+                rejects.add(n, "malformed JSON")
+                continue
+            if not isinstance(record, dict) or "student_id" not in record or "question_id" not in record:
+                rejects.add(n, "student_id and question_id are required")
+                continue
+            scores = record.get("scores", record)
+            try:
+                values = [scores[c] for c in criteria]
+            except (KeyError, TypeError):
+                rejects.add(n, f"missing marks for: {', '.join(criteria)}")
+                continue
+            for column, value in zip(marks, values):
+                column.append(value)
+            student_ids.append(str(record["student_id"]))
+            question_ids.append(str(record["question_id"]))
+            numbers.append(n)
+        yield _validated(student_ids, question_ids, marks, criteria, max_score, numbers, len(lines), rejects)
+
+
+def iter_answer_batches(text, criteria, fmt="csv", max_score=SCORE_MAX, batch_rows=INGEST_BATCH_ROWS, rejects=None):
+    """
+    Yields validated AnswerBatches from a text stream of a CSV / NDJSON answer
+    file. Invalid rows go to rejects (a RejectLog); extra columns are ignored.
+    """
+    criteria = tuple(criteria)
+    rejects = rejects if rejects is not None else RejectLog()
+    parse = _ndjson_batches if fmt == "ndjson" else _csv_batches
+    try:
+        yield from parse(text, criteria, max_score, batch_rows, rejects)
+    except UnicodeDecodeError as e:
+        raise IngestionError(f"Answer file is not UTF-8: {e}") from None
+
+
+# -------------------------
+# 🔹 Results Store
+# -------------------------
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS answer_results (
+    ingestion_id TEXT NOT NULL,
+    student_id   TEXT NOT NULL,
+    question_id  TEXT NOT NULL,
+    score        REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS answer_results_student ON answer_results (ingestion_id, student_id);
+CREATE TABLE IF NOT EXISTS student_results (
+    ingestion_id TEXT NOT NULL,
+    student_id   TEXT NOT NULL,
+    score        REAL NOT NULL,
+    grade        TEXT NOT NULL,
+    answers      INTEGER NOT NULL,
+    PRIMARY KEY (ingestion_id, student_id)
+);
+"""
+
+
+class ResultStore:
+    """
+    Graded answers and student totals per ingestion, in SQLite; one
+    connection guarded by a lock, reopened after a fork. Each batch is one
+    transaction.
+    """
+
+    def __init__(self, path=RESULTS_DB_PATH):
+        self.path = path
+        self._conn = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def _connection(self):
+        if self._conn is None or self._pid != os.getpid():
+            if self.path != ":memory:":
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._conn, self._pid = conn, os.getpid()
+        return self._conn
+
+    def _write(self, sql, rows):
+        with self._lock:
+            conn = self._connection()
+            conn.execute("BEGIN")
+            try:
+                conn.executemany(sql, rows)
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+
+    def write_answers(self, ingestion_id, student_ids, question_ids, scores):
+        self._write(
+            "INSERT INTO answer_results (ingestion_id, student_id, question_id, score) VALUES (?, ?, ?, ?)",
+            zip(repeat(ingestion_id), student_ids, question_ids, scores.tolist()),
+        )
+
+    def write_students(self, ingestion_id, rows):
+        """rows: (student_id, score, grade, answers) tuples."""
+        self._write(
+            "INSERT OR REPLACE INTO student_results (ingestion_id, student_id, score, grade, answers) "
+            "VALUES (?, ?, ?, ?, ?)",
+            ((ingestion_id, *row) for row in rows),
+        )
+
+    def clear(self, ingestion_id):
+        """Drops an ingestion's rows (a re-run after an interrupted job starts clean)."""
+        with self._lock:
+            conn = self._connection()
+            conn.execute("DELETE FROM answer_results WHERE ingestion_id = ?", (ingestion_id,))
+            conn.execute("DELETE FROM student_results WHERE ingestion_id = ?", (ingestion_id,))
+
+    def summary(self, ingestion_id):
+        with self._lock:
+            conn = self._connection()
+            students, answers = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(answers), 0) FROM student_results WHERE ingestion_id = ?",
+                (ingestion_id,),
+            ).fetchone()
+            grades = conn.execute(
+                "SELECT grade, COUNT(*) FROM student_results WHERE ingestion_id = ? GROUP BY grade ORDER BY grade",
+                (ingestion_id,),
+            ).fetchall()
+        if not students:
+            return None
+        return {"ingestion_id": ingestion_id, "students": students, "answers": answers,
+                "grade_distribution": dict(grades)}
+
+    def student(self, ingestion_id, student_id):
+        with self._lock:
+            conn = self._connection()
+            total = conn.execute(
+                "SELECT score, grade, answers FROM student_results WHERE ingestion_id = ? AND student_id = ?",
+                (ingestion_id, student_id),
+            ).fetchone()
+            if total is None:
+                return None
+            answers = conn.execute(
+                "SELECT question_id, score FROM answer_results WHERE ingestion_id = ? AND student_id = ?",
+                (ingestion_id, student_id),
+            ).fetchall()
+        return {
+            "student_id": student_id,
+            "score": total[0],
+            "grade": total[1],
+            "answers": [{"question_id": q, "score": round(s, 2)} for q, s in answers],
+        }
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None and self._pid == os.getpid():
+                self._conn.close()
+            self._conn = None
+
+
+# Global store
+results_store = ResultStore()
+
+
+# -------------------------
+# 🔹 Pipeline
+# -------------------------
+_DONE = object()
+
+
+def _put(batches, item, stop):
+    while not stop.is_set():
+        try:
+            batches.put(item, timeout=0.1)
+            return
+        except queue.Full:
+            continue
+
+
+def ingest_file(path, fmt, rubric, max_score=SCORE_MAX, cohort=DEFAULT_COHORT, topics=None,
+                ingestion_id=None, report=None, store=None, analytics=score_store, stop=None):
+    """
+    Streams an answer file through parse -> grade -> store (see module
+    docstring) and returns the ingestion summary. report(progress) is
+    called after every batch. Setting stop (a threading.Event) aborts.
+    """
+    store = store or results_store
+    ingestion_id = ingestion_id or uuid.uuid4().hex
+    stop = stop or threading.Event()
+    rejects = RejectLog()
+    batches = queue.Queue(maxsize=max(1, INGEST_QUEUE_BATCHES))
+    total_bytes = os.path.getsize(path)
+    timings = {"parse": 0.0, "grade": 0.0, "write": 0.0, "analytics": 0.0}
+
+    def read():
+        try:
+            with open(path, "rb") as raw:
+                text = io.TextIOWrapper(raw, encoding="utf-8-sig", newline="" if fmt != "ndjson" else None)
+                parsed = iter_answer_batches(text, rubric.criteria, fmt, max_score, INGEST_BATCH_ROWS, rejects)
+                while not stop.is_set():
+                    start = time.perf_counter()
+                    batch = next(parsed, None)
+                    timings["parse"] += time.perf_counter() - start
+                    if batch is None:
+                        break
+                    _put(batches, (batch, raw.tell()), stop)
+        except BaseException as e:
+            _put(batches, e, stop)
+        finally:
+            _put(batches, _DONE, stop)
+
+    store.clear(ingestion_id)
+    students, questions = Interner(), Interner()
+    per_student = GroupAggregates(sketch=False)
+    rows = accepted = staged_batches = 0
+    started = time.perf_counter()
+    # Graded batches wait here (as interned codes) until the whole file is in
+    staged = tempfile.TemporaryFile(dir=os.path.dirname(os.path.abspath(path)), prefix=".analytics-")
+    reader = threading.Thread(target=read, name=f"ingest-{ingestion_id[:8]}", daemon=True)
+    reader.start()
+    try:
+        while not stop.is_set():
+            try:
+                item = batches.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            if item is _DONE:
+                break
+            if isinstance(item, BaseException):
+                raise item
+            batch, position = item
+            rows += batch.rows
+            if len(batch.student_ids):
+                start = time.perf_counter()
+                scores = answer_scores(batch.marks, rubric, max_score)
+                s_codes = students.codes(batch.student_ids)
+                per_student.update(s_codes, scores, len(students))
+                marks = np.clip(batch.marks / np.float32(max_score), 0, 1) * np.float32(100.0)
+                for array in (s_codes, questions.codes(batch.question_ids), scores, marks):
+                    np.save(staged, array)
+                staged_batches += 1
+                timings["grade"] += time.perf_counter() - start
+                start = time.perf_counter()
+                store.write_answers(ingestion_id, batch.student_ids, batch.question_ids, scores)
+                timings["write"] += time.perf_counter() - start
+                accepted += len(batch.student_ids)
+            if report is not None:
+                report({"rows": rows, "accepted": accepted, "rejected": rejects.count,
+                        "bytes_read": position, "total_bytes": total_bytes})
+        if stop.is_set():
+            raise IngestionError("Ingestion cancelled.")
+        stop.set()
+        reader.join()
+
+        if not accepted:
+            raise IngestionError("Answer file contains no valid answers.")
+        totals = (per_student.total / len(questions)).astype(np.float32)
+        start = time.perf_counter()
+        store.write_students(ingestion_id, zip(
+            students.names, np.round(totals, 2).tolist(), grade_letters(totals).tolist(), per_student.count.tolist()
+        ))
+        timings["write"] += time.perf_counter() - start
+    except BaseException:
+        stop.set()
+        reader.join()
+        staged.close()
+        store.clear(ingestion_id)
+        raise
+
+    # Everything is stored: hand the staged batches to analytics
+    start = time.perf_counter()
+    with staged:
+        staged.seek(0)
+        student_names = np.asarray(students.names, dtype=object)
+        question_names = np.asarray(questions.names, dtype=object)
+        for _ in range(staged_batches):
+            s_codes, q_codes, scores, marks = (np.load(staged) for _ in range(4))
+            analytics.add(student_names[s_codes].tolist(), question_names[q_codes].tolist(), scores,
+                          cohort, topics, marks, rubric.criteria)
+    timings["analytics"] += time.perf_counter() - start
+    seconds = time.perf_counter() - started
+    return {
+        "ingestion_id": ingestion_id,
+        "cohort": cohort,
+        "rubric": rubric.to_dict(),
+        "rows": rows,
+        "accepted": accepted,
+        "rejected": rejects.count,
+        "errors": rejects.samples,
+        "students": len(students),
+        "questions": len(questions),
+        **total_stats(totals),
+        "seconds": round(seconds, 3),
+        "rows_per_second": round(rows / seconds) if seconds else None,
+        "stage_seconds": {k: round(v, 3) for k, v in timings.items()},
+    }
+
+
+# -------------------------
+# 🔹 Uploads & Jobs
+# -------------------------
+def save_answer_file(file, max_bytes=INGEST_MAX_BYTES, chunk_size=INGEST_CHUNK_SIZE):
+    """
+    Streams an uploaded answer file to INGEST_DIR in fixed-size chunks;
+    returns (ingestion_id, path).
+    """
+    ingestion_id = uuid.uuid4().hex
+    os.makedirs(INGEST_DIR, exist_ok=True)
+    path = os.path.join(INGEST_DIR, f"{ingestion_id}.part")
+    written = 0
+    try:
+        with open(path, "wb") as f:
+            while True:
+                chunk = file.file.read(chunk_size)
+                if not chunk:
+                    break
+                written += len(chunk)
+                if written > max_bytes:
+                    raise AnswerFileTooLarge(f"Upload exceeds {max_bytes} bytes.")
+                f.write(chunk)
+    except BaseException:
+        os.remove(path)
+        raise
+    final = os.path.join(INGEST_DIR, ingestion_id)
+    os.replace(path, final)
+    return ingestion_id, final
+
+
+@job_queue.register("answers")
+async def answers_job(payload, report):
+    """
+    Job handler: ingests a saved answer file. The file is removed once the
+    job has finished (kept when interrupted, for the re-queued run).
+    """
+    stop = threading.Event()
+    try:
+        rubric = scoring_rubric(payload.get("weights"), payload.get("rubric_id"))
+        result = await asyncio.to_thread(
+            ingest_file, payload["path"], payload["fmt"], rubric, payload["max_score"], payload["cohort"],
+            payload.get("topics"), payload["ingestion_id"], report, stop=stop,
+        )
+    except asyncio.CancelledError:
+        stop.set()
+        raise
+    except BaseException:
+        _remove(payload["path"])
+        raise
+    _remove(payload["path"])
+    if payload.get("rubric_id"):
+        result["rubric"] = rubric_registry.get(payload["rubric_id"]).ref()
+    return result
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
@@ -0,0 +1,272 @@
+"""
+core/jobs.py
+------------
+Local async job queue for long-running workflows.
+
+Jobs are persisted in SQLite (no external broker), picked up by a configurable
+number of asyncio workers in priority order, and report per-stage progress
+while they run. Finished jobs keep their result for JOB_RESULT_TTL seconds so
+clients can poll cheaply; a background sweep purges expired rows. Jobs that
+were queued or running when the process stopped are re-queued on start.
+
+Several worker processes may share one database: a job is claimed with an
+atomic queued -> running update that records the claiming pid, so each runs
+exactly once. Under the multi-worker launcher only the supervisor re-queues
+interrupted jobs (JOB_RECOVER=0 in the workers), since a "running" row may
+belong to a live sibling: all of them before forking, and a dead worker's
+own jobs when it is reaped.
+"""
+
+import asyncio
+import itertools
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+from core.models import to_jsonable
+
+JOB_DB_PATH = os.getenv("JOB_DB_PATH", "data/jobs.sqlite3")
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+JOB_RESULT_TTL = float(os.getenv("JOB_RESULT_TTL", "3600"))
+JOB_SWEEP_INTERVAL = float(os.getenv("JOB_SWEEP_INTERVAL", "60"))
+JOB_RECOVER = os.getenv("JOB_RECOVER", "1") != "0"
+
+QUEUED, RUNNING, SUCCEEDED, FAILED = "queued", "running", "succeeded", "failed"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id          TEXT PRIMARY KEY,
+    kind        TEXT NOT NULL,
+    status      TEXT NOT NULL,
+    priority    INTEGER NOT NULL,
+    payload     TEXT NOT NULL,
+    progress    TEXT NOT NULL DEFAULT '{}',
+    result      TEXT,
+    error       TEXT,
+    created_at  REAL NOT NULL,
+    started_at  REAL,
+    finished_at REAL,
+    expires_at  REAL,
+    owner       INTEGER
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, priority, created_at);
+CREATE INDEX IF NOT EXISTS jobs_expiry ON jobs (expires_at);
+"""
+
+
+class JobStore:
+    """Thin SQLite wrapper; one shared connection guarded by a lock."""
+
+    def __init__(self, path=JOB_DB_PATH):
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(_SCHEMA)
+            columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+            if "owner" not in columns:  # databases created before claims recorded their pid
+                self._conn.execute("ALTER TABLE jobs ADD COLUMN owner INTEGER")
+
+    def _execute(self, sql, params=()):
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def create(self, kind, payload, priority):
+        job_id = uuid.uuid4().hex
+        self._execute(
+            "INSERT INTO jobs (id, kind, status, priority, payload, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+            (job_id, kind, QUEUED, priority, json.dumps(payload), time.time()),
+        )
+        return job_id
+
+    def get(self, job_id, with_result=False):
+        columns = "*" if with_result else "id, kind, status, priority, progress, error, created_at, started_at, finished_at, expires_at"
+        rows = self._execute(f"SELECT {columns} FROM jobs WHERE id = ?", (job_id,))
+        if not rows:
+            return None
+        job = dict(rows[0])
+        if job.get("expires_at") is not None and job["expires_at"] < time.time():
+            return None
+        job["progress"] = json.loads(job["progress"])
+        if with_result:
+            job["payload"] = json.loads(job["payload"])
+            job["result"] = json.loads(job["result"]) if job["result"] is not None else None
+        return job
+
+    def pending(self):
+        """Jobs to queue on start, best priority first."""
+        return self._execute(
+            "SELECT id, priority, created_at FROM jobs WHERE status = ? ORDER BY priority, created_at", (QUEUED,)
+        )
+
+    def requeue_interrupted(self, owner=None):
+        """
+        Marks jobs left running by a stopped process as queued again: every
+        running job, or only those claimed by the process with pid owner.
+        """
+        sql = "UPDATE jobs SET status = ?, started_at = NULL, owner = NULL WHERE status = ?"
+        params = (QUEUED, RUNNING)
+        if owner is not None:
+            sql += " AND owner = ?"
+            params += (owner,)
+        with self._lock:
+            return self._conn.execute(sql, params).rowcount
+
+    def payload(self, job_id):
+        rows = self._execute("SELECT kind, payload FROM jobs WHERE id = ?", (job_id,))
+        return (rows[0]["kind"], json.loads(rows[0]["payload"])) if rows else (None, None)
+
+    def claim(self, job_id):
+        """Atomically moves a queued job to running; False if another worker got it first."""
+        with self._lock:
+            return self._conn.execute(
+                "UPDATE jobs SET status = ?, started_at = ?, owner = ? WHERE id = ? AND status = ?",
+                (RUNNING, time.time(), os.getpid(), job_id, QUEUED),
+            ).rowcount == 1
+
+    def set_progress(self, job_id, progress):
+        self._execute("UPDATE jobs SET progress = ? WHERE id = ?", (json.dumps(progress), job_id))
+
+    def finish(self, job_id, result=None, error=None, ttl=JOB_RESULT_TTL):
+        now = time.time()
+        self._execute(
+            "UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ?, expires_at = ? WHERE id = ?",
+            (FAILED if error else SUCCEEDED, json.dumps(result, default=to_jsonable) if error is None else None, error, now, now + ttl, job_id),
+        )
+
+    def purge_expired(self):
+        with self._lock:
+            return self._conn.execute("DELETE FROM jobs WHERE expires_at < ?", (time.time(),)).rowcount
+
+    def counts(self):
+        return {row["status"]: row["n"] for row in self._execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status")}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class JobQueue:
+    """
+    Priority queue of job ids served by JOB_WORKERS asyncio workers.
+    Lower priority numbers run first; equal priorities run in submit order.
+
+    Handlers are registered per job kind as
+        async handler(payload, report) -> JSON-serializable result
+    where report(progress_dict) persists progress for status polling.
+    """
+
+    def __init__(self, store=None, workers=JOB_WORKERS, ttl=JOB_RESULT_TTL, sweep_interval=JOB_SWEEP_INTERVAL,
+                 recover=JOB_RECOVER):
+        self._store = store
+        self.recover = recover
+        self.workers = workers
+        self.ttl = ttl
+        self.sweep_interval = sweep_interval
+        self.handlers = {}
+        self._queue = None
+        self._tasks = []
+        self._seq = itertools.count()
+
+    @property
+    def store(self):
+        # Opened lazily so importing the app does not touch the filesystem
+        if self._store is None:
+            self._store = JobStore()
+        return self._store
+
+    def register(self, kind):
+        def decorator(handler):
+            self.handlers[kind] = handler
+            return handler
+        return decorator
+
+    async def start(self):
+        if self._tasks:
+            return
+        self._queue = asyncio.PriorityQueue()
+        if self.recover:
+            self.store.requeue_interrupted()
+        for row in self.store.pending():
+            self._queue.put_nowait((row["priority"], next(self._seq), row["id"]))
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        self._tasks.append(asyncio.create_task(self._sweeper()))
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def _check_submit(self, kind):
+        if kind not in self.handlers:
+            raise ValueError(f"Unknown job kind: {kind}")
+        if self._queue is None:
+            raise RuntimeError("Job queue is not running.")
+
+    def submit(self, kind, payload, priority=5):
+        self._check_submit(kind)
+        job_id = self.store.create(kind, payload, priority)
+        self._queue.put_nowait((priority, next(self._seq), job_id))
+        return job_id
+
+    async def asubmit(self, kind, payload, priority=5):
+        """submit() for async handlers: the SQLite insert runs in a thread, off the event loop."""
+        self._check_submit(kind)
+        job_id = await asyncio.to_thread(self.store.create, kind, payload, priority)
+        self._queue.put_nowait((priority, next(self._seq), job_id))
+        return job_id
+
+    def status(self, job_id):
+        return self.store.get(job_id)
+
+    def result(self, job_id):
+        return self.store.get(job_id, with_result=True)
+
+    def stats(self):
+        return {
+            "workers": self.workers,
+            "queued_in_memory": self._queue.qsize() if self._queue else 0,
+            "jobs": self.store.counts(),
+        }
+
+    async def _worker(self):
+        while True:
+            _, _, job_id = await self._queue.get()
+            try:
+                await self._run(job_id)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job_id):
+        # Store calls that may wait on the connection lock run in a thread
+        kind, payload = await asyncio.to_thread(self.store.payload, job_id)
+        if kind is None or not await asyncio.to_thread(self.store.claim, job_id):
+            return
+
+        def report(progress):
+            self.store.set_progress(job_id, progress)
+
+        try:
+            result = await self.handlers[kind](payload, report)
+        except asyncio.CancelledError:
+            raise  # left as "running"; re-queued on next start
+        except Exception as e:
+            await asyncio.to_thread(self.store.finish, job_id, error=str(e), ttl=self.ttl)
+        else:
+            await asyncio.to_thread(self.store.finish, job_id, result=result, ttl=self.ttl)
+
+    async def _sweeper(self):
+        while True:
+            await asyncio.sleep(self.sweep_interval)
+            await asyncio.to_thread(self.store.purge_expired)
+
+
+# Shared queue used by the API
+job_queue = JobQueue()
@@ -0,0 +1,90 @@
+"""
+core/models.py
+--------------
+Slotted domain model for agent outputs.
+
+Lessons, questions, scores and stage results are slotted dataclasses rather
+than one dict each: no per-instance __dict__, and field names stored once on
+the class. Timestamps are kept as datetime objects and only formatted when a
+payload is serialized; all items produced by one agent call share a single
+timestamp. Topic strings are the interned ones from core.syllabus, so
+every model refers to the same string objects.
+
+Serializers reach the fields through to_dict() (to_jsonable is the `default`
+hook for both orjson and stdlib json): a flat dict built straight from the
+slots, whose values (strings, numbers, the shared datetime) are passed
+through, not copied. orjson's generic dataclass path is several times slower
+on slotted classes, so api/responses.py routes them through the hook too.
+Values read back from JSON (disk cache, job results, search index records)
+are rebuilt with revive(); a timestamp read back stays its ISO string.
+
+Instances may be shared through the caches and must be treated as read-only.
+The scoring rubric lives in core.scoring.Rubric, rubric templates in
+core.rubrics.RubricTemplate.
+"""
+
+from dataclasses import dataclass
+from datetime import datetime
+
+
+@dataclass(slots=True)
+class Lesson:
+    topic: str
+    summary: str
+    created_at: datetime
+
+    def to_dict(self):
+        return {"topic": self.topic, "summary": self.summary, "created_at": self.created_at}
+
+
+@dataclass(slots=True)
+class Question:
+    topic: str
+    question: str
+    marks: int = 10
+    difficulty: str = "medium"
+
+    def to_dict(self):
+        return {"topic": self.topic, "question": self.question, "marks": self.marks, "difficulty": self.difficulty}
+
+
+@dataclass(slots=True)
+class Score:
+    student_id: str
+    score: float
+    grade: str
+
+    def to_dict(self):
+        return {"student_id": self.student_id, "score": self.score, "grade": self.grade}
+
+
+@dataclass(slots=True)
+class StageResult:
+    stage: str
+    output: object
+    timestamp: datetime
+    agent: str = None
+
+    def to_dict(self):
+        return {"stage": self.stage, "agent": self.agent, "output": self.output, "timestamp": self.timestamp}
+
+
+MODELS = (Lesson, Question, Score, StageResult)
+
+
+def to_jsonable(value):
+    """json.dumps default hook: models become dicts (one level), datetimes ISO strings."""
+    if isinstance(value, MODELS):
+        return value.to_dict()
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def revive(cls, value):
+    """A model instance from itself or from its dict form (e.g. read back from a cache)."""
+    return value if isinstance(value, cls) else cls(**value)
+
+
+def revive_list(cls, values):
+    return [revive(cls, v) for v in values]
@@ -0,0 +1,228 @@
+"""
+core/rubrics.py
+---------------
+Rubric registry: immutable, versioned rubric templates referenced by id.
+
+A template is a named, ordered set of criteria with a description and a
+weight each. Its id is derived from a SHA-256 of its canonical JSON form, so
+the same rubric has the same id in every worker and across restarts, and
+registering it again returns the interned instance. Registering different
+criteria under an existing name creates the next version of that name.
+
+Templates persist in SQLite (RUBRIC_DB_PATH) and are loaded on first use.
+Weights are stored normalized, and each template's scoring Rubric (criterion
+tuple + float32 weight vector) is compiled once, so grading against a rubric
+id does not re-parse or re-validate weights.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import NamedTuple
+
+from core.scoring import Rubric
+
+RUBRIC_DB_PATH = os.getenv("RUBRIC_DB_PATH", "data/rubrics.sqlite3")
+RUBRIC_ID_LENGTH = 16  # hex digits of the content hash used as the id
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS rubrics (
+    id         TEXT PRIMARY KEY,
+    name       TEXT NOT NULL,
+    version    INTEGER NOT NULL,
+    digest     TEXT NOT NULL,
+    body       TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    UNIQUE (name, version)
+)
+"""
+_SELECT = "SELECT id, name, version, digest, body, created_at FROM rubrics"
+
+
+class UnknownRubric(KeyError):
+    """Raised when a rubric id is not in the registry."""
+
+
+class RubricTemplate(NamedTuple):
+    id: str
+    name: str
+    version: int
+    digest: str
+    criteria: tuple      # criterion names, in order
+    descriptions: tuple  # one per criterion
+    weights: tuple       # normalized, one per criterion
+    created_at: float
+
+    def ref(self):
+        """Compact reference embedded in responses instead of the template."""
+        return {"id": self.id, "name": self.name, "version": self.version, "href": f"/rubric/templates/{self.id}"}
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "name": self.name,
+            "version": self.version,
+            "digest": self.digest,
+            "criteria": [
+                {"name": c, "description": d, "weight": w}
+                for c, d, w in zip(self.criteria, self.descriptions, self.weights)
+            ],
+            "created_at": self.created_at,
+        }
+
+
+def _canonical(name, criteria, descriptions, weights):
+    return json.dumps(
+        {"name": name, "criteria": [[c, d, w] for c, d, w in zip(criteria, descriptions, weights)]},
+        ensure_ascii=False, separators=(",", ":"),
+    )
+
+
+class RubricRegistry:
+    """
+    Process-wide view of the rubric table; one connection guarded by a lock,
+    reopened after a fork. Rows written by other workers are picked up on lookup.
+    """
+
+    def __init__(self, path=RUBRIC_DB_PATH):
+        self.path = path
+        self._conn = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self._by_id = {}
+        self._latest = {}    # name -> newest template
+        self._compiled = {}  # id -> scoring Rubric
+
+    def _connection(self):
+        if self._conn is None or self._pid != os.getpid():
+            if self.path != ":memory:":
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(_SCHEMA)
+            self._conn, self._pid = conn, os.getpid()
+            self._by_id.clear()
+            self._latest.clear()
+            self._load(conn.execute(_SELECT))
+        return self._conn
+
+    def _load(self, rows):
+        for rubric_id, name, version, digest, body, created_at in rows:
+            criteria = json.loads(body)["criteria"]
+            template = RubricTemplate(
+                rubric_id, name, version, digest,
+                tuple(c for c, _, _ in criteria), tuple(d for _, d, _ in criteria),
+                tuple(w for _, _, w in criteria), created_at,
+            )
+            self._by_id[rubric_id] = template
+            latest = self._latest.get(name)
+            if latest is None or latest.version < version:
+                self._latest[name] = template
+
+    # -------------------------
+    # 🔹 Registration
+    # -------------------------
+    def register(self, name, criteria, weights=None):
+        """
+        Interns a template. criteria maps criterion names to descriptions (in
+        order); weights maps them to non-negative weights (equal when None).
+        Returns the existing template when this exact rubric is registered.
+        """
+        if not isinstance(criteria, dict) or not criteria:
+            raise ValueError("A rubric needs at least one criterion, as {name: description}.")
+        names = tuple(str(c).strip() for c in criteria)
+        if weights is None:
+            weights = dict.fromkeys(names, 1.0)
+        if not isinstance(weights, dict) or {str(c).strip() for c in weights} != set(names):
+            raise ValueError("Rubric weights must give one weight per criterion.")
+        weights = {str(c).strip(): w for c, w in weights.items()}
+        normalized = Rubric({c: weights[c] for c in names}).weights
+        values = tuple(round(float(w), 6) for w in normalized)
+        descriptions = tuple(str(d) for d in criteria.values())
+
+        body = _canonical(name, names, descriptions, values)
+        digest = hashlib.sha256(body.encode("utf-8")).hexdigest()
+        rubric_id = digest[:RUBRIC_ID_LENGTH]
+        with self._lock:
+            conn = self._connection()
+            while rubric_id not in self._by_id:
+                version = (self._latest[name].version + 1) if name in self._latest else 1
+                row = (rubric_id, name, version, digest, body, time.time())
+                try:
+                    conn.execute(
+                        "INSERT INTO rubrics (id, name, version, digest, body, created_at) VALUES (?, ?, ?, ?, ?, ?)", row
+                    )
+                    self._load([row])
+                except sqlite3.IntegrityError:
+                    # Another worker registered this rubric or took the version; catch up and retry
+                    self._load(conn.execute(
+                        _SELECT + " WHERE name = ? OR id = ?",
+                        (name, rubric_id),
+                    ))
+            return self._by_id[rubric_id]
+
+    # -------------------------
+    # 🔹 Lookup
+    # -------------------------
+    def get(self, rubric_id):
+        with self._lock:
+            conn = self._connection()
+            template = self._by_id.get(rubric_id)
+            if template is None:
+                self._load(conn.execute(
+                    _SELECT + " WHERE id = ?", (rubric_id,)
+                ))
+                template = self._by_id.get(rubric_id)
+        if template is None:
+            raise UnknownRubric(rubric_id)
+        return template
+
+    def latest(self, name):
+        with self._lock:
+            conn = self._connection()
+            self._load(conn.execute(
+                _SELECT + " WHERE name = ? AND version > ?",
+                (name, self._latest[name].version if name in self._latest else 0),
+            ))
+            return self._latest.get(name)
+
+    def templates(self, name=None):
+        with self._lock:
+            conn = self._connection()
+            self._load(conn.execute(_SELECT + " WHERE name = ?", (name,)) if name else conn.execute(_SELECT))
+            found = [t for t in self._by_id.values() if name is None or t.name == name]
+        return sorted(found, key=lambda t: (t.name, t.version))
+
+    def compiled(self, rubric_id):
+        """The scoring Rubric for a template, compiled once per process."""
+        rubric = self._compiled.get(rubric_id)
+        if rubric is None:
+            template = self.get(rubric_id)
+            rubric = Rubric(dict(zip(template.criteria, template.weights)))
+            self._compiled[rubric_id] = rubric
+        return rubric
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None and self._pid == os.getpid():
+                self._conn.close()
+            self._conn = None
+
+
+# Global registry
+rubric_registry = RubricRegistry()
+
+
+def scoring_rubric(weights=None, rubric_id=None):
+    """
+    Scoring Rubric from explicit weights or a registered template id
+    (raises UnknownRubric for an unknown id).
+    """
+    if rubric_id is None:
+        return Rubric(weights)
+    if weights is not None:
+        raise ValueError("Pass either weights or rubric_id, not both.")
+    return rubric_registry.compiled(rubric_id)
@@ -0,0 +1,302 @@
+"""
+core/scoring.py
+---------------
+Vectorized rubric scoring.
+
+Answers are held as a dense float32 tensor of shape
+(students, questions, criteria) with an "answered" mask. Grading a whole
+cohort is one matrix product against the rubric weights followed by one
+against the question weights — no per-student or per-answer Python loops.
+
+Answer files are CSV (header row) or NDJSON, one answer per row:
+
+    student_id,question_id,knowledge,clarity,creativity
+    s001,q1,8,7,9
+
+NDJSON rows may nest criterion marks as {"scores": {"knowledge": 8, ...}}.
+Criterion marks run from 0 to max_score; unanswered questions score 0.
+
+The tensor grows with students x questions, not with rows, so a sparse file
+(few answers per student) is refused past SCORING_MAX_CELLS; such files go
+through the row-wise streaming path instead (core/ingestion.py).
+"""
+
+import csv
+import io
+import json
+import os
+
+import numpy as np
+
+from core.models import Score
+
+SCORE_MAX = float(os.getenv("SCORE_MAX", "10"))
+SCORING_MAX_ROWS = int(os.getenv("SCORING_MAX_ROWS", "10000000"))
+# Largest students x questions x criteria tensor built for one file (float32: 4 bytes per cell)
+SCORING_MAX_CELLS = int(os.getenv("SCORING_MAX_CELLS", "50000000"))
+
+# Weights used by the workflow's rubric design stage
+DEFAULT_WEIGHTS = {"knowledge": 0.4, "clarity": 0.3, "creativity": 0.3}
+
+GRADE_BANDS = ((90, "A"), (80, "B"), (70, "C"), (60, "D"), (0, "F"))
+
+ID_COLUMNS = ("student_id", "question_id")
+
+
+class Rubric:
+    """Criterion names with weights normalized to sum to 1."""
+
+    __slots__ = ("criteria", "weights")
+
+    def __init__(self, weights=None):
+        if weights is not None and not isinstance(weights, dict):
+            raise ValueError("Rubric weights must map criterion names to weights.")
+        weights = dict(weights or DEFAULT_WEIGHTS)
+        if not weights:
+            raise ValueError("A rubric needs at least one criterion.")
+        self.criteria = tuple(str(c).strip().lower() for c in weights)
+        values = np.asarray(list(weights.values()), dtype=np.float64)
+        if (values < 0).any() or values.sum() <= 0:
+            raise ValueError("Rubric weights must be non-negative and not all zero.")
+        self.weights = (values / values.sum()).astype(np.float32)
+
+    def to_dict(self):
+        return {c: round(float(w), 6) for c, w in zip(self.criteria, self.weights)}
+
+
+def _factorize(ids):
+    """Returns (distinct ids in first-seen order, int index per input id)."""
+    index = {}
+    codes = np.fromiter((index.setdefault(str(i), len(index)) for i in ids), dtype=np.int64, count=len(ids))
+    return list(index), codes
+
+
+class AnswerSheet:
+    """
+    Dense answer tensor for one cohort.
+
+    students   student ids (row order of scores)
+    questions  question ids (column order of scores)
+    criteria   criterion names (last axis of scores)
+    scores     float32 array (students, questions, criteria)
+    answered   bool array (students, questions)
+    """
+
+    __slots__ = ("students", "questions", "criteria", "scores", "answered")
+
+    def __init__(self, students, questions, criteria, scores, answered):
+        self.students = students
+        self.questions = questions
+        self.criteria = tuple(criteria)
+        self.scores = scores
+        self.answered = answered
+
+    @property
+    def shape(self):
+        return self.scores.shape
+
+    @classmethod
+    def from_columns(cls, student_ids, question_ids, marks, criteria):
+        """
+        Builds the tensor from per-answer columns: two id sequences and a
+        (rows, criteria) mark matrix. Ids are mapped to dense indices (in first-seen
+        order) and the marks scattered in one step; a repeated (student, question) pair keeps
+        its last row. Raises ValueError past SCORING_MAX_CELLS tensor cells.
+        """
+        students, s_idx = _factorize(student_ids)
+        questions, q_idx = _factorize(question_ids)
+        cells = len(students) * len(questions) * len(criteria)
+        if cells > SCORING_MAX_CELLS:
+            raise ValueError(
+                f"{len(students)} students x {len(questions)} questions x {len(criteria)} criteria exceeds "
+                f"{SCORING_MAX_CELLS} answer cells; upload sparse files to /evaluate/ingest instead."
+            )
+        marks = np.asarray(marks, dtype=np.float32).reshape(len(s_idx), len(criteria))
+
+        scores = np.zeros((len(students), len(questions), len(criteria)), dtype=np.float32)
+        answered = np.zeros((len(students), len(questions)), dtype=bool)
+        scores[s_idx, q_idx] = marks
+        answered[s_idx, q_idx] = True
+        return cls(students, questions, criteria, scores, answered)
+
+
+# -------------------------
+# 🔹 Parsing
+# -------------------------
+def _marks_column(values, name):
+    try:
+        column = np.asarray(values, dtype=np.float32)
+    except ValueError:
+        raise ValueError(f"Criterion '{name}' contains non-numeric marks.") from None
+    if np.isnan(column).any():
+        raise ValueError(f"Criterion '{name}' contains empty marks.")
+    return column
+
+
+def _from_csv(text, criteria):
+    reader = csv.reader(io.StringIO(text))
+    header = [h.strip().lower() for h in next(reader, [])]
+    missing = [c for c in ID_COLUMNS + criteria if c not in header]
+    if missing:
+        raise ValueError(f"CSV header is missing columns: {', '.join(missing)}")
+    rows = [row for row in reader if row]
+    if len(rows) > SCORING_MAX_ROWS:
+        raise ValueError(f"Answer file exceeds {SCORING_MAX_ROWS} rows.")
+    if any(len(row) != len(header) for row in rows):
+        raise ValueError("Every CSV row must have as many fields as the header.")
+    columns = list(zip(*rows)) if rows else [()] * len(header)
+    col = {name: columns[i] for i, name in enumerate(header)}
+    marks = [_marks_column(col[c], c) for c in criteria]
+    return col["student_id"], col["question_id"], marks
+
+
+def _from_ndjson(text, criteria):
+    student_ids, question_ids = [], []
+    marks = [[] for _ in criteria]
+    for n, line in enumerate(text.splitlines(), 1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Malformed NDJSON on line {n}: {e}") from None
+        if not isinstance(record, dict) or "student_id" not in record or "question_id" not in record:
+            raise ValueError(f"Line {n} needs student_id and question_id.")
+        scores = record.get("scores", record)
+        try:
+            for column, c in zip(marks, criteria):
+                column.append(scores[c])
+        except (KeyError, TypeError):
+            raise ValueError(f"Line {n} is missing marks for: {', '.join(criteria)}") from None
+        student_ids.append(record["student_id"])
+        question_ids.append(record["question_id"])
+        if len(student_ids) > SCORING_MAX_ROWS:
+            raise ValueError(f"Answer file exceeds {SCORING_MAX_ROWS} rows.")
+    return student_ids, question_ids, [_marks_column(m, c) for m, c in zip(marks, criteria)]
+
+
+def parse_answers(body: bytes, criteria, fmt="csv"):
+    """
+    Parses a CSV or NDJSON answer upload into an AnswerSheet over the given
+    criteria (extra columns are ignored).
+    """
+    try:
+        text = body.decode("utf-8-sig")
+    except UnicodeDecodeError as e:
+        raise ValueError(f"Answer file is not UTF-8: {e}") from None
+    criteria = tuple(criteria)
+    parse = _from_ndjson if fmt == "ndjson" else _from_csv
+    student_ids, question_ids, marks = parse(text, criteria)
+    if not len(student_ids):
+        raise ValueError("Answer file contains no answers.")
+    return AnswerSheet.from_columns(student_ids, question_ids, np.stack(marks, axis=1), criteria)
+
+
+def answer_format(filename: str = "", content_type: str = ""):
+    """Returns "csv" or "ndjson" from an upload's filename or content type."""
+    name = (filename or "").lower()
+    if name.endswith((".ndjson", ".jsonl")) or "ndjson" in content_type or "jsonlines" in content_type:
+        return "ndjson"
+    if name.endswith(".csv") or "csv" in content_type or not name:
+        return "csv"
+    raise ValueError("Unsupported answer file. Upload .csv or .ndjson")
+
+
+# -------------------------
+# 🔹 Grading
+# -------------------------
+class GradeResult:
+    """
+    question_scores  float32 (students, questions), each in [0, 1]
+    totals           float32 (students,), percentage in [0, 100]
+    """
+
+    __slots__ = ("sheet", "rubric", "max_score", "question_weights", "question_scores", "totals")
+
+    def __init__(self, sheet, rubric, max_score, question_weights, question_scores, totals):
+        self.sheet = sheet
+        self.rubric = rubric
+        self.max_score = max_score
+        self.question_weights = question_weights
+        self.question_scores = question_scores
+        self.totals = totals
+
+    def grades(self):
+        return grade_letters(self.totals)
+
+    def summary(self):
+        sheet = self.sheet
+        per_criterion = sheet.scores.sum(axis=(0, 1)) / max(int(sheet.answered.sum()), 1) / self.max_score
+        return {
+            "students": len(sheet.students),
+            "questions": len(sheet.questions),
+            "answers": int(sheet.answered.sum()),
+            **total_stats(self.totals),
+            "criterion_means": {c: round(float(v), 4) for c, v in zip(sheet.criteria, per_criterion)},
+            "question_means": {
+                q: round(float(v), 4) for q, v in zip(sheet.questions, self.question_scores.mean(axis=0))
+            },
+        }
+
+    def student_scores(self):
+        grades = self.grades().tolist()
+        return [Score(s, round(t, 2), g) for s, t, g in zip(self.sheet.students, self.totals.tolist(), grades)]
+
+
+def grade_letters(totals):
+    """Letter grade per total percentage (GRADE_BANDS)."""
+    bounds = np.array([b for b, _ in GRADE_BANDS[:-1]][::-1], dtype=np.float32)
+    letters = np.array([g for _, g in GRADE_BANDS][::-1])
+    return letters[np.searchsorted(bounds, totals, side="right")]
+
+
+def total_stats(totals):
+    """Distribution of student totals: mean, spread, percentiles and grade counts."""
+    grades, counts = np.unique(grade_letters(totals), return_counts=True)
+    return {
+        "mean": round(float(totals.mean()), 3),
+        "std": round(float(totals.std()), 3),
+        "min": round(float(totals.min()), 3),
+        "max": round(float(totals.max()), 3),
+        "percentiles": {
+            f"p{p}": round(float(v), 3)
+            for p, v in zip((25, 50, 75, 90), np.percentile(totals, (25, 50, 75, 90)))
+        },
+        "grade_distribution": dict(zip(grades.tolist(), counts.tolist())),
+    }
+
+
+def answer_scores(marks, rubric, max_score=SCORE_MAX):
+    """
+    Question scores (percentages) for a batch of answers: marks is a
+    (rows, criteria) array in rubric criterion order.
+    """
+    return np.clip(marks @ rubric.weights / np.float32(max_score), 0.0, 1.0) * np.float32(100.0)
+
+
+def grade(sheet, rubric=None, question_weights=None, max_score=SCORE_MAX):
+    """
+    Grades every answer in one pass:
+        question_scores = (scores @ rubric weights) / max_score   (S, Q)
+        totals          = question_scores @ question weights * 100 (S,)
+    question_weights maps question id -> marks (default: equal weight).
+    """
+    rubric = rubric or Rubric()
+    if tuple(rubric.criteria) != tuple(sheet.criteria):
+        raise ValueError("Answer sheet criteria do not match the rubric.")
+    if max_score <= 0:
+        raise ValueError("max_score must be positive.")
+
+    qw = np.ones(len(sheet.questions), dtype=np.float32)
+    if question_weights:
+        if not isinstance(question_weights, dict):
+            raise ValueError("Question weights must map question ids to marks.")
+        lookup = {str(k): float(v) for k, v in question_weights.items()}
+        qw = np.asarray([lookup.get(q, 1.0) for q in sheet.questions], dtype=np.float32)
+        if (qw < 0).any() or qw.sum() <= 0:
+            raise ValueError("Question weights must be non-negative and not all zero.")
+    qw = qw / qw.sum()
+
+    question_scores = np.clip(sheet.scores @ rubric.weights / np.float32(max_score), 0.0, 1.0)
+    totals = (question_scores @ qw) * np.float32(100.0)
+    return GradeResult(sheet, rubric, max_score, dict(zip(sheet.questions, qw.tolist())), question_scores, totals)
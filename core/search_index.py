@@ -0,0 +1,523 @@
+"""
+core/search_index.py
+--------------------
+Persistent inverted index over uploaded syllabi, generated lessons and exam
+questions.
+
+Documents are added to an in-memory buffer and flushed as immutable segments
+once INDEX_FLUSH_DOCS accumulate (or on flush()). Each segment directory
+holds plain .npy arrays opened with mmap, so queries page in only the posting
+ranges they touch:
+
+    terms.npy         sorted fixed-width byte terms (binary searched)
+    term_offsets.npy  term i owns postings [term_offsets[i], term_offsets[i+1])
+    docs.npy          global doc id per posting (ascending within a term)
+    pos_offsets.npy   posting j owns positions [pos_offsets[j], pos_offsets[j+1])
+    positions.npy     token positions, for phrase queries
+    records.ndjson    one JSON record per doc, located via record_offsets.npy
+
+manifest.json lists the live segments and is replaced atomically. When more
+than INDEX_MAX_SEGMENTS exist they are compacted into one.
+
+Worker processes may share one index directory. Flushes take an exclusive
+flock on index.lock, merge the current manifest and renumber their buffered
+docs past its next_id; readers notice a replaced manifest with one stat() and
+pick up the new segments. Buffered docs are only visible to their own
+process until flushed.
+
+Besides text tokens every doc carries exact-match tokens for its kind, its
+topics and its dedup key, so topic lookups and "already indexed?" checks are
+ordinary posting lookups.
+"""
+
+import bisect
+import hashlib
+import json
+import math
+import mmap
+import os
+import re
+import shutil
+import threading
+from contextlib import contextmanager
+
+import numpy as np
+
+from core.models import to_jsonable
+
+try:
+    import fcntl
+except ImportError:  # non-POSIX: single-process use only
+    fcntl = None
+
+INDEX_DIR = os.getenv("INDEX_DIR", "data/index")
+INDEX_FLUSH_DOCS = int(os.getenv("INDEX_FLUSH_DOCS", "5000"))
+INDEX_MAX_SEGMENTS = int(os.getenv("INDEX_MAX_SEGMENTS", "8"))
+
+TERM_BYTES = 40
+_TERM_DTYPE = f"S{TERM_BYTES}"
+_TOKEN = re.compile(r"\w+")
+_PHRASE = re.compile(r'"([^"]+)"')
+
+
+def tokenize(text):
+    return [t.casefold().encode("utf-8")[:TERM_BYTES] for t in _TOKEN.findall(text or "")]
+
+
+def _field_token(field, value):
+    digest = hashlib.sha1(value.encode("utf-8")).hexdigest()[:16]
+    return f"\x01{field}:{digest}".encode()
+
+
+def kind_token(kind):
+    return f"\x01kind:{kind}".encode()[:TERM_BYTES]
+
+
+def topic_token(topic):
+    return _field_token("topic", topic.strip().casefold())
+
+
+def key_token(key):
+    return _field_token("key", key)
+
+
+# -------------------------
+# 🔹 Segments
+# -------------------------
+def _write_segment(path, terms, docs, lengths, positions, records):
+    """
+    Writes one segment from per-posting arrays (term, doc, position count)
+    plus the flat positions array, in posting order. Postings of one term
+    must already be in ascending doc order; a stable sort keeps it that way.
+    """
+    order = np.argsort(terms, kind="stable")
+    sorted_terms = terms[order]
+    unique_terms, first = np.unique(sorted_terms, return_index=True)
+    term_offsets = np.append(first, len(sorted_terms)).astype(np.int64)
+
+    starts = (np.cumsum(lengths) - lengths)[order]
+    sorted_lengths = lengths[order]
+    pos_offsets = np.concatenate([[0], np.cumsum(sorted_lengths)]).astype(np.int64)
+    gather = np.repeat(starts - pos_offsets[:-1], sorted_lengths) + np.arange(pos_offsets[-1])
+
+    tmp = path + ".tmp"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+    np.save(os.path.join(tmp, "terms.npy"), unique_terms.astype(_TERM_DTYPE))
+    np.save(os.path.join(tmp, "term_offsets.npy"), term_offsets)
+    np.save(os.path.join(tmp, "docs.npy"), docs[order].astype(np.int64))
+    np.save(os.path.join(tmp, "pos_offsets.npy"), pos_offsets)
+    np.save(os.path.join(tmp, "positions.npy"), positions[gather].astype(np.int32))
+    record_offsets = [0]
+    with open(os.path.join(tmp, "records.ndjson"), "wb") as f:
+        for record in records:
+            f.write(record)
+            record_offsets.append(record_offsets[-1] + len(record))
+    np.save(os.path.join(tmp, "record_offsets.npy"), np.asarray(record_offsets, dtype=np.int64))
+    os.replace(tmp, path)
+
+
+class Segment:
+    """Read-only, memory-mapped view of one segment directory."""
+
+    def __init__(self, path, base, count):
+        self.path = path
+        self.base = base
+        self.count = count
+        load = lambda name: np.load(os.path.join(path, name + ".npy"), mmap_mode="r")
+        self.terms = load("terms")
+        self.term_offsets = load("term_offsets")
+        self.docs = load("docs")
+        self.pos_offsets = load("pos_offsets")
+        self.positions = load("positions")
+        self.record_offsets = load("record_offsets")
+        with open(os.path.join(path, "records.ndjson"), "rb") as f:
+            self._records = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def span(self, term):
+        i = int(np.searchsorted(self.terms, term))
+        if i < len(self.terms) and self.terms[i] == term:
+            return int(self.term_offsets[i]), int(self.term_offsets[i + 1])
+        return None
+
+    def postings(self, term):
+        span = self.span(term)
+        if span is None:
+            return None
+        a, b = span
+        return np.asarray(self.docs[a:b]), np.diff(np.asarray(self.pos_offsets[a:b + 1]))
+
+    def positions_of(self, term, doc_id):
+        span = self.span(term)
+        if span is None:
+            return ()
+        a, b = span
+        j = a + int(np.searchsorted(self.docs[a:b], doc_id))
+        if j >= b or self.docs[j] != doc_id:
+            return ()
+        return self.positions[self.pos_offsets[j]:self.pos_offsets[j + 1]].tolist()
+
+    def record(self, doc_id):
+        i = doc_id - self.base
+        return json.loads(self._records[self.record_offsets[i]:self.record_offsets[i + 1]])
+
+    def arrays(self):
+        """Per-posting arrays in the layout _write_segment expects."""
+        terms = np.repeat(np.asarray(self.terms), np.diff(np.asarray(self.term_offsets)))
+        lengths = np.diff(np.asarray(self.pos_offsets))
+        return terms, np.asarray(self.docs), lengths, np.asarray(self.positions)
+
+    def raw_records(self):
+        offsets = np.asarray(self.record_offsets)
+        return [self._records[offsets[i]:offsets[i + 1]] for i in range(self.count)]
+
+    def close(self):
+        self._records.close()
+
+
+# -------------------------
+# 🔹 Index
+# -------------------------
+class SearchIndex:
+    """
+    Incrementally updated inverted index. Safe to share across threads;
+    opened lazily so importing the app does not touch the filesystem.
+    """
+
+    def __init__(self, path=INDEX_DIR, flush_docs=INDEX_FLUSH_DOCS, max_segments=INDEX_MAX_SEGMENTS):
+        self.path = path
+        self.flush_docs = flush_docs
+        self.max_segments = max_segments
+        self._lock = threading.RLock()
+        self._segments = None
+        self._next_id = 0
+        self._seq = 0
+        self._mem_postings = {}  # term -> ([doc ids], [positions lists])
+        self._mem_records = {}   # doc id -> record dict
+        self._manifest_sig = None
+
+    def _open(self):
+        """Opens the index on first use, then picks up segments flushed by other processes."""
+        if self._segments is None:
+            os.makedirs(self.path, exist_ok=True)
+            self._segments = []
+        if self._manifest_signature() != self._manifest_sig:
+            with self._file_lock(exclusive=False):
+                self._load_manifest()
+
+    @contextmanager
+    def _file_lock(self, exclusive):
+        if fcntl is None:
+            yield
+            return
+        with open(os.path.join(self.path, "index.lock"), "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _manifest_signature(self):
+        try:
+            st = os.stat(os.path.join(self.path, "manifest.json"))
+        except FileNotFoundError:
+            return None
+        return st.st_ino, st.st_mtime_ns, st.st_size
+
+    def _load_manifest(self):
+        """Syncs the open segments with manifest.json; returns the manifest's next doc id."""
+        self._manifest_sig = self._manifest_signature()
+        manifest = {"segments": [], "next_id": 0, "seq": 0}
+        if self._manifest_sig is not None:
+            with open(os.path.join(self.path, "manifest.json")) as f:
+                manifest = json.load(f)
+        current = {os.path.basename(s.path): s for s in self._segments}
+        self._segments = [
+            current.pop(s["name"], None) or Segment(os.path.join(self.path, s["name"]), s["base"], s["count"])
+            for s in manifest["segments"]
+        ]
+        for segment in current.values():
+            segment.close()
+        self._seq = manifest["seq"]
+        if not self._mem_records:
+            self._next_id = manifest["next_id"]
+        return manifest["next_id"]
+
+    def _renumber(self, delta):
+        """Shifts buffered doc ids past docs another process flushed meanwhile."""
+        self._mem_records = {i + delta: {**r, "id": i + delta} for i, r in self._mem_records.items()}
+        for doc_ids, _ in self._mem_postings.values():
+            doc_ids[:] = [d + delta for d in doc_ids]
+        self._next_id += delta
+
+    def _write_manifest(self):
+        manifest = {
+            "segments": [
+                {"name": os.path.basename(s.path), "base": s.base, "count": s.count} for s in self._segments
+            ],
+            "next_id": self._next_id,
+            "seq": self._seq,
+        }
+        tmp = os.path.join(self.path, "manifest.json.tmp")
+        with open(tmp, "w") as f:
+            json.dump(manifest, f)
+        os.replace(tmp, os.path.join(self.path, "manifest.json"))
+        self._manifest_sig = self._manifest_signature()
+
+    # -------------------------
+    # 🔹 Updates
+    # -------------------------
+    def add(self, kind, text, key=None, topics=(), data=None):
+        """
+        Indexes one document and returns its id, or None when a document with
+        the same key is already indexed.
+        """
+        return self.add_many([{"kind": kind, "text": text, "key": key, "topics": topics, "data": data}])[0]
+
+    def add_many(self, docs):
+        """Indexes several documents under one lock; returns their ids (None = duplicate)."""
+        ids = []
+        with self._lock:
+            self._open()
+            for doc in docs:
+                key = doc.get("key")
+                if key is not None and self._has(key_token(key)):
+                    ids.append(None)
+                    continue
+                doc_id = self._next_id
+                self._next_id += 1
+                topics = list(doc.get("topics") or ())
+                self._mem_records[doc_id] = {
+                    "id": doc_id, "kind": doc["kind"], "key": key, "topics": topics, "data": doc.get("data"),
+                }
+                positions = {}
+                for pos, term in enumerate(tokenize(doc.get("text", ""))):
+                    positions.setdefault(term, []).append(pos)
+                for term in [kind_token(doc["kind"])] + [topic_token(t) for t in topics] + (
+                    [key_token(key)] if key is not None else []
+                ):
+                    positions.setdefault(term, [0])
+                for term, pos in positions.items():
+                    entry = self._mem_postings.get(term)
+                    if entry is None:
+                        entry = self._mem_postings[term] = ([], [])
+                    entry[0].append(doc_id)
+                    entry[1].append(pos)
+                ids.append(doc_id)
+            if len(self._mem_records) >= self.flush_docs:
+                self._flush()
+        return ids
+
+    def flush(self):
+        with self._lock:
+            self._open()
+            self._flush()
+
+    def _flush(self):
+        if not self._mem_records:
+            return
+        with self._file_lock(exclusive=True):
+            next_id = self._load_manifest()
+            if next_id != min(self._mem_records):
+                self._renumber(next_id - min(self._mem_records))
+            self._write_buffer()
+
+    def _write_buffer(self):
+        terms, docs, lengths, positions = [], [], [], []
+        for term, (doc_ids, pos_lists) in self._mem_postings.items():
+            for doc_id, pos in zip(doc_ids, pos_lists):
+                terms.append(term)
+                docs.append(doc_id)
+                lengths.append(len(pos))
+                positions.extend(pos)
+        base = min(self._mem_records)
+        records = [
+            (json.dumps(self._mem_records[i], separators=(",", ":"), default=to_jsonable) + "\n").encode()
+            for i in range(base, self._next_id)
+        ]
+        self._seq += 1
+        path = os.path.join(self.path, f"seg_{self._seq:06d}")
+        _write_segment(
+            path, np.asarray(terms, dtype=_TERM_DTYPE), np.asarray(docs, dtype=np.int64),
+            np.asarray(lengths, dtype=np.int64), np.asarray(positions, dtype=np.int32), records,
+        )
+        self._segments.append(Segment(path, base, len(records)))
+        self._mem_postings = {}
+        self._mem_records = {}
+        if len(self._segments) > self.max_segments:
+            self._compact()
+        self._write_manifest()
+
+    def _compact(self):
+        """Merges every segment into one; doc ids are unchanged."""
+        old = self._segments
+        parts = [s.arrays() for s in old]
+        lengths = np.concatenate([p[2] for p in parts])
+        records = [r for s in old for r in s.raw_records()]
+        self._seq += 1
+        path = os.path.join(self.path, f"seg_{self._seq:06d}")
+        _write_segment(
+            path,
+            np.concatenate([p[0] for p in parts]),
+            np.concatenate([p[1] for p in parts]),
+            lengths,
+            np.concatenate([p[3] for p in parts]),
+            records,
+        )
+        self._segments = [Segment(path, old[0].base, len(records))]
+        self._write_manifest()
+        for s in old:
+            s.close()
+            shutil.rmtree(s.path, ignore_errors=True)
+
+    # -------------------------
+    # 🔹 Queries
+    # -------------------------
+    def _term_postings(self, term):
+        """(doc ids, term frequencies) across segments and the buffer, ascending by doc id."""
+        docs, tfs = [], []
+        for segment in self._segments:
+            found = segment.postings(term)
+            if found is not None:
+                docs.append(found[0])
+                tfs.append(found[1])
+        entry = self._mem_postings.get(term)
+        if entry is not None:
+            docs.append(np.asarray(entry[0], dtype=np.int64))
+            tfs.append(np.asarray([len(p) for p in entry[1]], dtype=np.int64))
+        if not docs:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        return np.concatenate(docs), np.concatenate(tfs)
+
+    def _has(self, term):
+        return term in self._mem_postings or any(s.span(term) is not None for s in self._segments)
+
+    def _positions(self, term, doc_id):
+        entry = self._mem_postings.get(term)
+        if entry is not None and doc_id in self._mem_records:
+            i = bisect.bisect_left(entry[0], doc_id)
+            return entry[1][i] if i < len(entry[0]) and entry[0][i] == doc_id else ()
+        for segment in self._segments:
+            if segment.base <= doc_id < segment.base + segment.count:
+                return segment.positions_of(term, doc_id)
+        return ()
+
+    def _phrase_postings(self, terms):
+        docs, _ = self._term_postings(terms[0])
+        for term in terms[1:]:
+            docs = np.intersect1d(docs, self._term_postings(term)[0], assume_unique=True)
+        hits, counts = [], []
+        for doc_id in docs.tolist():
+            following = [set(self._positions(t, doc_id)) for t in terms[1:]]
+            n = sum(
+                all(p + i + 1 in following[i] for i in range(len(following)))
+                for p in self._positions(terms[0], doc_id)
+            )
+            if n:
+                hits.append(doc_id)
+                counts.append(n)
+        return np.asarray(hits, dtype=np.int64), np.asarray(counts, dtype=np.int64)
+
+    def _record(self, doc_id):
+        record = self._mem_records.get(doc_id)
+        if record is not None:
+            return record
+        for segment in self._segments:
+            if segment.base <= doc_id < segment.base + segment.count:
+                return segment.record(doc_id)
+        return None
+
+    def search(self, query, kind=None, topic=None, limit=10):
+        """
+        Conjunctive query: every bare term and every "quoted phrase" must
+        match. Results are ranked by tf-idf and returned as doc records.
+        """
+        phrases = [tokenize(p) for p in _PHRASE.findall(query or "")]
+        terms = tokenize(_PHRASE.sub(" ", query or ""))
+        with self._lock:
+            self._open()
+            total = max(len(self), 1)
+            clauses = [self._term_postings(t) for t in dict.fromkeys(terms)]
+            clauses += [self._phrase_postings(p) for p in phrases if p]
+            filters = []
+            if kind is not None:
+                filters.append(self._term_postings(kind_token(kind))[0])
+            if topic is not None:
+                filters.append(self._term_postings(topic_token(topic))[0])
+            if not clauses and not filters:
+                return []
+
+            if clauses:
+                docs = clauses[0][0]
+                scores = clauses[0][1] * math.log(1 + total / max(len(clauses[0][0]), 1))
+                for clause_docs, tf in clauses[1:]:
+                    docs, i, j = np.intersect1d(docs, clause_docs, assume_unique=True, return_indices=True)
+                    scores = scores[i] + tf[j] * math.log(1 + total / max(len(clause_docs), 1))
+            else:
+                docs = filters.pop()
+                scores = docs.astype(np.float64)  # newest first
+            for allowed in filters:
+                keep = np.isin(docs, allowed, assume_unique=True)
+                docs, scores = docs[keep], scores[keep]
+
+            top = np.argsort(-scores, kind="stable")[:limit]
+            results = []
+            for i in top.tolist():
+                record = dict(self._record(int(docs[i])))
+                record["score"] = round(float(scores[i]), 4)
+                results.append(record)
+            return results
+
+    def find_topics(self, topics, kind=None, limit=None):
+        """
+        Maps each topic to the records indexed under it (oldest first),
+        optionally of one kind only and at most limit per topic. Postings are
+        filtered by kind before any record is decoded.
+        """
+        with self._lock:
+            self._open()
+            allowed = self._term_postings(kind_token(kind))[0] if kind is not None else None
+            found = {}
+            for topic in topics:
+                docs = self._term_postings(topic_token(topic))[0]
+                if allowed is not None:
+                    docs = docs[np.isin(docs, allowed, assume_unique=True)]
+                if limit is not None:
+                    docs = docs[:limit]
+                if len(docs):
+                    found[topic] = [self._record(d) for d in docs.tolist()]
+            return found
+
+    def has_key(self, key):
+        with self._lock:
+            self._open()
+            return self._has(key_token(key))
+
+    def __len__(self):
+        return self._next_id
+
+    def stats(self):
+        with self._lock:
+            self._open()
+            disk = sum(
+                os.path.getsize(os.path.join(s.path, name)) for s in self._segments for name in os.listdir(s.path)
+            )
+            return {
+                "documents": len(self),
+                "segments": len(self._segments),
+                "buffered": len(self._mem_records),
+                "disk_bytes": disk,
+            }
+
+    def close(self):
+        with self._lock:
+            if self._segments is None:
+                return
+            self._flush()
+            for segment in self._segments:
+                segment.close()
+            self._segments = None
+
+
+# Shared index used by the agents and the API
+search_index = SearchIndex()
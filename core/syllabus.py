@@ -0,0 +1,82 @@
+"""
+core/syllabus.py
+----------------
+Shared syllabus parsing. A Syllabus is built once per request and handed to
+every agent, so topics are tokenized, normalized and deduplicated a single time
+and all agents work from the same topic list. Topic strings are interned, so
+the models built from them (core/models.py) share one copy per distinct topic.
+"""
+
+import re
+import sys
+import hashlib
+
+# Topics are separated by commas, semicolons or line breaks; the match
+# excludes surrounding whitespace so spans are already trimmed.
+_TOPIC_SPAN = re.compile(r"[^,;\s](?:[^,;\n]*[^,;\s])?")
+
+
+def normalize_topic(raw: str) -> str:
+    """Collapses internal whitespace and strips the ends."""
+    return " ".join(raw.split())
+
+
+class Syllabus:
+    """
+    Parsed syllabus.
+
+    text        raw syllabus text as received
+    topics      normalized, deduplicated topics in first-seen order
+    offsets     (start, end) character span of each topic in text
+    duplicates  topic -> number of extra occurrences dropped (case-insensitive)
+    digest      SHA-256 of text, used as a cache key
+    """
+
+    __slots__ = ("text", "topics", "offsets", "duplicates", "digest")
+
+    def __init__(self, text, topics, offsets, duplicates):
+        self.text = text
+        self.topics = topics
+        self.offsets = offsets
+        self.duplicates = duplicates
+        self.digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    @classmethod
+    def parse(cls, text: str) -> "Syllabus":
+        topics, offsets, duplicates = [], [], {}
+        index = {}
+        for match in _TOPIC_SPAN.finditer(text):
+            topic = sys.intern(normalize_topic(match.group()))
+            key = topic.casefold()
+            first = index.get(key)
+            if first is not None:
+                duplicates[topics[first]] = duplicates.get(topics[first], 0) + 1
+                continue
+            index[key] = len(topics)
+            topics.append(topic)
+            offsets.append(match.span())
+        return cls(text, topics, offsets, duplicates)
+
+    @classmethod
+    def from_topics(cls, topics) -> "Syllabus":
+        """Builds a Syllabus from an already extracted topic list (e.g. an upload)."""
+        return cls.parse(", ".join(topics))
+
+    @classmethod
+    def coerce(cls, value) -> "Syllabus":
+        """Accepts either a Syllabus or raw syllabus text."""
+        return value if isinstance(value, cls) else cls.parse(value)
+
+    def __len__(self):
+        return len(self.topics)
+
+    def __repr__(self):
+        return f"Syllabus(topics={len(self.topics)}, duplicates={sum(self.duplicates.values())})"
+
+    def to_dict(self):
+        return {
+            "topics": self.topics,
+            "offsets": self.offsets,
+            "duplicates": self.duplicates,
+            "digest": self.digest,
+        }
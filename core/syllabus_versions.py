@@ -0,0 +1,267 @@
+"""
+core/syllabus_versions.py
+-------------------------
+Syllabus versioning: every revision of a syllabus (identified by a
+client-chosen syllabus id, e.g. a course code) is stored as its topic list,
+and each new version is diffed against the previous one at the topic level.
+
+A revision only creates a version when its topics differ; edits to
+whitespace or separators parse to the same topics and return the current
+version. The delta classifies topics as
+
+  added      new topics
+  removed    topics no longer in the syllabus
+  changed    (old, new) pairs where a topic was rewritten in place: same
+             place in the sequence and similar text (SYLLABUS_CHANGE_RATIO)
+  unchanged  topics present in both versions (even if moved)
+
+so per-topic outputs need regenerating for added and changed topics only
+(core/incremental.py). Versions persist in SQLite (SYLLABUS_DB_PATH).
+"""
+
+import difflib
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import NamedTuple
+
+SYLLABUS_DB_PATH = os.getenv("SYLLABUS_DB_PATH", "data/syllabi.sqlite3")
+# Minimum difflib ratio (case-insensitive) for a removed and an added topic to count as one rewrite
+SYLLABUS_CHANGE_RATIO = float(os.getenv("SYLLABUS_CHANGE_RATIO", "0.6"))
+# How many added topics past the previous pair a removed topic is compared with
+SYLLABUS_CHANGE_WINDOW = int(os.getenv("SYLLABUS_CHANGE_WINDOW", "8"))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS syllabus_versions (
+    syllabus_id TEXT NOT NULL,
+    version     INTEGER NOT NULL,
+    digest      TEXT NOT NULL,
+    topics      TEXT NOT NULL,
+    delta       TEXT NOT NULL,
+    created_at  REAL NOT NULL,
+    PRIMARY KEY (syllabus_id, version)
+)
+"""
+_SELECT = "SELECT syllabus_id, version, digest, topics, delta, created_at FROM syllabus_versions"
+
+
+class UnknownSyllabus(KeyError):
+    """Raised when a syllabus id (or one of its versions) has not been stored."""
+
+
+class TopicDelta(NamedTuple):
+    added: tuple
+    removed: tuple
+    changed: tuple    # (old topic, new topic) pairs
+    unchanged: int
+
+    def to_dict(self):
+        return {
+            "added": list(self.added),
+            "removed": list(self.removed),
+            "changed": [{"from": old, "to": new} for old, new in self.changed],
+            "unchanged": self.unchanged,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(
+            tuple(data["added"]), tuple(data["removed"]),
+            tuple((c["from"], c["to"]) for c in data["changed"]), data["unchanged"],
+        )
+
+
+class SyllabusVersion(NamedTuple):
+    syllabus_id: str
+    version: int
+    digest: str
+    topics: tuple
+    delta: TopicDelta  # against the previous version (everything added for version 1)
+    created_at: float
+
+    def to_dict(self, topics=False):
+        data = {
+            "syllabus_id": self.syllabus_id,
+            "version": self.version,
+            "digest": self.digest,
+            "topic_count": len(self.topics),
+            "delta": self.delta.to_dict(),
+            "created_at": self.created_at,
+        }
+        if topics:
+            data["topics"] = list(self.topics)
+        return data
+
+
+def topics_digest(topics):
+    return hashlib.sha256(json.dumps(list(topics), ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+def rewrite_pairs(olds, news, ratio=None):
+    """
+    (old, new) pairs out of a removed and an added run at the same place:
+    each old topic takes the most similar of the next SYLLABUS_CHANGE_WINDOW
+    new topics after the previous pair, if their ratio reaches
+    SYLLABUS_CHANGE_RATIO. Unpaired topics are left out.
+    """
+    ratio = SYLLABUS_CHANGE_RATIO if ratio is None else ratio
+    pairs = []
+    start = 0
+    matcher = difflib.SequenceMatcher(autojunk=False)
+    for old_topic in olds:
+        matcher.set_seq2(old_topic.casefold())
+        best, best_ratio = None, ratio
+        for j in range(start, min(start + SYLLABUS_CHANGE_WINDOW, len(news))):
+            matcher.set_seq1(news[j].casefold())
+            if matcher.real_quick_ratio() >= best_ratio and matcher.quick_ratio() >= best_ratio:
+                score = matcher.ratio()
+                if score >= best_ratio:
+                    best, best_ratio = j, score
+        if best is not None:
+            pairs.append((old_topic, news[best]))
+            start = best + 1
+    return pairs
+
+
+def diff_topics(old, new):
+    """
+    Topic-level delta between two topic lists. Topics present in both are
+    unchanged wherever they moved; of the rest, a removed topic and an added
+    one at the same place in the sequence count as one changed topic when
+    their text is similar (rewrite_pairs); otherwise they stay removed / added.
+    """
+    old_set, new_set = set(old), set(new)
+    added = [t for t in new if t not in old_set]
+    removed = [t for t in old if t not in new_set]
+    changed = []
+    matcher = difflib.SequenceMatcher(None, old, new, autojunk=False)
+    for op, i1, i2, j1, j2 in matcher.get_opcodes():
+        if op == "replace":
+            olds = [t for t in old[i1:i2] if t not in new_set]
+            news = [t for t in new[j1:j2] if t not in old_set]
+            changed.extend(rewrite_pairs(olds, news))
+    if changed:
+        rewritten_old = {o for o, _ in changed}
+        rewritten_new = {n for _, n in changed}
+        added = [t for t in added if t not in rewritten_new]
+        removed = [t for t in removed if t not in rewritten_old]
+    return TopicDelta(tuple(added), tuple(removed), tuple(changed), len(new_set & old_set))
+
+
+class SyllabusVersionStore:
+    """
+    Version table shared by every worker; one connection guarded by a lock,
+    reopened after a fork. The newest version per syllabus is kept in memory.
+    """
+
+    def __init__(self, path=SYLLABUS_DB_PATH):
+        self.path = path
+        self._conn = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self._latest = {}  # syllabus id -> newest SyllabusVersion
+
+    def _connection(self):
+        if self._conn is None or self._pid != os.getpid():
+            if self.path != ":memory:":
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(_SCHEMA)
+            self._conn, self._pid = conn, os.getpid()
+            self._latest.clear()
+        return self._conn
+
+    @staticmethod
+    def _row(row):
+        syllabus_id, version, digest, topics, delta, created_at = row
+        return SyllabusVersion(
+            syllabus_id, version, digest, tuple(json.loads(topics)), TopicDelta.from_dict(json.loads(delta)), created_at
+        )
+
+    def _newest(self, conn, syllabus_id):
+        """Latest stored version, re-read when another worker may have added one."""
+        cached = self._latest.get(syllabus_id)
+        row = conn.execute(
+            _SELECT + " WHERE syllabus_id = ? AND version > ? ORDER BY version DESC LIMIT 1",
+            (syllabus_id, cached.version if cached else 0),
+        ).fetchone()
+        if row is not None:
+            cached = self._latest[syllabus_id] = self._row(row)
+        return cached
+
+    # -------------------------
+    # 🔹 Revisions
+    # -------------------------
+    def commit(self, syllabus_id, topics):
+        """
+        Records a revision of syllabus_id. Returns (version, previous): the
+        stored version for these topics and the one it was diffed against
+        (None for a first version). Unchanged topics return the current
+        version as both.
+        """
+        topics = tuple(topics)
+        digest = topics_digest(topics)
+        with self._lock:
+            conn = self._connection()
+            while True:
+                previous = self._newest(conn, syllabus_id)
+                if previous is not None and previous.digest == digest:
+                    return previous, previous
+                delta = diff_topics(previous.topics if previous else (), topics)
+                version = SyllabusVersion(
+                    syllabus_id, previous.version + 1 if previous else 1, digest, topics, delta, time.time()
+                )
+                try:
+                    conn.execute(
+                        "INSERT INTO syllabus_versions (syllabus_id, version, digest, topics, delta, created_at) "
+                        "VALUES (?, ?, ?, ?, ?, ?)",
+                        (syllabus_id, version.version, digest, json.dumps(topics, ensure_ascii=False),
+                         json.dumps(delta.to_dict(), ensure_ascii=False), version.created_at),
+                    )
+                except sqlite3.IntegrityError:
+                    # Another worker stored this version number first; diff against theirs
+                    continue
+                self._latest[syllabus_id] = version
+                return version, previous
+
+    # -------------------------
+    # 🔹 Lookup
+    # -------------------------
+    def latest(self, syllabus_id):
+        with self._lock:
+            version = self._newest(self._connection(), syllabus_id)
+        if version is None:
+            raise UnknownSyllabus(syllabus_id)
+        return version
+
+    def get(self, syllabus_id, version):
+        with self._lock:
+            row = self._connection().execute(
+                _SELECT + " WHERE syllabus_id = ? AND version = ?", (syllabus_id, version)
+            ).fetchone()
+        if row is None:
+            raise UnknownSyllabus(f"{syllabus_id} v{version}")
+        return self._row(row)
+
+    def versions(self, syllabus_id):
+        with self._lock:
+            rows = self._connection().execute(
+                _SELECT + " WHERE syllabus_id = ? ORDER BY version", (syllabus_id,)
+            ).fetchall()
+        if not rows:
+            raise UnknownSyllabus(syllabus_id)
+        return [self._row(row) for row in rows]
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None and self._pid == os.getpid():
+                self._conn.close()
+            self._conn = None
+
+
+# Global store
+syllabus_versions = SyllabusVersionStore()
@@ -0,0 +1,243 @@
+"""
+core/tracing.py
+---------------
+Low-overhead tracing and metrics.
+
+  • span(name, **attrs) — context manager timing a unit of work with the
+    monotonic clock. Spans nest through a contextvar; the root span of a trace
+    decides sampling (TRACE_SAMPLE_RATE) and its children inherit the choice.
+  • Finished spans of sampled traces go to a bounded queue drained by a
+    background thread into the "brok.trace" logger as JSON lines. Callers never
+    block: when the queue is full the span is dropped and counted.
+  • Every span also feeds a latency histogram (always, regardless of sampling),
+    rendered in Prometheus text format by render_metrics().
+"""
+
+import contextvars
+import json
+import logging
+import os
+import queue
+import random
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+TRACE_SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", "0.1"))
+TRACE_QUEUE_SIZE = int(os.getenv("TRACE_QUEUE_SIZE", "10000"))
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+logger = logging.getLogger("brok.trace")
+_current = contextvars.ContextVar("brok_current_span", default=None)
+
+
+# -------------------------
+# 🔹 Metrics
+# -------------------------
+class Histogram:
+    __slots__ = ("counts", "total", "count")
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, seconds):
+        i = 0
+        while i < len(LATENCY_BUCKETS) and seconds > LATENCY_BUCKETS[i]:
+            i += 1
+        self.counts[i] += 1
+        self.total += seconds
+        self.count += 1
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._histograms = {}  # (metric, sorted label items) -> Histogram
+        self._counters = {}
+        self._help = {}
+        self._lock = threading.Lock()
+
+    def describe(self, metric, text):
+        self._help[metric] = text
+
+    def observe(self, metric, seconds, **labels):
+        key = (metric, tuple(sorted(labels.items())))
+        with self._lock:
+            hist = self._histograms.get(key)
+            if hist is None:
+                hist = self._histograms[key] = Histogram()
+            hist.observe(seconds)
+
+    def inc(self, metric, amount=1, **labels):
+        key = (metric, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    @staticmethod
+    def _labels(items, extra=()):
+        pairs = list(items) + list(extra)
+        if not pairs:
+            return ""
+        return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+    def render(self):
+        lines = []
+        with self._lock:
+            histograms = sorted(self._histograms.items())
+            counters = sorted(self._counters.items())
+            typed = set()
+            for (metric, labels), hist in histograms:
+                if metric not in typed:
+                    typed.add(metric)
+                    if metric in self._help:
+                        lines.append(f"# HELP {metric} {self._help[metric]}")
+                    lines.append(f"# TYPE {metric} histogram")
+                cumulative = 0
+                for bound, n in zip(LATENCY_BUCKETS + ("+Inf",), hist.counts):
+                    cumulative += n
+                    lines.append(f"{metric}_bucket{self._labels(labels, [('le', bound)])} {cumulative}")
+                lines.append(f"{metric}_sum{self._labels(labels)} {hist.total:.6f}")
+                lines.append(f"{metric}_count{self._labels(labels)} {hist.count}")
+            for (metric, labels), value in counters:
+                if metric not in typed:
+                    typed.add(metric)
+                    if metric in self._help:
+                        lines.append(f"# HELP {metric} {self._help[metric]}")
+                    lines.append(f"# TYPE {metric} counter")
+                lines.append(f"{metric}{self._labels(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
+metrics.describe("brok_http_request_duration_seconds", "HTTP request latency by route.")
+metrics.describe("brok_stage_duration_seconds", "Workflow stage latency.")
+metrics.describe("brok_agent_call_duration_seconds", "Agent service call latency.")
+metrics.describe("brok_trace_spans_dropped_total", "Sampled spans dropped because the log queue was full.")
+
+
+def render_metrics():
+    return metrics.render()
+
+
+# -------------------------
+# 🔹 Log Sink
+# -------------------------
+class QueueSink:
+    """Bounded queue drained by a daemon thread; put() never blocks."""
+
+    def __init__(self, maxsize=TRACE_QUEUE_SIZE):
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def put(self, record):
+        if self._thread is None:
+            self._start()
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            metrics.inc("brok_trace_spans_dropped_total")
+
+    def _start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._drain, name="trace-sink", daemon=True)
+                self._thread.start()
+
+    def _drain(self):
+        while True:
+            record = self._queue.get()
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(json.dumps(record, default=str))
+
+    def flush(self, timeout=1.0):
+        deadline = time.monotonic() + timeout
+        while not self._queue.empty() and time.monotonic() < deadline:
+            time.sleep(0.005)
+
+
+sink = QueueSink()
+
+
+# -------------------------
+# 🔹 Spans
+# -------------------------
+class Span:
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "sampled", "attrs", "start", "duration")
+
+    def __init__(self, name, parent, attrs, sample_rate):
+        self.name = name
+        self.span_id = f"{random.getrandbits(64):016x}"
+        if parent is None:
+            self.trace_id = f"{random.getrandbits(128):032x}"
+            self.parent_id = None
+            self.sampled = random.random() < sample_rate
+        else:
+            self.trace_id = parent.trace_id
+            self.parent_id = parent.span_id
+            self.sampled = parent.sampled
+        self.attrs = attrs
+        self.start = time.monotonic()
+        self.duration = None
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+
+@contextmanager
+def span(name, metric=None, sample_rate=None, **attrs):
+    """
+    Times the enclosed block. metric=(metric_name, labels_dict) also records
+    the duration in that histogram.
+    """
+    parent = _current.get()
+    current = Span(name, parent, attrs, TRACE_SAMPLE_RATE if sample_rate is None else sample_rate)
+    token = _current.set(current)
+    error = None
+    try:
+        yield current
+    except BaseException as e:
+        error = e
+        raise
+    finally:
+        _current.reset(token)
+        current.duration = time.monotonic() - current.start
+        if metric is not None:
+            metrics.observe(metric[0], current.duration, **metric[1])
+        if current.sampled:
+            record = {
+                "trace_id": current.trace_id,
+                "span_id": current.span_id,
+                "parent_id": current.parent_id,
+                "name": name,
+                "duration_ms": round(current.duration * 1000, 3),
+                **current.attrs,
+            }
+            if error is not None:
+                record["error"] = repr(error)
+            sink.put(record)
+
+
+def current_span():
+    return _current.get()
+
+
+def traced_agent(agent_name):
+    """
+    Decorator for agent service entry points: one span and one histogram
+    observation per call (cache hits included).
+    """
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(f"agent.{agent_name}", metric=("brok_agent_call_duration_seconds", {"agent": agent_name})):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
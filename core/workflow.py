@@ -3,11 +3,14 @@ core/workflow.py
 ----------------
 Synchronous Academic Agent Workflow (Debug / Readable Mode)
 -----------------------------------------------------------
-Executes the full academic architecture step-by-step, sequentially.
+Executes the full academic architecture through the stage-graph engine
+(core/engine.py) using its synchronous backend. With max_workers=1 stages run
+one at a time in dependency order, which keeps logs easy to follow.
 Useful for testing, debugging, or non-async environments.
 """
 
-from datetime import datetime
+from datetime import datetime, timedelta
+from functools import partial
 
 # Import all agents
 from agents.content_agent import service as content_agent
@@ -15,74 +18,112 @@ from agents.exam_agent import service as exam_agent
 from agents.rubric_agent import service as rubric_agent
 from agents.evaluator_agent import service as evaluator_agent
 from agents.analytics_agent import service as analytics_agent
+from core.agent_executor import IO, agent_executor
+from core.engine import Stage, StageGraph
+from core.models import StageResult
+from core.syllabus import Syllabus
+from core.tracing import span
 
+# Stage name → agent label used in pipeline logs
+STAGE_AGENTS = {
+    "content_generation": "ContentAgent",
+    "exam_creation": "ExamAgent",
+    "rubric_design": "RubricAgent",
+    "evaluation": "EvaluatorAgent",
+    "analytics": "AnalyticsAgent",
+}
 
-def run_workflow(syllabus_text: str):
+# Stage name → key used in API workflow_results
+STAGE_LABELS = {
+    "content_generation": "Content Agent",
+    "exam_creation": "Exam Agent",
+    "rubric_design": "Rubric Agent",
+    "evaluation": "Evaluator Agent",
+    "analytics": "Analytics Agent",
+}
+
+
+# Stage name → agent registered with the execution layer (core/agent_executor.py)
+STAGE_EXECUTOR_AGENTS = {
+    "content_generation": "content",
+    "exam_creation": "exam",
+    "rubric_design": "rubric",
+    "evaluation": "evaluator",
+    "analytics": "analytics",
+}
+
+# All five are "io": they spend their time in cache/SQLite/index I/O and
+# generator calls, and keep their memoized outputs in this process.
+agent_executor.register("content", content_agent.generate_content, IO)
+agent_executor.register("exam", exam_agent.generate_exam, IO)
+agent_executor.register("rubric", rubric_agent.design_rubric, IO)
+agent_executor.register("evaluator", evaluator_agent.evaluate_responses, IO)
+agent_executor.register("analytics", analytics_agent.analyze_performance, IO)
+
+
+def build_agent_graph(timeout=None, retries=0, dispatch=True):
+    """
+    Declares the academic pipeline over the real agent services.
+    Every agent consumes the parsed syllabus only, so all five stages are
+    independent and the scheduler may run them side by side. With dispatch
+    (the async workflows) each stage goes through the agent executor;
+    without it stages call the services directly (sync debug mode).
+    """
+    def stage(name):
+        agent = STAGE_EXECUTOR_AGENTS[name]
+        fn = partial(agent_executor.run, agent) if dispatch else agent_executor.agents[agent].fn
+        return Stage(name, fn, inputs=("syllabus",), timeout=timeout, retries=retries)
+
+    return StageGraph([stage(name) for name in STAGE_LABELS], inputs=("syllabus",))
+
+
+async def run_agent_workflow(syllabus, on_stage=None):
+    """
+    Runs the agent graph on the current event loop and returns the merged
+    {"Content Agent": ..., ...} results used by the workflow API endpoints.
+    """
+    graph = build_agent_graph()
+    run = await graph.run_async(on_stage=on_stage, syllabus=Syllabus.coerce(syllabus))
+    return {STAGE_LABELS[name]: run.results[name] for name in graph.order}
+
+
+async def stream_agent_workflow(syllabus):
+    """
+    Async generator over the agent graph yielding one record per stage as it
+    completes, then a final "done" record with the timing report. Stage
+    outputs are released after being yielded instead of merged into one dict.
+    """
+    graph = build_agent_graph()
+    async for name, output in graph.stream(syllabus=Syllabus.coerce(syllabus)):
+        if name == "__run__":
+            yield {"stage": "done", "timing": output.report()}
+        else:
+            yield {"stage": name, "agent": STAGE_LABELS[name], "output": output}
+
+
+def run_workflow(syllabus_text: str, max_workers: int = 1):
     """
     Executes the full academic AI workflow in synchronous mode.
-    Returns a structured JSON log of all stages and outputs.
+    Returns a dict log of all stages and outputs; pipeline_log holds a
+    datetime and StageResult models, so serialize it with
+    json.dumps(..., default=to_jsonable) (core/models.py) or FastJSONResponse.
+    Each stage is stamped with its own completion time from the engine run.
     """
-    print("\n============================")
-    print("🧠 Starting Academic Workflow (Sync Mode)")
-    print("============================")
-
-    logs = {"stages": [], "timestamp": datetime.utcnow().isoformat()}
-
-    # Stage 1 → Content Generation
-    print("\n🚀 [Stage 1] Content Agent: Generating lessons...")
-    content_output = content_agent.generate_content(syllabus_text)
-    logs["stages"].append({
-        "stage": "content_generation",
-        "agent": "ContentAgent",
-        "output": content_output,
-        "timestamp": datetime.utcnow().isoformat()
-    })
-
-    # Stage 2 → Exam Creation
-    print("\n🧩 [Stage 2] Exam Agent: Creating assessments...")
-    exam_output = exam_agent.create_assessments(content_output)
-    logs["stages"].append({
-        "stage": "exam_creation",
-        "agent": "ExamAgent",
-        "output": exam_output,
-        "timestamp": datetime.utcnow().isoformat()
-    })
-
-    # Stage 3 → Rubric Design
-    print("\n⚖️ [Stage 3] Rubric Agent: Designing evaluation matrices...")
-    rubric_output = rubric_agent.agent.create_rubric(exam_output)
-    logs["stages"].append({
-        "stage": "rubric_design",
-        "agent": "RubricAgent",
-        "output": rubric_output,
-        "timestamp": datetime.utcnow().isoformat()
-    })
-
-    # Stage 4 → Evaluation
-    print("\n📘 [Stage 4] Evaluator Agent: Scoring responses...")
-    evaluation_output = evaluator_agent.agent.evaluate(exam_output, rubric_output)
-    logs["stages"].append({
-        "stage": "evaluation",
-        "agent": "EvaluatorAgent",
-        "output": evaluation_output,
-        "timestamp": datetime.utcnow().isoformat()
-    })
-
-    # Stage 5 → Analytics
-    print("\n📊 [Stage 5] Analytics Agent: Generating insights...")
-    analytics_output = analytics_agent.agent.generate_report(evaluation_output)
-    logs["stages"].append({
-        "stage": "analytics",
-        "agent": "AnalyticsAgent",
-        "output": analytics_output,
-        "timestamp": datetime.utcnow().isoformat()
-    })
-
-    print("\n✅ Academic Workflow Completed Successfully.\n")
+    started = datetime.utcnow()
+    logs = {"stages": [], "timestamp": started}
+
+    with span("workflow.sync"):
+        run = build_agent_graph(dispatch=False).run(max_workers=max_workers, syllabus=Syllabus.parse(syllabus_text))
+
+    logs["stages"].extend(
+        StageResult(name, run.results[name], started + timedelta(seconds=run.timings[name]["end"]), STAGE_AGENTS[name])
+        for name in run.completed
+    )
 
     return {
         "workflow_name": "Academic Agent Architecture (Sync Mode)",
         "execution_summary": f"{len(logs['stages'])} stages executed successfully.",
+        "timing": run.report(),
         "pipeline_log": logs
     }
 
@@ -0,0 +1,34 @@
+"""
+tests/conftest.py
+-----------------
+Points every store, cache and upload directory at a throwaway directory
+before any application module is imported (they read their paths from the
+environment at import time), and puts the repository root on sys.path.
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+
+ROOT_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT_PATH not in sys.path:
+    sys.path.insert(0, ROOT_PATH)
+
+DATA_DIR = tempfile.mkdtemp(prefix="academic_agent_tests_")
+for var, sub in (
+    ("CACHE_DIR", "cache"),
+    ("INDEX_DIR", "index"),
+    ("UPLOAD_DIR", "uploads"),
+    ("INGEST_DIR", "uploads/answers"),
+    ("JOB_DB_PATH", "jobs.sqlite3"),
+    ("RUBRIC_DB_PATH", "rubrics.sqlite3"),
+    ("SYLLABUS_DB_PATH", "syllabi.sqlite3"),
+    ("RESULTS_DB_PATH", "results.sqlite3"),
+):
+    os.environ.setdefault(var, os.path.join(DATA_DIR, sub))
+os.environ.setdefault("STARTUP_WARMUP", "0")
+
+
+def pytest_unconfigure(config):
+    shutil.rmtree(DATA_DIR, ignore_errors=True)
@@ -0,0 +1,59 @@
+"""
+tests/test_analytics.py
+-----------------------
+Incremental score aggregates (core/analytics.py) and the analytics query routes.
+"""
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from core.analytics import GroupAggregates
+
+
+def test_batches_fold_into_the_same_aggregates_as_one_pass():
+    rng = np.random.default_rng(7)
+    codes = rng.integers(0, 40, 5000).astype(np.int32)
+    values = rng.uniform(0, 100, 5000).astype(np.float32)
+
+    batched = GroupAggregates(bins=100)
+    for start in range(0, 5000, 500):
+        chunk = codes[start:start + 500]
+        # Groups appear over time: each batch only knows the codes seen so far
+        batched.update(chunk, values[start:start + 500], int(codes[:start + 500].max()) + 1)
+    whole = GroupAggregates(bins=100)
+    whole.update(codes, values, 40)
+
+    for code in (0, 17, 39):
+        assert batched.stats(code) == whole.stats(code)
+        expected = values[codes == code]
+        assert batched.stats(code)["count"] == len(expected)
+        assert batched.stats(code)["mean"] == pytest.approx(expected.mean(), abs=1e-3)
+    assert batched.hist.shape[0] >= 40 and not batched.hist[40:].any()
+
+
+def test_update_only_touches_groups_in_the_batch():
+    aggregates = GroupAggregates(bins=10)
+    aggregates.update(np.asarray([0, 1, 2], dtype=np.int32), np.asarray([10.0, 20.0, 30.0]), 3)
+    before = aggregates.hist[:3].copy()
+    aggregates.update(np.asarray([5, 5], dtype=np.int32), np.asarray([95.0, 99.0]), 6)
+    assert (aggregates.hist[:3] == before).all()
+    assert aggregates.stats(5)["count"] == 2 and aggregates.stats(4) is None
+
+
+def test_query_routes_read_the_recorded_scores():
+    from api.main import app
+
+    body = b"student_id,question_id,knowledge,clarity,creativity\nst1,qa,10,10,10\nst2,qa,5,5,5\nst1,qb,0,0,0\n"
+    with TestClient(app) as client:
+        ingest = client.post("/analytics/ingest", data={"cohort": "routes-2026", "topics": '{"qa": "Routes A"}'},
+                             files={"file": ("a.csv", body, "text/csv")})
+        assert ingest.status_code == 200
+        assert client.get("/analytics/cohorts/routes-2026").json()["data"]["count"] == 3
+        assert client.get("/analytics/topics/Routes A", params={"cohort": "routes-2026"}).json()["data"]["mean"] == 75.0
+        assert client.get("/analytics/students/st2").json()["data"]["mean"] == 50.0
+        assert client.get("/analytics/questions/qb").json()["data"]["count"] == 1
+        weakest = client.get("/analytics/weak_topics", params={"cohort": "routes-2026"}).json()["data"]
+        assert [t["topic"] for t in weakest] == ["qb", "Routes A"]
+        assert client.get("/analytics/summary").json()["data"]["scores"] >= 3
+        assert client.get("/analytics/cohorts/missing").status_code == 404
@@ -0,0 +1,28 @@
+"""
+tests/test_batch.py
+-------------------
+Batch workflow execution (core/batch.py).
+"""
+
+import json
+
+from fastapi.testclient import TestClient
+
+
+def test_failing_shared_stage_yields_an_error_record_per_syllabus(monkeypatch):
+    from agents.evaluator_agent import service
+    from api.main import app
+
+    def fail(syllabus):
+        raise RuntimeError("evaluator down")
+
+    monkeypatch.setattr(service, "evaluate_responses", fail)
+    body = json.dumps(["Algebra, Graphs", "Sets", "algebra, graphs"])
+    with TestClient(app) as client:
+        response = client.post("/workflow/run_batch", content=body, headers={"content-type": "application/json"})
+    assert response.status_code == 200
+    records = sorted((json.loads(line) for line in response.text.splitlines()), key=lambda r: r["index"])
+    assert [(r["index"], r["status"], r["deduplicated"]) for r in records] == [
+        (0, "error", False), (1, "error", False), (2, "error", True),
+    ]
+    assert {r["message"] for r in records} == {"evaluator down"}
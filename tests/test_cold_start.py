@@ -0,0 +1,31 @@
+"""
+tests/test_cold_start.py
+------------------------
+Cold-start budget: importing the app must not load the upload parsers, and
+a fresh server must answer /health within COLD_START_BUDGET_MS. Both run in
+fresh interpreters (see benchmarks/bench_cold_start.py for the profile).
+"""
+
+import os
+import statistics
+
+import pytest
+
+from benchmarks.bench_cold_start import LAZY_MODULES, import_profile, isolated_env, time_to_health
+
+COLD_START_BUDGET_MS = float(os.getenv("COLD_START_BUDGET_MS", "1500"))
+
+
+@pytest.fixture
+def env(tmp_path):
+    return isolated_env(str(tmp_path))
+
+
+def test_import_does_not_load_upload_parsers(env):
+    _, eager, _ = import_profile(env, top=0)
+    assert eager == [], f"{', '.join(eager)} imported by `import api.main`; expected lazy: {LAZY_MODULES}"
+
+
+def test_first_health_within_budget(env):
+    runs = [time_to_health(env) for _ in range(3)]
+    assert statistics.median(runs) <= COLD_START_BUDGET_MS, f"time to first /health: {runs} ms"
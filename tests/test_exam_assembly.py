@@ -0,0 +1,126 @@
+"""
+tests/test_exam_assembly.py
+---------------------------
+Near-duplicate topic merging and exam assembly (core/exam_assembly.py).
+"""
+
+import pytest
+
+from core.exam_assembly import distinct_topics, merge_near_duplicates, numerals, similarity_text
+
+
+@pytest.mark.parametrize("first, second", [
+    ("Neural Nets", "neural networks"),
+    ("Machine Learning", "machine-learning"),
+    ("Thermodynamics", "Thermodynamic"),
+    ("Graph Algorithms", "Graph Algoritms"),
+    ("The Theory of Computation", "theory computation"),
+    ("Marketing Mix", "marketing mixes"),
+    ("Civil Engineering", "Civl Engineering"),
+])
+def test_true_duplicates_merge(first, second):
+    kept, merged = merge_near_duplicates([first, second])
+    assert kept == [first]
+    assert merged == {first: [second]}
+
+
+@pytest.mark.parametrize("first, second", [
+    ("Calculus 1", "Calculus 2"),
+    ("Physics I", "Physics II"),
+    ("Chapter 10", "Chapter 11"),
+    ("Organic Chemistry", "Inorganic Chemistry"),
+    ("Linear Algebra", "Nonlinear Algebra"),
+    ("Linear Algebra", "Non-linear Algebra"),
+    ("Symmetric Encryption", "Asymmetric Encryption"),
+    ("Mechanics Part ii", "Mechanics Part iii"),
+    ("Algebra (iv)", "Algebra (v)"),
+    ("Introduction to Quantum Physics I", "Introduction to Quantum Physics II"),
+    ("INTRODUCTION TO QUANTUM PHYSICS I", "INTRODUCTION TO QUANTUM PHYSICS II"),
+])
+def test_sibling_topics_stay_separate(first, second):
+    kept, merged = merge_near_duplicates([first, second])
+    assert kept == [first, second]
+    assert merged == {}
+
+
+def test_reported_syllabus_keeps_every_topic():
+    topics = ["Calculus 1", "Calculus 2", "Physics I", "Physics II", "Organic Chemistry", "Inorganic Chemistry"]
+    assert merge_near_duplicates(topics) == (topics, {})
+
+
+def test_numerals_are_read_from_the_source_text():
+    assert numerals("Physics II") == {"ii"}
+    assert numerals("Calculus 2, part iv") == {"2", "iv"}
+    assert numerals("Algebra (iii)") == {"iii"}
+    assert numerals("Marketing Mix for civil servants") == set()
+    assert numerals("CIVIL ENGINEERING") == set()
+    assert numerals("CIVIL ENGINEERING II") == {"ii"}
+
+
+def test_distinct_topics():
+    def distinct(a, b):
+        return distinct_topics(similarity_text(a), similarity_text(b), (numerals(a), numerals(b)))
+
+    assert distinct("Physics I", "Physics II")
+    assert distinct("Unsupervised Learning", "Supervised Learning")
+    assert not distinct("Neural Nets", "Neural Networks")
+    assert not distinct("Marketing Mix", "marketing mixes")
+
+
+def test_first_seen_topic_represents_cluster():
+    kept, merged = merge_near_duplicates(["Graphs", "Neural Nets", "Neural Networks", "neural nets"])
+    assert kept == ["Graphs", "Neural Nets"]
+    assert merged == {"Neural Nets": ["Neural Networks", "neural nets"]}
+
+
+def test_generate_exam_keeps_topics_unless_merging_is_asked():
+    from agents.exam_agent import service
+
+    syllabus = "Calculus 1, Calculus 2, Neural Nets, Neural Networks"
+    exam = service.generate_exam(syllabus)
+    assert [q.topic for q in exam["questions"]] == ["Calculus 1", "Calculus 2", "Neural Nets", "Neural Networks"]
+    assert exam["merged_topics"] == {}
+
+    merged = service.generate_exam(syllabus, merge_duplicates=True)
+    assert [q.topic for q in merged["questions"]] == ["Calculus 1", "Calculus 2", "Neural Nets"]
+    assert merged["merged_topics"] == {"Neural Nets": ["Neural Networks"]}
+
+
+def _pool():
+    from core.models import Question
+
+    pool = []
+    for topic in ("Algebra", "Graphs", "Sets", "Probability", "Neural Nets", "neural networks"):
+        for difficulty, marks in (("easy", 5), ("medium", 10), ("hard", 15)):
+            pool.append(Question(topic, f"{difficulty} question on {topic}", marks, difficulty))
+    return pool
+
+
+def test_assemble_takes_one_question_per_cluster():
+    from core.exam_assembly import assemble
+
+    exam = assemble(_pool())
+    topics = [q.topic for q in exam["questions"]]
+    assert len(topics) == len(set(topics)) == 5
+    assert not {"Neural Nets", "neural networks"} <= set(topics)
+    assert exam["distinct_clusters"] == 5
+
+
+def test_assemble_respects_budget_count_and_mix():
+    from core.exam_assembly import assemble
+
+    exam = assemble(_pool(), total_marks=30, mix={"easy": 1, "medium": 1})
+    assert exam["total_marks"] <= 30
+    assert {q.difficulty for q in exam["questions"]} <= {"easy", "medium"}
+    assert abs(exam["by_difficulty"]["easy"] - exam["by_difficulty"].get("medium", 0)) <= 1
+
+    assert assemble(_pool(), max_questions=2)["total_questions"] == 2
+
+
+def test_parse_mix_rejects_bad_input():
+    from core.exam_assembly import parse_mix
+
+    assert parse_mix("easy=1,hard=3") == {"easy": 0.25, "hard": 0.75}
+    for bad in ("easy", "easy=-1", {}):
+        with pytest.raises(ValueError):
+            parse_mix(bad)
@@ -0,0 +1,86 @@
+"""
+tests/test_generation.py
+------------------------
+Remote generation must not block the API event loop, and concurrent
+requests must share backend batches (core/generation.py).
+"""
+
+import asyncio
+import time
+
+import httpx
+
+from core.generation import Generator
+
+
+class SlowBackend:
+    """Remote-style backend that takes `delay` seconds per batch."""
+
+    name = "slow"
+    local = False
+
+    def __init__(self, delay):
+        self.delay = delay
+        self.batches = []
+
+    async def generate_batch(self, prompts):
+        self.batches.append(len(prompts))
+        await asyncio.sleep(self.delay)
+        return [f"generated: {p.text}" for p in prompts]
+
+    async def aclose(self):
+        pass
+
+
+def _client():
+    from api.main import app
+
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+
+
+def test_slow_backend_does_not_stall_other_requests(monkeypatch):
+    from agents.exam_agent import service
+
+    backend = SlowBackend(delay=0.5)
+    generator = Generator(backend=backend, batch_window_ms=1)
+    monkeypatch.setattr(service, "generator", generator)
+
+    async def scenario():
+        async with _client() as client:
+            start = time.perf_counter()
+            create = asyncio.create_task(client.post("/exam/create", data={"syllabus": "Stalled Loop Topic"}))
+            await asyncio.sleep(0.05)
+            health = await client.get("/health")
+            health_seconds = time.perf_counter() - start
+            return health, health_seconds, await create
+
+    try:
+        health, health_seconds, created = asyncio.run(scenario())
+    finally:
+        generator.close()
+    assert health.status_code == 200
+    assert health_seconds < 0.3  # answered while the backend call is still pending
+    assert created.status_code == 200
+    assert created.json()["data"]["questions"][0]["question"].startswith("generated: ")
+
+
+def test_concurrent_requests_share_a_backend_batch(monkeypatch):
+    from agents.exam_agent import service
+
+    backend = SlowBackend(delay=0.05)
+    generator = Generator(backend=backend, batch_window_ms=200)
+    monkeypatch.setattr(service, "generator", generator)
+
+    async def scenario():
+        async with _client() as client:
+            return await asyncio.gather(*(
+                client.post("/exam/create", data={"syllabus": f"Batched Topic {n}"}) for n in range(3)
+            ))
+
+    try:
+        responses = asyncio.run(scenario())
+    finally:
+        generator.close()
+    assert [r.status_code for r in responses] == [200, 200, 200]
+    assert backend.batches == [3]
+    assert generator.stats()["prompts"] == 3
@@ -0,0 +1,123 @@
+"""
+tests/test_http_cache.py
+------------------------
+Route-level response cache and Idempotency-Key handling (api/http_cache.py).
+"""
+
+import asyncio
+
+import httpx
+import pytest
+from fastapi import FastAPI, Form
+
+from api.http_cache import HTTPCache, ResponseStore
+
+
+@pytest.fixture
+def app():
+    cache = HTTPCache(ttl=60, idempotency_ttl=60)
+    app = FastAPI()
+    app.state.cache = cache
+    app.state.calls = 0
+
+    @app.post("/echo")
+    @cache.cached()
+    async def echo(syllabus: str = Form(...), delay: float = Form(0)):
+        app.state.calls += 1
+        await asyncio.sleep(delay)
+        return {"topics": syllabus.split(","), "call": app.state.calls}
+
+    return app
+
+
+def _run(app, *requests):
+    """Sends (data, headers) requests concurrently; returns the responses in order."""
+    async def scenario():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await asyncio.gather(*(client.post("/echo", data=data, headers=headers or {})
+                                          for data, headers in requests))
+    return asyncio.run(scenario())
+
+
+def _send(app, data, headers=None):
+    return _run(app, (data, headers))[0]
+
+
+def test_miss_then_hit(app):
+    first = _send(app, {"syllabus": "Algebra, Graphs"})
+    second = _send(app, {"syllabus": "Algebra,   Graphs"})  # same topics after parsing
+    assert first.headers["x-cache"] == "MISS"
+    assert second.headers["x-cache"] == "HIT"
+    assert second.content == first.content
+    assert second.headers["etag"] == first.headers["etag"]
+    assert app.state.calls == 1
+
+
+def test_if_none_match_returns_304(app):
+    etag = _send(app, {"syllabus": "Algebra"}).headers["etag"]
+    response = _send(app, {"syllabus": "Algebra"}, {"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert _send(app, {"syllabus": "Algebra"}, {"If-None-Match": 'W/"other"'}).status_code == 200
+
+
+def test_concurrent_identical_requests_coalesce(app):
+    responses = _run(app, *[({"syllabus": "Slow Topic", "delay": "0.1"}, None)] * 3)
+    assert sorted(r.headers["x-cache"] for r in responses) == ["COALESCED", "COALESCED", "MISS"]
+    assert len({r.content for r in responses}) == 1
+    assert app.state.calls == 1
+
+
+def test_idempotency_key_replays(app):
+    headers = {"Idempotency-Key": "retry-1"}
+    first = _send(app, {"syllabus": "Algebra"}, headers)
+    retry = _send(app, {"syllabus": "Algebra"}, headers)
+    assert retry.headers["x-cache"] == "REPLAY"
+    assert retry.content == first.content
+    assert app.state.calls == 1
+
+
+def test_idempotency_key_reused_with_other_inputs_is_422(app):
+    headers = {"Idempotency-Key": "retry-2"}
+    _send(app, {"syllabus": "Algebra"}, headers)
+    response = _send(app, {"syllabus": "Geometry"}, headers)
+    assert response.status_code == 422
+    assert app.state.cache.counters["conflicts"] == 1
+    assert app.state.calls == 1
+
+
+def test_response_store_evicts_least_recently_used():
+    from api.http_cache import CachedResponse
+
+    store = ResponseStore(max_bytes=10_000, max_entries=2)
+    for key in ("a", "b"):
+        store.put(key, CachedResponse(key, b"x", 200, {}, ttl=60))
+    store.get("a")
+    store.put("c", CachedResponse("c", b"x", 200, {}, ttl=60))
+    assert store.get("b") is None
+    assert store.get("a") is not None and store.get("c") is not None
+    assert store.evictions == 1
+
+
+def test_response_churn_does_not_evict_idempotency_records():
+    cache = HTTPCache(ttl=60, idempotency_ttl=60, store=ResponseStore(max_bytes=10_000, max_entries=2))
+    app = FastAPI()
+    calls = []
+
+    @app.post("/echo")
+    @cache.cached()
+    async def echo(syllabus: str = Form(...)):
+        calls.append(syllabus)
+        return {"topics": syllabus.split(",")}
+
+    headers = {"Idempotency-Key": "retry-3"}
+    _send(app, {"syllabus": "Algebra"}, headers)
+    for topic in ("Graphs", "Sets", "Logic", "Probability"):
+        _send(app, {"syllabus": topic})
+    assert cache.store.evictions >= 3
+
+    retry = _send(app, {"syllabus": "Algebra"}, headers)
+    assert retry.headers["x-cache"] == "REPLAY"
+    assert calls == ["Algebra", "Graphs", "Sets", "Logic", "Probability"]
+    assert cache.stats()["idempotency"]["entries"] == 1
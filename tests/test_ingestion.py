@@ -0,0 +1,145 @@
+"""
+tests/test_ingestion.py
+-----------------------
+Streaming answer-file ingestion (core/ingestion.py).
+"""
+
+import threading
+
+import pytest
+
+from core import ingestion
+from core.analytics import ScoreStore
+from core.ingestion import IngestionError, ResultStore, ingest_file
+from core.scoring import Rubric
+
+HEADER = "student_id,question_id,knowledge,clarity,creativity\n"
+
+
+def _answers(tmp_path, rows, name="answers.csv"):
+    path = tmp_path / name
+    path.write_text(HEADER + "".join(f"s{i % 7},q{i % 5},{i % 11},5,5\n" for i in range(rows)))
+    return str(path)
+
+
+@pytest.fixture
+def store(tmp_path):
+    results = ResultStore(str(tmp_path / "results.sqlite3"))
+    yield results
+    results.close()
+
+
+def test_successful_ingestion_reaches_analytics(tmp_path, store, monkeypatch):
+    monkeypatch.setattr(ingestion, "INGEST_BATCH_ROWS", 10)
+    analytics = ScoreStore()
+    result = ingest_file(_answers(tmp_path, 95), "csv", Rubric(), store=store, analytics=analytics,
+                         ingestion_id="ok")
+    assert result["accepted"] == 95
+    assert len(analytics) == 95
+    assert store.summary("ok")["answers"] == 95
+    assert not [p for p in tmp_path.iterdir() if p.name.startswith(".analytics-")]
+
+
+class FailingStore(ResultStore):
+    """Fails the third batch write, like a full disk would."""
+
+    writes = 0
+
+    def write_answers(self, *args):
+        self.writes += 1
+        if self.writes == 3:
+            raise OSError("disk full")
+        super().write_answers(*args)
+
+
+def test_failed_ingestion_leaves_no_partial_rows(tmp_path, monkeypatch):
+    monkeypatch.setattr(ingestion, "INGEST_BATCH_ROWS", 10)
+    analytics = ScoreStore()
+    store = FailingStore(str(tmp_path / "results.sqlite3"))
+    with pytest.raises(OSError):
+        ingest_file(_answers(tmp_path, 95), "csv", Rubric(), store=store, analytics=analytics, ingestion_id="bad")
+    assert len(analytics) == 0
+    assert store.summary("bad") is None
+
+    # The retry is counted once
+    store.writes = -100
+    ingest_file(_answers(tmp_path, 95), "csv", Rubric(), store=store, analytics=analytics, ingestion_id="bad")
+    assert len(analytics) == 95
+    store.close()
+
+
+def test_cancelled_ingestion_leaves_no_partial_rows(tmp_path, store, monkeypatch):
+    monkeypatch.setattr(ingestion, "INGEST_BATCH_ROWS", 10)
+    analytics = ScoreStore()
+    stop = threading.Event()
+
+    def report(progress):
+        if progress["rows"] >= 30:
+            stop.set()
+
+    with pytest.raises(IngestionError, match="cancelled"):
+        ingest_file(_answers(tmp_path, 95), "csv", Rubric(), store=store, analytics=analytics,
+                    ingestion_id="stopped", report=report, stop=stop)
+    assert len(analytics) == 0
+    assert store.summary("stopped") is None
+
+
+# -------------------------
+# 🔹 Validation
+# -------------------------
+def _batches(text, fmt="csv", batch_rows=100):
+    import io
+
+    from core.ingestion import RejectLog, iter_answer_batches
+
+    rejects = RejectLog()
+    batches = list(iter_answer_batches(io.StringIO(text), ("knowledge", "clarity"), fmt, 10, batch_rows, rejects))
+    return batches, rejects
+
+
+def test_csv_rows_are_validated_and_counted():
+    text = (
+        "student_id,question_id,knowledge,clarity,extra\n"
+        "s1,q1,5,6,x\n"        # valid (extra columns ignored)
+        "s1,q2,abc,6,x\n"      # non-numeric mark
+        ",q3,5,6,x\n"          # missing student id
+        "s2,q1,11,6,x\n"       # above max_score
+        "s2,q2,-1,6,x\n"       # negative
+        "s2,q3,5\n"            # wrong field count
+        "\n"                   # blank line: skipped silently
+        "s3,q1,nan,6,x\n"      # not finite
+        "s3,q2,10,0,x\n"       # valid at the bounds
+    )
+    batches, rejects = _batches(text)
+    accepted = [(s, q) for b in batches for s, q in zip(b.student_ids, b.question_ids)]
+    assert accepted == [("s1", "q1"), ("s3", "q2")]
+    assert rejects.count == 6
+    assert sorted(e["row"] for e in rejects.samples) == [2, 3, 4, 5, 6, 8]
+    assert sum(b.rows for b in batches) == 9
+
+
+def test_batches_are_bounded():
+    text = "student_id,question_id,knowledge,clarity\n" + "".join(f"s{i},q1,1,1\n" for i in range(25))
+    batches, _ = _batches(text, batch_rows=10)
+    assert [len(b.student_ids) for b in batches] == [10, 10, 5]
+    assert batches[0].marks.shape == (10, 2)
+
+
+def test_ndjson_rows_are_validated():
+    text = (
+        '{"student_id": "s1", "question_id": "q1", "scores": {"knowledge": 5, "clarity": 6}}\n'
+        '{"student_id": 7, "question_id": "q2", "knowledge": 1, "clarity": 2}\n'
+        '{bad json\n'
+        '{"student_id": "s3", "knowledge": 1, "clarity": 2}\n'
+        '{"student_id": "s4", "question_id": "q1", "knowledge": 1}\n'
+        '{"student_id": "s5", "question_id": "q1", "knowledge": "x", "clarity": 1}\n'
+    )
+    batches, rejects = _batches(text, fmt="ndjson")
+    accepted = [(s, q) for b in batches for s, q in zip(b.student_ids, b.question_ids)]
+    assert accepted == [("s1", "q1"), ("7", "q2")]
+    assert [e["row"] for e in rejects.samples] == [3, 4, 5, 6]
+
+
+def test_missing_header_column_is_an_error():
+    with pytest.raises(IngestionError, match="clarity"):
+        _batches("student_id,question_id,knowledge\ns1,q1,5\n")
@@ -0,0 +1,158 @@
+"""
+tests/test_jobs.py
+------------------
+SQLite-backed job queue (core/jobs.py) and the launcher's job recovery.
+"""
+
+import asyncio
+import os
+
+import pytest
+
+from core.jobs import FAILED, QUEUED, RUNNING, SUCCEEDED, JobQueue, JobStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    jobs = JobStore(str(tmp_path / "jobs.sqlite3"))
+    yield jobs
+    jobs.close()
+
+
+def test_claim_is_exclusive_and_records_owner(store):
+    job_id = store.create("workflow", {"syllabus": "Algebra"}, priority=5)
+    assert store.claim(job_id)
+    assert not store.claim(job_id)
+    job = store.get(job_id)
+    assert job["status"] == RUNNING
+    assert store._execute("SELECT owner FROM jobs WHERE id = ?", (job_id,))[0]["owner"] == os.getpid()
+
+
+def test_requeue_only_touches_the_dead_owner(store):
+    mine, theirs = (store.create("workflow", {}, priority=5) for _ in range(2))
+    store.claim(mine)
+    store.claim(theirs)
+    store._execute("UPDATE jobs SET owner = ? WHERE id = ?", (os.getpid() + 1, theirs))
+
+    assert store.requeue_interrupted(owner=os.getpid() + 1) == 1
+    assert store.get(theirs)["status"] == QUEUED
+    assert store.get(mine)["status"] == RUNNING
+    assert [row["id"] for row in store.pending()] == [theirs]
+
+    assert store.requeue_interrupted() == 1
+    assert store.get(mine)["status"] == QUEUED
+    assert store.claim(mine)
+
+
+def test_pending_is_ordered_by_priority(store):
+    low = store.create("workflow", {}, priority=9)
+    high = store.create("workflow", {}, priority=1)
+    assert [row["id"] for row in store.pending()] == [high, low]
+
+
+def test_old_database_gains_owner_column(tmp_path):
+    import sqlite3
+
+    path = str(tmp_path / "old.sqlite3")
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE jobs (id TEXT PRIMARY KEY, kind TEXT NOT NULL, status TEXT NOT NULL, priority INTEGER NOT NULL, "
+        "payload TEXT NOT NULL, progress TEXT NOT NULL DEFAULT '{}', result TEXT, error TEXT, created_at REAL NOT NULL, "
+        "started_at REAL, finished_at REAL, expires_at REAL)"
+    )
+    conn.close()
+    store = JobStore(path)
+    job_id = store.create("workflow", {}, priority=5)
+    assert store.claim(job_id)
+    store.close()
+
+
+def test_queue_runs_handlers_and_records_outcome(store):
+    queue = JobQueue(store=store, workers=1, recover=False)
+
+    @queue.register("echo")
+    async def echo(payload, report):
+        report({"step": 1})
+        if payload.get("fail"):
+            raise ValueError("boom")
+        return {"echo": payload["value"]}
+
+    async def scenario():
+        await queue.start()
+        try:
+            ok = queue.submit("echo", {"value": 42})
+            bad = queue.submit("echo", {"fail": True})
+            await queue._queue.join()
+            return ok, bad
+        finally:
+            await queue.stop()
+
+    ok, bad = asyncio.run(scenario())
+    done = queue.result(ok)
+    assert done["status"] == SUCCEEDED
+    assert done["result"] == {"echo": 42}
+    assert done["progress"] == {"step": 1}
+    failed = queue.result(bad)
+    assert failed["status"] == FAILED
+    assert failed["error"] == "boom"
+
+
+def test_supervisor_requeues_a_dead_workers_jobs(tmp_path, monkeypatch):
+    from api import serve
+    from core import jobs
+
+    path = str(tmp_path / "jobs.sqlite3")
+    monkeypatch.setattr(jobs, "JobStore", lambda: JobStore(path))
+    store = JobStore(path)
+    job_id = store.create("workflow", {}, priority=5)
+    store.claim(job_id)
+
+    assert serve.requeue_jobs(owner=os.getpid() + 1) == 0
+    assert store.get(job_id)["status"] == RUNNING
+    assert serve.requeue_jobs(owner=os.getpid()) == 1
+    assert store.get(job_id)["status"] == QUEUED
+    store.close()
+
+
+@pytest.mark.parametrize("method, url", [
+    ("POST", "/jobs/workflow?syllabus=Locked+Store"),
+    ("GET", "/jobs/some-job"),
+    ("GET", "/jobs/some-job/result"),
+    ("GET", "/jobs"),
+])
+def test_job_endpoints_wait_for_the_store_off_the_event_loop(method, url):
+    import threading
+    import time
+
+    import httpx
+
+    from api.main import app
+    from core.jobs import job_queue
+
+    async def scenario():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            async with app.router.lifespan_context(app):
+                # A slow SQLite write elsewhere holds the store lock
+                held = threading.Event()
+
+                def hold():
+                    with job_queue.store._lock:
+                        held.set()
+                        time.sleep(0.5)
+
+                holder = threading.Thread(target=hold)
+                holder.start()
+                held.wait()
+                start = time.perf_counter()
+                slow = asyncio.create_task(client.request(method, url))
+                await asyncio.sleep(0.05)
+                health = await client.get("/health")
+                health_seconds = time.perf_counter() - start
+                response = await slow
+                holder.join()
+                return health, health_seconds, response
+
+    health, health_seconds, response = asyncio.run(scenario())
+    assert health.status_code == 200
+    assert health_seconds < 0.3
+    assert response.status_code in (200, 202, 404)
@@ -0,0 +1,46 @@
+"""
+tests/test_routes.py
+--------------------
+Agent routes run their blocking service calls off the event loop.
+"""
+
+import asyncio
+import time
+
+import httpx
+import pytest
+
+
+def _blocking(result):
+    def call(*args):
+        time.sleep(0.5)
+        return result
+    return call
+
+
+@pytest.mark.parametrize("module, name, result, request_kwargs", [
+    ("agents.evaluator_agent.service", "evaluate_responses", {}, {"url": "/evaluate/evaluate", "data": {"syllabus": "Slow Evaluation"}}),
+    ("agents.analytics_agent.service", "analyze_performance", {}, {"url": "/analytics/analyze", "data": {"syllabus": "Slow Analysis"}}),
+    ("agents.content_agent.service", "cached_topics", ["Slow Upload Topic"], {
+        "url": "/content/upload", "files": {"file": ("slow.csv", b"topic\nSlow Upload Topic\n", "text/csv")},
+    }),
+])
+def test_blocking_service_call_does_not_stall_health(monkeypatch, module, name, result, request_kwargs):
+    import importlib
+
+    from api.main import app
+
+    monkeypatch.setattr(importlib.import_module(module), name, _blocking(result))
+
+    async def scenario():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            start = time.perf_counter()
+            slow = asyncio.create_task(client.post(**request_kwargs))
+            await asyncio.sleep(0.05)
+            health = await client.get("/health")
+            return health, time.perf_counter() - start, await slow
+
+    health, health_seconds, slow = asyncio.run(scenario())
+    assert health.status_code == 200
+    assert health_seconds < 0.3
+    assert slow.status_code == 200
@@ -0,0 +1,75 @@
+"""
+tests/test_scoring.py
+---------------------
+Answer parsing and vectorized grading (core/scoring.py).
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from core import scoring
+from core.scoring import parse_answers
+
+
+def _sparse_csv(rows):
+    lines = ["student_id,question_id,knowledge,clarity,creativity"]
+    lines += [f"s{i},q{i},5,5,5" for i in range(rows)]
+    return "\n".join(lines).encode()
+
+
+def test_sparse_file_is_refused_before_allocating(monkeypatch):
+    monkeypatch.setattr(scoring, "SCORING_MAX_CELLS", 3 * 100 * 100)
+    parse_answers(_sparse_csv(100), ("knowledge", "clarity", "creativity"))
+    with pytest.raises(ValueError, match="answer cells"):
+        parse_answers(_sparse_csv(101), ("knowledge", "clarity", "creativity"))
+
+
+def test_grade_route_rejects_oversized_tensor():
+    from api.main import app
+
+    # 20k distinct students x 20k distinct questions would be a 4.8 GB tensor
+    with TestClient(app) as client:
+        response = client.post("/evaluate/grade", files={"file": ("a.csv", _sparse_csv(20000), "text/csv")})
+    assert response.status_code == 400
+    assert "answer cells" in response.json()["message"]
+
+
+def test_grade_weights_criteria_and_questions():
+    from core.scoring import Rubric, grade
+
+    body = (
+        "student_id,question_id,knowledge,clarity\n"
+        "s1,q1,10,0\n"
+        "s1,q2,10,10\n"
+        "s2,q1,5,5\n"
+    ).encode()
+    rubric = Rubric({"knowledge": 3, "clarity": 1})
+    sheet = parse_answers(body, rubric.criteria)
+    assert sheet.shape == (2, 2, 2)
+
+    result = grade(sheet, rubric)
+    # s1: q1 = 0.75, q2 = 1.0; s2: q1 = 0.5, q2 unanswered = 0
+    assert result.totals.tolist() == pytest.approx([87.5, 25.0])
+    assert result.grades().tolist() == ["B", "F"]
+
+    weighted = grade(sheet, rubric, question_weights={"q1": 3, "q2": 1})
+    assert weighted.totals.tolist() == pytest.approx([81.25, 37.5])
+    scores = weighted.student_scores()
+    assert [(s.student_id, s.score, s.grade) for s in scores] == [("s1", 81.25, "B"), ("s2", 37.5, "F")]
+
+
+def test_grade_summary_and_errors():
+    from core.scoring import Rubric, grade
+
+    sheet = parse_answers(b"student_id,question_id,knowledge,clarity,creativity\ns1,q1,10,10,10\n",
+                          ("knowledge", "clarity", "creativity"))
+    summary = grade(sheet).summary()
+    assert (summary["students"], summary["answers"], summary["mean"]) == (1, 1, 100.0)
+    assert summary["grade_distribution"] == {"A": 1}
+    with pytest.raises(ValueError):
+        grade(sheet, Rubric({"knowledge": 1}))
+    with pytest.raises(ValueError):
+        grade(sheet, max_score=0)
+    with pytest.raises(ValueError):
+        parse_answers(b"student_id,question_id,knowledge,clarity,creativity\ns1,q1,x,1,1\n",
+                      ("knowledge", "clarity", "creativity"))
@@ -0,0 +1,49 @@
+"""
+tests/test_search_index.py
+--------------------------
+Topic lookups on the persistent inverted index (core/search_index.py).
+"""
+
+import pytest
+
+from core.search_index import SearchIndex
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = SearchIndex(str(tmp_path / "index"), flush_docs=5)
+    for n in range(6):
+        index.add("lesson", f"Graphs lesson {n}", topics=["Graphs"], data={"n": n})
+    index.add("question", "Graphs question", topics=["Graphs"], data={"n": "q"})
+    index.add("question", "Sets question", topics=["Sets"], data={"n": "s"})
+    yield index
+    index.close()
+
+
+def test_find_topics_filters_kind_before_decoding(index, monkeypatch):
+    decoded = []
+    record = index._record
+    monkeypatch.setattr(index, "_record", lambda doc_id: decoded.append(doc_id) or record(doc_id))
+
+    found = index.find_topics(["Graphs", "Sets", "Unknown"], kind="question")
+    assert {t: [r["data"]["n"] for r in rs] for t, rs in found.items()} == {"Graphs": ["q"], "Sets": ["s"]}
+    assert len(decoded) == 2
+
+
+def test_find_topics_limit_spans_segments_and_buffer(index):
+    assert len(index._segments) == 1  # five flushed docs, three still buffered
+    assert len(index.find_topics(["Graphs"])["Graphs"]) == 7
+    assert [r["data"]["n"] for r in index.find_topics(["Graphs"], limit=5)["Graphs"]] == [0, 1, 2, 3, 4]
+
+
+def test_topic_route_is_capped(monkeypatch):
+    from fastapi.testclient import TestClient
+
+    from api import main
+
+    calls = []
+    monkeypatch.setattr(main.search_index, "find_topics", lambda topics, kind, limit: calls.append(limit) or {})
+    with TestClient(main.app) as client:
+        client.get("/search/topics/Graphs")
+        client.get("/search/topics/Graphs", params={"limit": 10 ** 6})
+    assert calls == [50, main.SEARCH_TOPIC_MAX_LIMIT]
@@ -0,0 +1,73 @@
+"""
+tests/test_syllabus_versions.py
+-------------------------------
+Topic-level syllabus diffs and the version store (core/syllabus_versions.py).
+"""
+
+import pytest
+
+from core.syllabus_versions import SyllabusVersionStore, UnknownSyllabus, diff_topics
+
+
+def test_identical_lists_have_empty_delta():
+    delta = diff_topics(["A", "B"], ["A", "B"])
+    assert (delta.added, delta.removed, delta.changed, delta.unchanged) == ((), (), (), 2)
+
+
+def test_moved_topics_are_unchanged():
+    delta = diff_topics(["Algebra", "Graphs", "Sets"], ["Sets", "Algebra", "Graphs"])
+    assert (delta.added, delta.removed, delta.changed, delta.unchanged) == ((), (), (), 3)
+
+
+def test_added_and_removed_topics():
+    delta = diff_topics(["Algebra", "Graphs"], ["Graphs", "Probability", "Statistics"])
+    assert delta.added == ("Probability", "Statistics")
+    assert delta.removed == ("Algebra",)
+    assert delta.unchanged == 1
+
+
+def test_topic_rewritten_in_place_is_changed():
+    delta = diff_topics(["Algebra", "Graph Theory", "Sets"], ["Algebra", "Graph Theory Basics", "Sets"])
+    assert delta.changed == (("Graph Theory", "Graph Theory Basics"),)
+    assert delta.added == delta.removed == ()
+    assert delta.unchanged == 2
+
+
+def test_store_versions_only_real_changes(tmp_path):
+    store = SyllabusVersionStore(str(tmp_path / "syllabi.sqlite3"))
+    try:
+        first, previous = store.commit("cs101", ["Algebra", "Graphs"])
+        assert (first.version, previous) == (1, None)
+        assert first.delta.added == ("Algebra", "Graphs")
+
+        same, previous = store.commit("cs101", ["Algebra", "Graphs"])
+        assert same.version == 1 and previous is same
+
+        second, previous = store.commit("cs101", ["Algebra", "Graphs", "Sets"])
+        assert (second.version, previous.version) == (2, 1)
+        assert second.delta.added == ("Sets",)
+        assert [v.version for v in store.versions("cs101")] == [1, 2]
+        assert store.get("cs101", 1).topics == ("Algebra", "Graphs")
+        assert store.latest("cs101").version == 2
+        with pytest.raises(UnknownSyllabus):
+            store.latest("missing")
+    finally:
+        store.close()
+
+
+def test_unrelated_topics_at_the_same_place_are_not_paired():
+    delta = diff_topics(["A", "B", "C"], ["A", "B", "D"])
+    assert (delta.added, delta.removed, delta.changed) == (("D",), ("C",), ())
+
+    delta = diff_topics(["Algebra", "Graph Theory", "Sets"], ["Algebra", "Thermodynamics", "Sets"])
+    assert (delta.added, delta.removed, delta.changed) == (("Thermodynamics",), ("Graph Theory",), ())
+
+
+def test_only_similar_topics_in_a_replaced_run_are_paired():
+    delta = diff_topics(
+        ["Algebra", "Graph Theory", "Number Theory", "Sets"],
+        ["Algebra", "Optics", "Graph Theory Basics", "Sets"],
+    )
+    assert delta.changed == (("Graph Theory", "Graph Theory Basics"),)
+    assert delta.added == ("Optics",)
+    assert delta.removed == ("Number Theory",)
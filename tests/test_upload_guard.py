@@ -0,0 +1,76 @@
+"""
+tests/test_upload_guard.py
+--------------------------
+Upload admission before the body is read (api/middleware/upload_guard.py).
+"""
+
+import asyncio
+import json
+
+from api.middleware.upload_guard import UPLOAD_FORM_OVERHEAD, UploadGuard
+from core.extraction_pool import PoolSaturated
+
+
+class Pool:
+    def __init__(self, free=True):
+        self.free = free
+
+    def check_capacity(self):
+        if not self.free:
+            raise PoolSaturated(3)
+
+
+async def body_reader(scope, receive, send):
+    """Inner app: reads the whole body like a form parser, then answers 200."""
+    while True:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            raise RuntimeError("client disconnected")
+        if not message.get("more_body"):
+            break
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"ok"})
+
+
+def _call(guard, chunks, headers=(), path="/content/upload"):
+    scope = {"type": "http", "method": "POST", "path": path, "headers": list(headers)}
+    messages = [{"type": "http.request", "body": c, "more_body": i < len(chunks) - 1} for i, c in enumerate(chunks)]
+    reads, sent = [], []
+
+    async def receive():
+        reads.append(1)
+        return messages[len(reads) - 1]
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(guard(scope, receive, send))
+    return sent[0]["status"], dict(sent[0]["headers"]), b"".join(m.get("body", b"") for m in sent[1:]), len(reads)
+
+
+def test_saturated_pool_is_refused_before_the_body_is_read():
+    status, headers, body, reads = _call(UploadGuard(body_reader, pool=Pool(free=False)), [b"x" * 10])
+    assert (status, reads) == (503, 0)
+    assert headers[b"retry-after"] == b"3"
+    assert json.loads(body)["status"] == "error"
+
+
+def test_declared_oversize_is_refused_before_the_body_is_read():
+    guard = UploadGuard(body_reader, max_bytes=100, pool=Pool())
+    length = str(100 + UPLOAD_FORM_OVERHEAD + 1).encode()
+    status, _, _, reads = _call(guard, [b"x"], [(b"content-length", length)])
+    assert (status, reads) == (413, 0)
+
+
+def test_chunked_oversize_is_cut_off():
+    guard = UploadGuard(body_reader, max_bytes=0, pool=Pool())
+    chunk = b"x" * (UPLOAD_FORM_OVERHEAD // 2)
+    status, _, _, reads = _call(guard, [chunk] * 10)
+    assert (status, reads) == (413, 3)
+
+
+def test_other_requests_pass_through():
+    guard = UploadGuard(body_reader, max_bytes=0, pool=Pool(free=False))
+    assert _call(guard, [b"x" * 10])[0] == 503
+    assert _call(guard, [b"x" * 10], path="/content/generate")[:1] == (200,)
+    assert _call(UploadGuard(body_reader, pool=Pool()), [b"x" * 10])[0] == 200
@@ -0,0 +1,55 @@
+"""
+tests/test_workflow.py
+----------------------
+Synchronous workflow log (core/workflow.py).
+"""
+
+import json
+
+from core.models import to_jsonable
+from core.workflow import run_workflow
+
+
+def test_each_stage_is_stamped_with_its_own_completion_time():
+    result = run_workflow("Algebra, Graphs, Probability")
+    log = result["pipeline_log"]
+    stamps = [stage.timestamp for stage in log["stages"]]
+    assert len(stamps) == 5
+    assert len(set(stamps)) == 5
+    assert log["timestamp"] <= stamps[0] and stamps == sorted(stamps)
+    json.dumps(result, default=to_jsonable)
+
+
+def _run_async_demo(monkeypatch, answers=None):
+    import asyncio
+    import types
+
+    from core import workflow_async
+
+    async def no_wait(seconds):
+        pass
+
+    monkeypatch.setattr(workflow_async, "asyncio", types.SimpleNamespace(sleep=no_wait))
+    result = asyncio.run(workflow_async.run_workflow_async("AI Basics", answers=answers))
+    return {stage.stage: stage.output for stage in result["pipeline_log"]["stages"]}
+
+
+def test_async_demo_labels_placeholder_scores(monkeypatch):
+    stages = _run_async_demo(monkeypatch)
+    assert stages["evaluation"]["source"] == "demo"
+    assert "not graded" in stages["evaluation"]["note"]
+    assert stages["analytics"]["source"] == "demo"
+
+
+def test_async_demo_grades_supplied_answers(monkeypatch):
+    from core.scoring import parse_answers
+
+    answers = parse_answers(
+        b"student_id,question_id,knowledge,clarity,creativity\ns1,q1,10,10,10\ns2,q1,5,5,5\n",
+        ("knowledge", "clarity", "creativity"),
+    )
+    stages = _run_async_demo(monkeypatch, answers)
+    evaluation = stages["evaluation"]
+    assert evaluation["source"] == "answers"
+    assert [(r["student"], r["score"], r["grade"]) for r in evaluation["results"]] == [("s1", 100.0, "A"), ("s2", 50.0, "F")]
+    assert stages["analytics"]["average_score"] == 75.0